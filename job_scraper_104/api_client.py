@@ -1,17 +1,29 @@
 """
 104 人力銀行 API 客戶端模組（混合方案版本）
-使用 Playwright CDP 抓取職缺列表 + requests 抓取詳情
+使用 Playwright CDP 抓取職缺列表 + requests / httpx 抓取詳情
 """
 
 import requests
-import time
-import random
+import httpx
 import logging
 import re
+import time
 import asyncio
 from typing import Dict, List, Optional
-from playwright.async_api import async_playwright
+from urllib.parse import urlencode
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from . import config
+from .browser_pool import CDPBrowserPool
+from .navigation_profile import NavigationProfile
+from .rate_limiter import RateLimiter
+from .resilience import (
+    CircuitBreakerRegistry,
+    DeadLetterQueue,
+    RetryableRequestError,
+    RetryPolicy,
+    RETRYABLE_STATUS_CODES,
+)
+from .response_cache import DetailResponseCache
 
 # 設定日誌
 logging.basicConfig(
@@ -28,17 +40,42 @@ logger = logging.getLogger(__name__)
 class Job104APIClient:
     """104 人力銀行 API 客戶端（混合方案）"""
     
-    def __init__(self, use_cdp: bool = True, cdp_url: str = "http://localhost:9527"):
+    def __init__(
+        self,
+        use_cdp: bool = True,
+        cdp_url: str = "http://localhost:9527",
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         """
         初始化 API 客戶端
         
         Args:
             use_cdp: 是否使用 CDP 連接（預設 True）
             cdp_url: CDP 連接 URL
+            rate_limiter: 共用的速率限制器（預設建立新的）
         """
         self.session = requests.Session()
         self.use_cdp = use_cdp
         self.cdp_url = cdp_url
+        self.rate_limiter = rate_limiter or RateLimiter()
+        
+        # 重試、依主機的斷路器與最終失敗的任務清單
+        self.retry_policy = RetryPolicy()
+        self.circuit_breakers = CircuitBreakerRegistry()
+        self.dead_letters = DeadLetterQueue()
+        
+        # 職缺詳情的磁碟快取（可於 config 關閉）
+        self.detail_cache = DetailResponseCache() if config.DETAIL_CACHE_ENABLED else None
+        
+        # 整個客戶端生命週期共用一條 CDP 連線，分頁由連線池租借
+        self.navigation_profile = NavigationProfile()
+        self.browser_pool = CDPBrowserPool(cdp_url, page_setup=self.navigation_profile.setup_page)
+        
+        # 是否已從瀏覽器取得搜尋 API 所需的 Cookies
+        self._cookies_ready = False
+        
+        # 執行統計
+        self.stats = {'cdp_pages': 0, 'cdp_xhr_hits': 0, 'cdp_wait_seconds': 0.0}
         
         # 完整的瀏覽器 Headers
         self.session.headers.update({
@@ -48,94 +85,383 @@ class Job104APIClient:
             'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive',
         })
+        
+        # 異步詳情客戶端（第一次使用時才建立，需綁定於執行中的 event loop）
+        self.async_session: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._detail_semaphore: Optional[asyncio.Semaphore] = None
+    
+    def _get_async_session(self) -> httpx.AsyncClient:
+        """取得異步 HTTP 客戶端（沿用 requests session 的 Headers）"""
+        loop = asyncio.get_running_loop()
+        # 連線池綁定於建立時的 event loop，換了 loop（例如多次 asyncio.run）就重新建立
+        if self.async_session is None or self.async_session.is_closed or self._async_loop is not loop:
+            limits = httpx.Limits(
+                max_connections=config.DETAIL_CONCURRENCY,
+                max_keepalive_connections=config.DETAIL_CONCURRENCY,
+            )
+            self.async_session = httpx.AsyncClient(
+                headers=dict(self.session.headers),
+                cookies=self.session.cookies,
+                timeout=15,
+                limits=limits,
+            )
+            self._detail_semaphore = asyncio.Semaphore(config.DETAIL_CONCURRENCY)
+            self._async_loop = loop
+        return self.async_session
+    
+    def _open_detail_cache(self) -> Optional[DetailResponseCache]:
+        """
+        取得職缺詳情快取（close() 後再次使用時重新開啟，排程模式下每次執行都會使用快取）
+        
+        Returns:
+            快取，config 關閉快取時回傳 None
+        """
+        if self.detail_cache is None and config.DETAIL_CACHE_ENABLED:
+            self.detail_cache = DetailResponseCache()
+        return self.detail_cache
+    
+    def _search_params(self, keyword: str, page: int, sort_by: Optional[str] = None) -> Dict:
+        """
+        組合搜尋參數（搜尋頁面與搜尋 API 共用）
+        
+        Args:
+            keyword: 搜尋關鍵字
+            page: 頁碼
+            sort_by: 排序方式（預設使用 config.SORT_BY）
+        
+        Returns:
+            查詢參數字典
+        """
+        order = config.SEARCH_ORDER.get(sort_by or config.SORT_BY, config.SEARCH_ORDER['relevance'])
+        return {
+            'ro': 0,
+            'kwop': 7,
+            'keyword': keyword,
+            'order': order,
+            'asc': 0,
+            'page': page,
+            'mode': 's',
+            'jobsource': '2018indexpoc',
+        }
+    
+    def _search_page_url(self, keyword: str, page: int, sort_by: Optional[str] = None) -> str:
+        """組合搜尋頁面的 URL"""
+        return f"{config.API_BASE_URL}/jobs/search/?{urlencode(self._search_params(keyword, page, sort_by))}"
     
-    def _delay(self, delay_range: tuple):
-        """隨機延遲"""
-        delay_time = random.uniform(delay_range[0], delay_range[1])
-        logger.debug(f"延遲 {delay_time:.2f} 秒...")
-        time.sleep(delay_time)
+    async def _handoff_cdp_session(self):
+        """
+        透過 CDP 取得 104 的 Cookies 與 User-Agent，交給 requests / httpx session 使用
+        只需在第一次呼叫搜尋 API 前（或 Cookies 失效時）執行一次
+        """
+        async with self.browser_pool.lease() as page_obj:
+            if not page_obj.url.startswith(config.API_BASE_URL):
+                await self.rate_limiter.acquire('list')
+                await page_obj.goto(f"{config.API_BASE_URL}/jobs/search/", wait_until='domcontentloaded', timeout=60000)
+            
+            cookies = await page_obj.context.cookies(config.API_BASE_URL)
+            user_agent = await page_obj.evaluate("navigator.userAgent")
+        
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+            if self.async_session is not None and not self.async_session.is_closed:
+                self.async_session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+        
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+            if self.async_session is not None and not self.async_session.is_closed:
+                self.async_session.headers['User-Agent'] = user_agent
+        
+        self._cookies_ready = True
+        logger.info(f"已從瀏覽器取得 {len(cookies)} 個 Cookies，改用搜尋 API 抓取列表")
+    
+    def _parse_search_list(self, data: Dict) -> List[Dict]:
+        """
+        將搜尋 API 的回應整理為職缺卡片清單
+        
+        Args:
+            data: 搜尋 API 回傳的 JSON
+        
+        Returns:
+            職缺卡片清單，每筆包含 job_id 與列表頁可取得的基本資訊
+        """
+        payload = data.get('data', {})
+        items = payload.get('list', []) if isinstance(payload, dict) else payload
+        
+        cards = []
+        seen = set()
+        for item in items or []:
+            if not isinstance(item, dict):
+                continue
+            
+            # 詳情 API 使用的是網址中的職缺代碼（例如 /job/8lhbs），不是 jobNo
+            link = item.get('link', {})
+            job_link = link.get('job', '') if isinstance(link, dict) else ''
+            match = re.search(r'/job/([a-z0-9]+)', job_link)
+            if not match or match.group(1) in seen:
+                continue
+            
+            job_id = match.group(1)
+            seen.add(job_id)
+            cards.append({
+                'job_id': job_id,
+                'title': item.get('jobName', ''),
+                'company': item.get('custName', ''),
+                'salary': item.get('salaryDesc', ''),
+                'location': f"{item.get('jobAddrNoDesc', '')}{item.get('jobAddress', '')}".strip(),
+                'appear_date': item.get('appearDate', ''),
+                'job_url': f"{config.API_BASE_URL}/job/{job_id}",
+            })
+        return cards
+    
+    def search_jobs(self, keyword: str, page: int = 1, sort_by: Optional[str] = None) -> Optional[Dict]:
+        """
+        使用 requests 呼叫搜尋 API（需先取得瀏覽器 Cookies，否則可能被拒絕）
+        
+        Args:
+            keyword: 搜尋關鍵字
+            page: 頁碼
+            sort_by: 排序方式（預設使用 config.SORT_BY）
+        
+        Returns:
+            搜尋 API 回傳的 JSON，失敗時回傳 None
+        """
+        url = f"{config.API_BASE_URL}{config.API_SEARCH_ENDPOINT}"
+        headers = {'Referer': self._search_page_url(keyword, page, sort_by)}
+        
+        try:
+            self.rate_limiter.acquire_sync('list')
+            response = self.session.get(url, params=self._search_params(keyword, page, sort_by), headers=headers, timeout=15)
+            self.rate_limiter.record_status('list', response.status_code)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.Timeout:
+            self.rate_limiter.record_throttle('list', "請求逾時")
+            logger.error(f"請求超時：{url}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"搜尋 API 請求失敗: {e}")
+            return None
+        except ValueError as e:
+            logger.error(f"JSON 解析失敗: {e}")
+            return None
+    
+    async def search_jobs_with_api(self, keyword: str, page: int = 1, max_jobs: int = 50) -> Optional[List[Dict]]:
+        """
+        使用異步 session 呼叫搜尋 API 並返回職缺卡片
+        
+        Args:
+            keyword: 搜尋關鍵字
+            page: 頁碼
+            max_jobs: 最大職缺數
+        
+        Returns:
+            職缺卡片清單；請求失敗時回傳 None（由呼叫端改用 CDP）
+        """
+        if self.use_cdp and not self._cookies_ready:
+            await self._handoff_cdp_session()
+        
+        client = self._get_async_session()
+        url = f"{config.API_BASE_URL}{config.API_SEARCH_ENDPOINT}"
+        headers = {'Referer': self._search_page_url(keyword, page)}
+        
+        logger.info(f"使用搜尋 API 抓取列表：關鍵字='{keyword}', 第 {page} 頁")
+        try:
+            await self.rate_limiter.acquire('list')
+            response = await client.get(url, params=self._search_params(keyword, page), headers=headers)
+            self.rate_limiter.record_status('list', response.status_code)
+            if response.status_code in (401, 403):
+                # Cookies 可能已失效，下次重新從瀏覽器取得
+                self._cookies_ready = False
+            response.raise_for_status()
+            cards = self._parse_search_list(response.json())
+        except httpx.TimeoutException:
+            self.rate_limiter.record_throttle('list', "請求逾時")
+            logger.error(f"請求超時：{url}")
+            return None
+        except httpx.HTTPError as e:
+            logger.error(f"搜尋 API 請求失敗: {e}")
+            return None
+        except (ValueError, AttributeError) as e:
+            logger.error(f"搜尋 API 回應格式異常: {e}")
+            return None
+        
+        logger.info(f"成功取得 {len(cards)} 個職缺 ID")
+        return cards[:max_jobs]
+    
+    async def _list_jobs_once(self, keyword: str, page: int, max_jobs: int) -> Optional[List[Dict]]:
+        """
+        嘗試抓取一次職缺列表（搜尋 API 失敗時改用 CDP）
+        
+        Returns:
+            職缺卡片清單，兩種方式都失敗時回傳 None
+        """
+        if config.LIST_FETCH_MODE == "api":
+            try:
+                cards = await self.search_jobs_with_api(keyword, page, max_jobs)
+            except Exception as e:
+                logger.error(f"搜尋 API 抓取失敗: {e}")
+                cards = None
+            
+            if cards is not None or not self.use_cdp:
+                return cards
+            logger.warning("搜尋 API 無法使用，改用 CDP 抓取列表")
+        
+        return await self.search_jobs_with_cdp(keyword, page, max_jobs)
+    
+    async def list_jobs(self, keyword: str, page: int = 1, max_jobs: int = 50) -> List[Dict]:
+        """
+        抓取一頁職缺列表（依 config.LIST_FETCH_MODE 選擇搜尋 API 或 CDP）
+        失敗時以指數退避重試，仍失敗則加入 dead-letter 清單
+        
+        Args:
+            keyword: 搜尋關鍵字
+            page: 頁碼
+            max_jobs: 最大職缺數
+        
+        Returns:
+            職缺卡片清單（CDP 模式下只有 job_id 與 job_url）
+        """
+        breaker = self.circuit_breakers.for_url(config.API_BASE_URL)
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            await breaker.wait()
+            cards = await self._list_jobs_once(keyword, page, max_jobs)
+            if cards is not None:
+                breaker.record_success()
+                return cards
+            
+            breaker.record_failure()
+            if attempt < self.retry_policy.max_attempts:
+                delay = self.retry_policy.delay(attempt)
+                logger.warning(f"「{keyword}」第 {page} 頁第 {attempt} 次抓取失敗，{delay:.1f} 秒後重試")
+                await asyncio.sleep(delay)
+        
+        self.dead_letters.add('list', f"{keyword}#{page}", "列表頁抓取失敗")
+        return []
+    
+    def _is_search_response(self, response) -> bool:
+        """判斷頁面回應是否為搜尋頁面自己發出的搜尋 API 請求"""
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return False
+        return any(pattern in response.url for pattern in config.CDP_SEARCH_XHR_PATTERNS)
+    
+    async def _scan_job_links(self, page_obj) -> List[str]:
+        """從頁面上所有連結中提取職缺 ID（攔截不到搜尋 API 時的備援方案）"""
+        return await page_obj.evaluate("""
+            () => {
+                const links = document.querySelectorAll('a[href]');
+                const ids = [];
+                links.forEach(link => {
+                    const href = link.getAttribute('href');
+                    // 匹配 job%2F8lhbs 或 /job/8lhbs 格式
+                    let match = href.match(/job%2F([a-z0-9]+)/);
+                    if (match && match[1]) {
+                        ids.push(match[1]);
+                    } else {
+                        match = href.match(/\\/job\\/([a-z0-9]+)/);
+                        if (match && match[1]) {
+                            ids.push(match[1]);
+                        }
+                    }
+                });
+                return [...new Set(ids)]; // 去重
+            }
+        """)
     
     async def search_jobs_with_cdp(
         self, 
         keyword: str, 
         page: int = 1,
         max_jobs: int = 50
-    ) -> List[str]:
+    ) -> Optional[List[Dict]]:
         """
-        使用 Playwright CDP 搜尋職缺並返回職缺 ID 列表
+        使用 Playwright CDP 開啟搜尋頁面並返回職缺卡片
+        
+        頁面就緒以攔截到頁面自己發出的搜尋 API 回應為準，職缺資料直接取自該 JSON；
+        攔截不到時改為等待職缺連結出現，再掃描頁面上的連結
         
         Args:
             keyword: 搜尋關鍵字
-            page: 頁碼（暫不使用，CDP 方案直接抓取所有可見職缺）
+            page: 頁碼
             max_jobs: 最大職缺數
         
         Returns:
-            職缺 ID 列表
+            職缺卡片清單（從 DOM 掃描時只有 job_id 與 job_url），失敗時回傳 None
         """
         logger.info(f"使用 CDP 搜尋職缺：關鍵字='{keyword}', 最大數量={max_jobs}")
         
-        job_ids = []
+        timeout_ms = config.CDP_PAGE_TIMEOUT * 1000
         
-        async with async_playwright() as p:
-            try:
-                # 連接到 CDP
-                browser = await p.chromium.connect_over_cdp(self.cdp_url)
-                context = browser.contexts[0]
-                page_obj = context.pages[0] if context.pages else await context.new_page()
-                
+        try:
+            # 從連線池租借分頁（必要時自動連線或重新連線）
+            async with self.browser_pool.lease() as page_obj:
                 # 導航到搜尋頁面
-                search_url = f"https://www.104.com.tw/jobs/search/?keyword={keyword}&page={page}"
+                search_url = self._search_page_url(keyword, page)
                 logger.info(f"導航到: {search_url}")
                 
-                await page_obj.goto(search_url, wait_until='domcontentloaded', timeout=60000)
-                await asyncio.sleep(5)  # 等待頁面穩定
+                await self.rate_limiter.acquire('list')
+                wait_start = time.monotonic()
+                navigated = False
+                search_data = None
                 
-                # 滾動頁面以載入更多職缺
-                await page_obj.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-                await asyncio.sleep(2)
+                try:
+                    # 在導航前開始監聽，避免錯過頁面一載入就發出的搜尋請求
+                    async with page_obj.expect_response(self._is_search_response, timeout=timeout_ms) as response_info:
+                        response = await page_obj.goto(search_url, wait_until='domcontentloaded', timeout=60000)
+                        navigated = True
+                        self.navigation_profile.record_navigation(time.monotonic() - wait_start)
+                        if response is not None:
+                            self.rate_limiter.record_status('list', response.status)
+                    search_response = await response_info.value
+                    search_data = await search_response.json()
+                except PlaywrightTimeoutError:
+                    if not navigated:
+                        raise
+                    logger.warning(f"{config.CDP_PAGE_TIMEOUT} 秒內未攔截到搜尋 API 回應，改為掃描頁面連結")
+                except ValueError as e:
+                    logger.warning(f"搜尋 API 回應無法解析，改為掃描頁面連結：{e}")
                 
-                # 從所有連結中提取職缺 ID
-                job_ids = await page_obj.evaluate("""
-                    () => {
-                        const links = document.querySelectorAll('a[href]');
-                        const ids = [];
-                        links.forEach(link => {
-                            const href = link.getAttribute('href');
-                            // 匹配 job%2F8lhbs 或 /job/8lhbs 格式
-                            let match = href.match(/job%2F([a-z0-9]+)/);
-                            if (match && match[1]) {
-                                ids.push(match[1]);
-                            } else {
-                                match = href.match(/\\/job\\/([a-z0-9]+)/);
-                                if (match && match[1]) {
-                                    ids.push(match[1]);
-                                }
-                            }
-                        });
-                        return [...new Set(ids)]; // 去重
-                    }
-                """)
+                if search_data is not None:
+                    cards = self._parse_search_list(search_data)
+                    source = "搜尋 API"
+                else:
+                    # Playwright 的 timeout=0 代表不限時，因此至少保留 1 毫秒
+                    remaining_ms = max(1.0, timeout_ms - (time.monotonic() - wait_start) * 1000)
+                    try:
+                        await page_obj.wait_for_selector(config.CDP_JOB_CARD_SELECTOR, timeout=remaining_ms)
+                    except PlaywrightTimeoutError:
+                        logger.warning("等待職缺連結逾時")
+                    job_ids = await self._scan_job_links(page_obj)
+                    cards = [{'job_id': job_id, 'job_url': f"{config.API_BASE_URL}/job/{job_id}"} for job_id in job_ids]
+                    source = "頁面連結"
                 
-                logger.info(f"成功取得 {len(job_ids)} 個職缺 ID")
+                wait_time = time.monotonic() - wait_start
+                self.stats['cdp_pages'] += 1
+                self.stats['cdp_wait_seconds'] += wait_time
+                if search_data is not None:
+                    self.stats['cdp_xhr_hits'] += 1
                 
-                # 延遲
-                self._delay(config.REQUEST_DELAY_LIST)
+                logger.info(f"成功取得 {len(cards)} 個職缺 ID（來源：{source}，等待 {wait_time:.2f} 秒）")
                 
-                return job_ids[:max_jobs]
+                return cards[:max_jobs]
                 
-            except Exception as e:
-                logger.error(f"CDP 搜尋失敗: {e}")
-                return []
+        except PlaywrightTimeoutError as e:
+            self.rate_limiter.record_throttle('list', "頁面載入逾時")
+            logger.error(f"CDP 搜尋逾時: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"CDP 搜尋失敗: {e}")
+            return None
     
-    def get_job_detail(self, job_id: str) -> Optional[Dict]:
+    def _detail_request(self, job_id: str):
         """
-        使用 requests 取得職缺詳細資訊
+        組合職缺詳情請求的 URL 與 Headers
         
         Args:
             job_id: 職缺 ID
         
         Returns:
-            包含職缺詳細資訊的字典
+            (API URL, 職缺頁面 URL, Headers)
         """
         url = f"{config.API_BASE_URL}{config.API_JOB_DETAIL_ENDPOINT}/{job_id}"
         job_url = f"{config.API_BASE_URL}/job/{job_id}"
@@ -144,51 +470,105 @@ class Job104APIClient:
             'Referer': job_url,
             'X-Requested-With': 'XMLHttpRequest',
         }
+        return url, job_url, headers
+    
+    def _parse_job_detail(self, job_id: str, job_url: str, data: Dict) -> Optional[Dict]:
+        """
+        將職缺詳情 API 的回應整理為 job_info 字典
+        
+        Args:
+            job_id: 職缺 ID
+            job_url: 職缺頁面 URL
+            data: API 回傳的 JSON
         
+        Returns:
+            職缺資訊字典，格式異常時回傳 None
+        """
+        if 'data' not in data:
+            logger.warning(f"職缺詳情格式異常：{data}")
+            return None
+        
+        # 提取各個部分的資料
+        header = data['data'].get('header', {})
+        job_detail = data['data'].get('jobDetail', {})
+        condition = data['data'].get('condition', {})
+        
+        # 整理職缺資訊
+        job_info = {
+            'job_id': job_id,
+            'title': header.get('jobName', job_detail.get('jobName', '未提供')),
+            'company': header.get('custName', job_detail.get('custName', '未提供')),
+            'salary': job_detail.get('salary', '面議'),
+            'location': f"{job_detail.get('addressRegion', '')}{job_detail.get('addressDetail', '')}".strip() or '未提供',
+            'job_description': job_detail.get('jobDescription', ''),
+            'education': condition.get('edu', '未指定'),
+            'experience': condition.get('workExp', '未指定'),
+            'skills': [],  # 可從其他欄位提取
+            'specialty': self._extract_specialty(condition.get('specialty', [])),
+            'other_requirement': condition.get('other', ''),
+            'keywords': header.get('jobNameKeyword', []) if isinstance(header.get('jobNameKeyword'), list) else [],
+            'appear_date': header.get('appearDate', ''),
+            'job_url': job_url,
+        }
+        
+        logger.info(f"成功取得職缺詳情：{job_info['title']}")
+        return job_info
+    
+    def _store_detail(self, job_id: str, body: str, data, response_headers):
+        """
+        將職缺詳情回應寫入快取（只保存格式正確的回應）
+        
+        Args:
+            job_id: 職缺 ID
+            body: 回應的 JSON 文字
+            data: 已解析的回應（data 欄位須為物件才寫入快取）
+            response_headers: 回應 Headers（取 ETag 與 Last-Modified）
+        """
+        if not self.detail_cache or not isinstance(data, dict) or not isinstance(data.get('data'), dict):
+            return
+        try:
+            self.detail_cache.put(
+                job_id,
+                body,
+                etag=response_headers.get('ETag'),
+                last_modified=response_headers.get('Last-Modified'),
+            )
+        except Exception as e:
+            logger.warning(f"寫入職缺詳情快取失敗：{e}")
+    
+    def _get_job_detail_once(self, job_id: str, url: str, job_url: str, headers: Dict, cached: Optional[Dict]) -> Optional[Dict]:
+        """
+        送出一次職缺詳情請求（同步版本）
+        
+        Returns:
+            職缺資訊字典；不可重試的失敗回傳 None
+        
+        Raises:
+            RetryableRequestError: 逾時、連線錯誤、限流或暫時性伺服器錯誤
+        """
         try:
+            self.rate_limiter.acquire_sync('detail')
             logger.info(f"正在取得職缺詳情：job_id={job_id}")
             response = self.session.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
+            self.rate_limiter.record_status('detail', response.status_code)
             
+            if response.status_code == 304 and cached:
+                self.detail_cache.touch(job_id)
+                return self._parse_job_detail(job_id, job_url, cached['payload'])
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableRequestError(f"HTTP {response.status_code}")
+            
+            response.raise_for_status()
             data = response.json()
+            self._store_detail(job_id, response.text, data, response.headers)
             
-            if 'data' in data:
-                # 提取各個部分的資料
-                header = data['data'].get('header', {})
-                job_detail = data['data'].get('jobDetail', {})
-                condition = data['data'].get('condition', {})
-                
-                # 整理職缺資訊
-                job_info = {
-                    'job_id': job_id,
-                    'title': header.get('jobName', job_detail.get('jobName', '未提供')),
-                    'company': header.get('custName', job_detail.get('custName', '未提供')),
-                    'salary': job_detail.get('salary', '面議'),
-                    'location': f"{job_detail.get('addressRegion', '')}{job_detail.get('addressDetail', '')}".strip() or '未提供',
-                    'job_description': job_detail.get('jobDescription', ''),
-                    'education': condition.get('edu', '未指定'),
-                    'experience': condition.get('workExp', '未指定'),
-                    'skills': [],  # 可從其他欄位提取
-                    'specialty': self._extract_specialty(condition.get('specialty', [])),
-                    'other_requirement': condition.get('other', ''),
-                    'keywords': header.get('jobNameKeyword', []) if isinstance(header.get('jobNameKeyword'), list) else [],
-                    'appear_date': header.get('appearDate', ''),
-                    'job_url': job_url,
-                }
-                
-                logger.info(f"成功取得職缺詳情：{job_info['title']}")
-                
-                # 延遲
-                self._delay(config.REQUEST_DELAY_DETAIL)
-                
-                return job_info
-            else:
-                logger.warning(f"職缺詳情格式異常：{data}")
-                return None
-                
+            return self._parse_job_detail(job_id, job_url, data)
+        
         except requests.exceptions.Timeout:
-            logger.error(f"請求超時：{url}")
-            return None
+            self.rate_limiter.record_throttle('detail', "請求逾時")
+            raise RetryableRequestError("請求逾時")
+        except requests.exceptions.ConnectionError as e:
+            raise RetryableRequestError(f"連線失敗: {e}")
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP 錯誤 ({e.response.status_code}): {url}")
             return None
@@ -199,13 +579,171 @@ class Job104APIClient:
             logger.error(f"JSON 解析失敗: {e}")
             return None
     
+    def get_job_detail(self, job_id: str) -> Optional[Dict]:
+        """
+        使用 requests 取得職缺詳細資訊
+        可重試的失敗會以指數退避重試，仍失敗則加入 dead-letter 清單
+        
+        Args:
+            job_id: 職缺 ID
+        
+        Returns:
+            包含職缺詳細資訊的字典
+        """
+        url, job_url, headers = self._detail_request(job_id)
+        
+        # 先查快取，新鮮的快取不需要連網
+        detail_cache = self._open_detail_cache()
+        cached = detail_cache.get(job_id) if detail_cache else None
+        if cached and cached['fresh']:
+            logger.info(f"使用快取的職缺詳情：job_id={job_id}")
+            return self._parse_job_detail(job_id, job_url, cached['payload'])
+        if cached:
+            headers.update(self.detail_cache.conditional_headers(cached))
+        
+        breaker = self.circuit_breakers.for_url(url)
+        reason = ""
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            breaker.wait_sync()
+            try:
+                job_info = self._get_job_detail_once(job_id, url, job_url, headers, cached)
+                breaker.record_success()
+                return job_info
+            except RetryableRequestError as e:
+                breaker.record_failure()
+                reason = str(e)
+                if attempt < self.retry_policy.max_attempts:
+                    delay = self.retry_policy.delay(attempt)
+                    logger.warning(f"職缺詳情第 {attempt} 次失敗（{reason}），{delay:.1f} 秒後重試：job_id={job_id}")
+                    time.sleep(delay)
+        
+        self.dead_letters.add('detail', job_id, reason)
+        return None
+    
+    async def _get_job_detail_once_async(self, job_id: str, url: str, job_url: str, headers: Dict, cached: Optional[Dict]) -> Optional[Dict]:
+        """
+        送出一次職缺詳情請求（異步版本，佔用一個併發名額）
+        
+        Returns:
+            職缺資訊字典；不可重試的失敗回傳 None
+        
+        Raises:
+            RetryableRequestError: 逾時、連線錯誤、限流或暫時性伺服器錯誤
+        """
+        client = self._get_async_session()
+        
+        async with self._detail_semaphore:
+            try:
+                await self.rate_limiter.acquire('detail')
+                logger.info(f"正在取得職缺詳情：job_id={job_id}")
+                response = await client.get(url, headers=headers)
+                self.rate_limiter.record_status('detail', response.status_code)
+                
+                if response.status_code == 304 and cached:
+                    self.detail_cache.touch(job_id)
+                    return self._parse_job_detail(job_id, job_url, cached['payload'])
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    raise RetryableRequestError(f"HTTP {response.status_code}")
+                
+                response.raise_for_status()
+                data = response.json()
+                self._store_detail(job_id, response.text, data, response.headers)
+                
+                return self._parse_job_detail(job_id, job_url, data)
+                
+            except httpx.TimeoutException:
+                self.rate_limiter.record_throttle('detail', "請求逾時")
+                raise RetryableRequestError("請求逾時")
+            except httpx.TransportError as e:
+                raise RetryableRequestError(f"連線失敗: {e}")
+            except httpx.HTTPStatusError as e:
+                logger.error(f"HTTP 錯誤 ({e.response.status_code}): {url}")
+                return None
+            except httpx.HTTPError as e:
+                logger.error(f"請求失敗: {e}")
+                return None
+            except ValueError as e:
+                logger.error(f"JSON 解析失敗: {e}")
+                return None
+    
+    async def get_job_detail_async(self, job_id: str, revalidate: bool = False) -> Optional[Dict]:
+        """
+        使用 httpx 異步取得職缺詳細資訊
+        同時進行中的請求數受 config.DETAIL_CONCURRENCY 限制，
+        請求速率則由共用的速率限制器控制；
+        可重試的失敗會以指數退避重試（等待期間不佔用併發名額），仍失敗則加入 dead-letter 清單
+        
+        Args:
+            job_id: 職缺 ID
+            revalidate: 已知職缺有更新時設為 True，快取即使未過期也向伺服器驗證
+        
+        Returns:
+            包含職缺詳細資訊的字典（格式與 get_job_detail 相同）
+        """
+        self._get_async_session()
+        url, job_url, headers = self._detail_request(job_id)
+        
+        # 先查快取，新鮮的快取不需要連網也不佔用併發名額
+        detail_cache = self._open_detail_cache()
+        cached = detail_cache.get(job_id) if detail_cache else None
+        if cached and cached['fresh'] and not revalidate:
+            logger.info(f"使用快取的職缺詳情：job_id={job_id}")
+            return self._parse_job_detail(job_id, job_url, cached['payload'])
+        if cached:
+            headers.update(self.detail_cache.conditional_headers(cached))
+        
+        breaker = self.circuit_breakers.for_url(url)
+        reason = ""
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            await breaker.wait()
+            try:
+                job_info = await self._get_job_detail_once_async(job_id, url, job_url, headers, cached)
+                breaker.record_success()
+                return job_info
+            except RetryableRequestError as e:
+                breaker.record_failure()
+                reason = str(e)
+                if attempt < self.retry_policy.max_attempts:
+                    delay = self.retry_policy.delay(attempt)
+                    logger.warning(f"職缺詳情第 {attempt} 次失敗（{reason}），{delay:.1f} 秒後重試：job_id={job_id}")
+                    await asyncio.sleep(delay)
+        
+        self.dead_letters.add('detail', job_id, reason)
+        return None
+    
     def _extract_specialty(self, specialty_raw) -> List[str]:
         """提取擅長工具列表"""
         if isinstance(specialty_raw, list):
             return [s.get('description', '') for s in specialty_raw if isinstance(s, dict) and s.get('description')]
         return []
     
+    def log_stats(self):
+        """輸出本次執行的請求統計"""
+        self.rate_limiter.log_stats()
+        self.circuit_breakers.log_stats()
+        self.navigation_profile.log_stats()
+        if self.detail_cache:
+            self.detail_cache.log_stats()
+        if self.stats['cdp_pages']:
+            logger.info(
+                f"CDP 列表頁：{self.stats['cdp_pages']} 頁，"
+                f"攔截到搜尋 API {self.stats['cdp_xhr_hits']} 頁，"
+                f"平均等待 {self.stats['cdp_wait_seconds'] / self.stats['cdp_pages']:.2f} 秒"
+            )
+    
     def close(self):
-        """關閉 session"""
+        """關閉 session 與職缺詳情快取（之後再抓取詳情時快取會重新開啟）"""
         self.session.close()
+        if self.detail_cache:
+            self.detail_cache.close()
+            self.detail_cache = None
         logger.info("API 客戶端已關閉")
+    
+    async def aclose(self):
+        """關閉 CDP 分頁池、異步 session 與同步 session"""
+        await self.browser_pool.close()
+        if self.async_session is not None and not self.async_session.is_closed:
+            await self.async_session.aclose()
+        self.async_session = None
+        self._async_loop = None
+        self.close()
@@ -0,0 +1,94 @@
+"""
+技術名詞連結效能比較
+以 5,000 個關鍵字的詞彙表比較舊版（每個關鍵字一次 re.sub）與 Aho-Corasick 單次掃描
+"""
+
+import sys
+import os
+import re
+import random
+import time
+
+# 設定 UTF-8 編碼（解決 Windows 終端機編碼問題）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_scraper_104.keyword_matcher import KeywordMatcher
+
+VOCABULARY_SIZE = 5000
+TEXT_COUNT = 50
+
+BASE_KEYWORDS = [
+    "Python", "SQL", "Spark", "Airflow", "Docker", "Kubernetes", "Power BI", "Tableau",
+    "Machine Learning", "ETL", "AWS", "GCP", "Azure", "Pandas", "TensorFlow", "UiPath",
+]
+
+
+def legacy_add_links(text: str, keywords) -> str:
+    """舊版做法：每次排序關鍵字，並對每個關鍵字執行一次 re.sub"""
+    result = text
+    for keyword in sorted(keywords, key=len, reverse=True):
+        pattern = r'\b' + re.escape(keyword) + r'\b'
+        result = re.sub(pattern, f'[[{keyword}]]', result, flags=re.IGNORECASE)
+    return result
+
+
+def build_vocabulary(size: int):
+    """產生測試用詞彙表（基本關鍵字加上隨機產生的技術名詞）"""
+    rng = random.Random(104)
+    vocabulary = set(BASE_KEYWORDS)
+    while len(vocabulary) < size:
+        length = rng.randint(3, 12)
+        word = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(length))
+        vocabulary.add(word.capitalize() if rng.random() < 0.5 else word.upper())
+    return vocabulary
+
+
+def build_texts(vocabulary, count: int):
+    """產生類似職缺說明的測試文字"""
+    rng = random.Random(9527)
+    words = list(vocabulary)
+    filler = ["負責", "資料", "開發", "維護", "具備", "經驗", "and", "with", "experience", "pipeline"]
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(words) if rng.random() < 0.2 else rng.choice(filler) for _ in range(300)]
+        texts.append(' '.join(tokens))
+    return texts
+
+
+def benchmark():
+    """執行效能比較"""
+    print("========== 技術名詞連結效能比較 ==========")
+    vocabulary = build_vocabulary(VOCABULARY_SIZE)
+    texts = build_texts(vocabulary, TEXT_COUNT)
+    print(f"詞彙表：{len(vocabulary)} 個關鍵字，測試文字：{len(texts)} 段（每段約 300 個詞）")
+    
+    started = time.perf_counter()
+    matcher = KeywordMatcher(sorted(vocabulary))
+    matcher.link("warm up")
+    build_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    new_results = [matcher.link(text) for text in texts]
+    new_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    legacy_results = [legacy_add_links(text, vocabulary) for text in texts]
+    legacy_seconds = time.perf_counter() - started
+    
+    print(f"舊版（逐一 re.sub）：{legacy_seconds:.2f} 秒（每段 {legacy_seconds / len(texts) * 1000:.1f} 毫秒）")
+    print(f"新版（Aho-Corasick）：{new_seconds:.3f} 秒（每段 {new_seconds / len(texts) * 1000:.2f} 毫秒），"
+          f"建立比對器 {build_seconds:.3f} 秒")
+    print(f"加速 {legacy_seconds / new_seconds:.0f} 倍")
+    
+    nested = sum(text.count('[[[[') for text in legacy_results)
+    same = sum(1 for a, b in zip(legacy_results, new_results) if a == b)
+    print(f"舊版產生的巢狀連結：{nested} 處；兩者結果相同的段落：{same}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    benchmark()
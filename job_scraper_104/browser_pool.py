@@ -0,0 +1,177 @@
+"""
+CDP 瀏覽器連線池模組
+在客戶端的生命週期內維持單一 Playwright / CDP 連線，
+並將分頁（tab）租借給呼叫端，Chrome 重啟時自動重新連線
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Set
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+class CDPBrowserPool:
+    """CDP 瀏覽器分頁池"""
+    
+    def __init__(
+        self,
+        cdp_url: str,
+        size: Optional[int] = None,
+        page_setup: Optional[Callable[[Page], Awaitable[None]]] = None
+    ):
+        """
+        初始化分頁池（第一次租借時才連線）
+        
+        Args:
+            cdp_url: CDP 連接 URL
+            size: 最多同時租借的分頁數（預設 config.CDP_POOL_SIZE）
+            page_setup: 新分頁建立後執行的初始化函式
+        """
+        self.cdp_url = cdp_url
+        self.size = size or config.CDP_POOL_SIZE
+        self.page_setup = page_setup
+        
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._pages: Set[Page] = set()   # 本池建立且仍屬於目前連線的分頁
+        self._idle: List[Page] = []      # 閒置可租借的分頁
+        
+        # asyncio 物件綁定於 event loop，於第一次使用時建立
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+    
+    def _bind_loop(self):
+        """綁定目前的 event loop，換了 loop 時捨棄舊的連線狀態"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        
+        if self._loop is not None:
+            # 舊 loop 已結束，其上的 Playwright 連線無法再使用
+            logger.info("偵測到新的 event loop，重新建立 CDP 連線")
+            self._reset()
+            self._playwright = None
+        
+        self._loop = loop
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.size)
+    
+    def _reset(self):
+        """清除目前連線的瀏覽器與分頁狀態"""
+        self._browser = None
+        self._context = None
+        self._pages.clear()
+        self._idle.clear()
+    
+    def _on_disconnected(self, browser: Browser):
+        """瀏覽器斷線（例如 Chrome 重啟）時清除狀態，下次租借會重新連線"""
+        if browser is self._browser:
+            logger.warning("CDP 連線已中斷，下次使用時將重新連線")
+            self._reset()
+    
+    @property
+    def is_connected(self) -> bool:
+        """是否已連線到瀏覽器"""
+        return self._browser is not None and self._browser.is_connected()
+    
+    async def _ensure_connected(self):
+        """確保已連線到 Chrome，斷線時依設定次數重試"""
+        async with self._lock:
+            if self.is_connected:
+                return
+            
+            self._reset()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            
+            last_error = None
+            for attempt in range(1, config.CDP_RECONNECT_ATTEMPTS + 1):
+                try:
+                    browser = await self._playwright.chromium.connect_over_cdp(self.cdp_url)
+                    break
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"CDP 連線失敗（第 {attempt}/{config.CDP_RECONNECT_ATTEMPTS} 次）：{e}")
+                    if attempt < config.CDP_RECONNECT_ATTEMPTS:
+                        await asyncio.sleep(config.CDP_RECONNECT_DELAY)
+            else:
+                raise ConnectionError(f"無法連線到 CDP：{self.cdp_url}") from last_error
+            
+            browser.on("disconnected", self._on_disconnected)
+            self._browser = browser
+            self._context = browser.contexts[0] if browser.contexts else await browser.new_context()
+            logger.info(f"已連線到 Chrome (CDP: {self.cdp_url})")
+    
+    async def _new_page(self) -> Page:
+        """在目前的 context 中開啟新分頁"""
+        page = await self._context.new_page()
+        if self.page_setup is not None:
+            await self.page_setup(page)
+        self._pages.add(page)
+        return page
+    
+    def _is_usable(self, page: Page) -> bool:
+        """分頁是否屬於目前連線且尚未關閉"""
+        return page in self._pages and not page.is_closed()
+    
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Page]:
+        """
+        租借一個分頁，離開 with 區塊時歸還
+        
+        Yields:
+            Playwright Page 物件
+        """
+        self._bind_loop()
+        async with self._slots:
+            await self._ensure_connected()
+            
+            page = None
+            while self._idle:
+                candidate = self._idle.pop()
+                if self._is_usable(candidate):
+                    page = candidate
+                    break
+            if page is None:
+                page = await self._new_page()
+            
+            try:
+                yield page
+            finally:
+                # 只歸還仍可使用的分頁；斷線前的分頁直接捨棄
+                if self._is_usable(page):
+                    self._idle.append(page)
+    
+    async def close(self):
+        """關閉本池開啟的分頁並中斷 CDP 連線（不會關閉 Chrome 本身）"""
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            # 連線建立於已結束的 event loop，無法再正常關閉
+            self._reset()
+            self._playwright = None
+            return
+        
+        for page in list(self._pages):
+            try:
+                if not page.is_closed():
+                    await page.close()
+            except Exception as e:
+                logger.debug(f"關閉分頁失敗：{e}")
+        
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug(f"中斷 CDP 連線失敗：{e}")
+        self._reset()
+        
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        
+        logger.info("CDP 分頁池已關閉")
@@ -0,0 +1,170 @@
+"""
+爬蟲檢查點模組
+以 JSONL 日誌記錄執行進度（已完成的列表頁、已交給詳情階段的職缺、已完成的職缺），
+定期 fsync 到磁碟；程式中斷後可用 --resume 從中斷處繼續，不重新抓取已完成的工作
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeState:
+    """從檢查點日誌還原的執行進度"""
+    
+    def __init__(self, keywords: List[str], max_jobs: int):
+        self.keywords = keywords
+        self.max_jobs = max_jobs
+        self.done_pages: Dict[str, Set[int]] = {keyword: set() for keyword in keywords}
+        self.done_jobs: Dict[str, Set[str]] = {keyword: set() for keyword in keywords}
+        self._cards: Dict[str, Dict] = {}
+        self._card_keyword: Dict[str, str] = {}
+    
+    def pending_cards(self) -> List[tuple]:
+        """
+        取得已從列表頁取得、但尚未完成的職缺
+        
+        Returns:
+            (關鍵字, 職缺卡片) 清單
+        """
+        done = set().union(*self.done_jobs.values()) if self.done_jobs else set()
+        return [
+            (self._card_keyword[job_id], card)
+            for job_id, card in self._cards.items()
+            if job_id not in done
+        ]
+
+
+class CrawlCheckpoint:
+    """爬蟲檢查點日誌"""
+    
+    def __init__(self, path: Optional[str] = None, fsync_interval: Optional[float] = None):
+        """
+        初始化檢查點
+        
+        Args:
+            path: 日誌檔案路徑（預設 config.CHECKPOINT_FILE）
+            fsync_interval: 兩次 fsync 之間的最長秒數（預設 config.CHECKPOINT_FSYNC_INTERVAL）
+        """
+        self.path = path or config.CHECKPOINT_FILE
+        self.fsync_interval = config.CHECKPOINT_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+        self._file = None
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+    
+    def load(self) -> Optional[ResumeState]:
+        """
+        讀取上次中斷的執行進度
+        
+        Returns:
+            執行進度，沒有可續跑的檢查點時回傳 None
+        """
+        if not os.path.exists(self.path):
+            return None
+        
+        state = None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 中斷時最後一行可能只寫了一半
+                        logger.warning("檢查點日誌最後一筆記錄不完整，已略過")
+                        continue
+                    
+                    kind = record.get('type')
+                    if kind == 'run':
+                        state = ResumeState(record['keywords'], record['max_jobs'])
+                    elif state is None or record.get('keyword') not in state.done_pages:
+                        continue
+                    elif kind == 'page':
+                        state.done_pages[record['keyword']].add(record['page'])
+                        for card in record['cards']:
+                            state._cards.setdefault(card['job_id'], card)
+                            state._card_keyword.setdefault(card['job_id'], record['keyword'])
+                    elif kind == 'job':
+                        state.done_jobs[record['keyword']].add(record['job_id'])
+        except Exception as e:
+            logger.error(f"讀取檢查點失敗：{e}")
+            return None
+        
+        if state is not None:
+            done = sum(len(job_ids) for job_ids in state.done_jobs.values())
+            logger.info(
+                f"已讀取檢查點：{len(state.keywords)} 個關鍵字，已完成 {done} 筆職缺，"
+                f"{len(state.pending_cards())} 筆職缺待處理"
+            )
+        return state
+    
+    def start(self, keywords: Sequence[str], max_jobs: int, resume: bool = False):
+        """
+        開始記錄（新的執行會清除舊日誌，續跑則接在舊日誌後面）
+        
+        Args:
+            keywords: 搜尋關鍵字清單
+            max_jobs: 每個關鍵字的最大職缺數
+            resume: 是否為續跑
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._append({'type': 'run', 'keywords': list(keywords), 'max_jobs': max_jobs}, sync=True)
+    
+    def _append(self, record: Dict, sync: bool = False):
+        """寫入一筆記錄，距離上次 fsync 超過間隔時同步到磁碟"""
+        if self._file is None:
+            return
+        
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            now = time.monotonic()
+            if sync or now - self._last_sync >= self.fsync_interval:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+    
+    def record_page(self, keyword: str, page: int, cards: List[Dict]):
+        """
+        記錄已完成的列表頁與交給詳情階段的職缺
+        
+        Args:
+            keyword: 搜尋關鍵字
+            page: 頁碼
+            cards: 本頁的新職缺卡片
+        """
+        self._append({'type': 'page', 'keyword': keyword, 'page': page, 'cards': cards})
+    
+    def record_job(self, keyword: str, job_id: str):
+        """
+        記錄已完成（已寫入筆記）的職缺
+        
+        Args:
+            keyword: 搜尋關鍵字
+            job_id: 職缺 ID
+        """
+        self._append({'type': 'job', 'keyword': keyword, 'job_id': job_id})
+    
+    def close(self):
+        """同步並關閉日誌（保留檔案供下次續跑）"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+    
+    def complete(self):
+        """執行完成，刪除日誌"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        logger.info("爬蟲執行完成，已清除檢查點")
@@ -11,15 +11,57 @@ KEYWORDS = ["資料工程", "資料分析", "RPA自動化","AI應用"]
 # ==================== 職缺數量設定 ====================
 # 每個關鍵字抓取的最大職缺數（預設 50，可調整）
 MAX_JOBS_PER_KEYWORD = 50
+# 每個關鍵字最多爬取的列表頁數
+MAX_PAGES_PER_KEYWORD = 10
+# 每個關鍵字同時進行中的列表頁數（預先抓取下一頁）
+LIST_PAGE_PREFETCH = 2
+# 提早停止翻頁：依日期排序時，整頁職缺都早於上次執行看到最新的更新日期即停止；
+# 依相關性排序時，連續 RELEVANCE_STALE_PAGE_LIMIT 頁沒有新職缺即停止（0 表示不限制）
+WATERMARK_EARLY_STOP = True
+RELEVANCE_STALE_PAGE_LIMIT = 3
 
 # ==================== 排序設定 ====================
 # 職缺排序方式："date" (最近更新) 或 "relevance" (相關性)
 SORT_BY = "relevance"  # 預設為「最近更新」
 
 # ==================== Rate Limiting ====================
-# 請求延遲時間（秒），使用隨機範圍避免被偵測
-REQUEST_DELAY_LIST = (3, 5)      # 列表頁延遲 3-5 秒
-REQUEST_DELAY_DETAIL = (1, 3)    # 詳情頁延遲 1-3 秒
+# 每類端點各自一個 token bucket，速率單位為「每秒請求數」
+# 回應正常時逐步加速（加法增加），遇到 429/403 或逾時立即減速（乘法減少）
+RATE_LIMITS = {
+    'list':   {'initial_rate': 0.25, 'min_rate': 0.1, 'max_rate': 1.0, 'burst': 1},  # 列表頁（約每 4 秒一次）
+    'detail': {'initial_rate': 0.5,  'min_rate': 0.2, 'max_rate': 5.0, 'burst': 2},  # 詳情頁（約每 2 秒一次）
+}
+RATE_LIMIT_SUCCESS_WINDOW = 10      # 連續成功幾次後加速一次
+RATE_LIMIT_INCREASE_STEP = 0.05     # 每次加速增加的速率（req/s）
+RATE_LIMIT_DECREASE_FACTOR = 0.5    # 被限流時速率乘上的倍數
+RATE_LIMIT_COOLDOWN = 5             # 兩次減速之間的最短間隔（秒）
+RATE_LIMIT_JITTER = 0.2             # 等待時間的隨機抖動比例，避免被偵測
+
+# ==================== 重試與斷路器 ====================
+# 逾時、連線錯誤、429/403 與 5xx 會以指數退避（full jitter）重試
+RETRY_MAX_ATTEMPTS = 3              # 每個請求最多嘗試次數（含第一次）
+RETRY_BASE_DELAY = 1.0              # 第一次重試的基準等待秒數，之後每次加倍
+RETRY_MAX_DELAY = 30.0              # 單次等待的上限秒數
+# 同一主機最近 CIRCUIT_WINDOW 個請求中失敗比例過高時，暫停所有請求一段時間
+CIRCUIT_WINDOW = 20
+CIRCUIT_MIN_REQUESTS = 8            # 視窗內至少有幾個請求才判斷失敗率
+CIRCUIT_FAILURE_RATIO = 0.5
+CIRCUIT_COOLDOWN = 60               # 斷路器開啟後暫停的秒數
+
+# ==================== 併發設定 ====================
+# 同時抓取職缺詳情的最大請求數（異步模式）
+DETAIL_CONCURRENCY = 5
+# 管線各階段之間的佇列上限（佇列滿時上游會等待）
+PIPELINE_QUEUE_SIZE = 20
+# 同時寫入筆記的 worker 數
+PIPELINE_WRITE_WORKERS = 2
+# 背景寫入筆記的執行緒數與尚未寫完的筆記上限（超過上限時管線才會等待）
+NOTE_WRITER_THREADS = 4
+NOTE_WRITER_MAX_PENDING = 100
+# 每篇筆記取代前先 fsync（在背景執行緒中進行，不影響爬取速度）
+NOTE_WRITER_FSYNC = True
+# 掃描筆記目錄（重建索引、統計報表）時平行讀取檔案的執行緒數
+VAULT_SCAN_THREADS = 8
 
 # ==================== 路徑設定 ====================
 # 取得專案根目錄（python 資料夾）
@@ -28,9 +70,35 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # Obsidian 筆記輸出路徑
 OUTPUT_DIR = r'C:\ObsidianVault\MyKnowledgeBase\jobs'
 
+# 輸出目的地："obsidian"（筆記）、"jsonl"（逐筆附加）、"parquet"（需安裝 pyarrow，每次執行一個檔案）
+# 職缺索引（去重與增量更新）由筆記寫入時記錄，因此一定會寫入 Obsidian 筆記，其他目的地為額外輸出
+OUTPUT_SINKS = ["obsidian"]
+EXPORT_DIR = os.path.join(BASE_DIR, "data", "exports")
+PARQUET_ROW_GROUP_SIZE = 500                # 每累積幾筆職缺寫入一個 row group
+
 # 技術關鍵字檔案路徑
 KEYWORDS_FILE = os.path.join(BASE_DIR, "data", "tech_keywords.yaml")
 LEARNED_KEYWORDS_FILE = os.path.join(BASE_DIR, "data", "learned_keywords.yaml")
+# 新學到的關鍵字先附加至日誌，每隔一段時間（秒）與執行結束時合併至 learned_keywords.yaml
+LEARNED_KEYWORDS_JOURNAL = os.path.join(BASE_DIR, "data", "learned_keywords.journal")
+LEARNED_KEYWORDS_COMPACT_INTERVAL = 300
+# 編譯好的詞彙快取（關鍵字集合與比對器），任一關鍵字 YAML 檔案變動時自動重建
+KEYWORD_CACHE_FILE = os.path.join(BASE_DIR, "data", "keyword_vocabulary.pickle")
+
+# 已儲存職缺的索引（SQLite），取代每次啟動時掃描筆記目錄
+JOB_INDEX_FILE = os.path.join(BASE_DIR, "data", "job_index.sqlite3")
+
+# 執行進度檢查點（中斷後可用 --resume 繼續），每隔幾秒同步到磁碟
+CHECKPOINT_FILE = os.path.join(BASE_DIR, "data", "crawl_checkpoint.jsonl")
+CHECKPOINT_FSYNC_INTERVAL = 2.0
+
+# ==================== 多 worker 設定 ====================
+# 共用工作佇列（多台機器分工時請放在共用儲存空間，例如網路磁碟）
+WORK_QUEUE_FILE = os.path.join(BASE_DIR, "data", "work_queue.sqlite3")
+WORK_LEASE_SECONDS = 120        # 任務租約秒數，worker 中斷時逾時後由其他 worker 接手
+WORK_MAX_ATTEMPTS = 3           # 每個任務最多嘗試次數
+WORK_POLL_INTERVAL = 2          # 沒有任務可做時的輪詢間隔（秒）
+WORKER_CONCURRENCY = 4          # 每個 worker 程序同時處理的任務數
 
 # ==================== 排程設定 ====================
 # 排程時間（預設早上 8:00，可調整）
@@ -39,6 +107,29 @@ SCHEDULE_TIME = "08:00"
 # ==================== 去重設定 ====================
 # 是否啟用職缺去重機制
 ENABLE_DEDUPLICATION = True
+# 增量更新：已抓取過的職缺若列表頁的更新日期（appearDate）較新，重新抓取詳情，內容有變更時才覆寫筆記
+INCREMENTAL_UPDATE = True
+
+# ==================== CDP 設定 ====================
+# 同時開啟的搜尋分頁數，也是列表頁的併發數（分頁由爬蟲自行建立，結束時關閉）
+CDP_POOL_SIZE = 3
+# Chrome 重啟或斷線時的重新連線次數與間隔（秒）
+CDP_RECONNECT_ATTEMPTS = 3
+CDP_RECONNECT_DELAY = 2
+# 每個搜尋頁面等待結果的最長秒數
+CDP_PAGE_TIMEOUT = 15
+# 搜尋頁面自己發出的搜尋 API（攔截其 JSON 回應作為頁面就緒訊號與資料來源）
+CDP_SEARCH_XHR_PATTERNS = ("/jobs/search/list", "/jobs/search/api/jobs")
+# 攔截不到搜尋 API 時，等待此選擇器出現後再掃描頁面連結
+CDP_JOB_CARD_SELECTOR = 'a[href*="/job/"]'
+
+# 精簡導航：攔截圖片、字型、影音與追蹤腳本，並關閉動畫（適合頻寬有限的環境）
+CDP_LEAN_NAVIGATION = False
+CDP_BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+CDP_BLOCKED_URL_PATTERNS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "facebook.net", "hotjar.com", "clarity.ms", "criteo",
+)
 
 # ==================== API 設定 ====================
 # 104 人力銀行 API 端點
@@ -46,10 +137,30 @@ API_BASE_URL = "https://www.104.com.tw"
 API_SEARCH_ENDPOINT = "/jobs/search/list"
 API_JOB_DETAIL_ENDPOINT = "/job/ajax/content"
 
+# 職缺列表抓取方式：
+#   "api" - 先透過 CDP 取得 Cookies，之後直接呼叫搜尋 API（失敗時改用 CDP）
+#   "cdp" - 每一頁都在 Chrome 中開啟搜尋頁面
+LIST_FETCH_MODE = "api"
+
+# 搜尋 API 的排序參數（對應 SORT_BY）
+SEARCH_ORDER = {"relevance": 15, "date": 16}
+
+# ==================== 快取設定 ====================
+# 職缺詳情 API 回應的磁碟快取（重跑時不必重新下載近期抓過的職缺）
+DETAIL_CACHE_ENABLED = True
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+DETAIL_CACHE_FILE = os.path.join(CACHE_DIR, "job_detail_cache.sqlite3")
+DETAIL_CACHE_TTL = 24 * 60 * 60                 # 快取有效時間（秒），過期後以 ETag / Last-Modified 驗證
+DETAIL_CACHE_MAX_BYTES = 200 * 1024 * 1024      # 快取容量上限，超過時淘汰最久未使用的項目
+
 # ==================== 日誌設定 ====================
 # 日誌檔案路徑
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 LOG_FILE = os.path.join(LOG_DIR, "scraper.log")
+# 完整導航的平均傳輸量基準（用來估算精簡導航節省的流量）
+CDP_NAVIGATION_BASELINE_FILE = os.path.join(LOG_DIR, "navigation_baseline.json")
+# 重試後仍失敗的職缺與列表頁（執行結束前會再重試一次）
+DEAD_LETTER_FILE = os.path.join(LOG_DIR, "dead_letters.jsonl")
 
 # 確保日誌目錄存在
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -0,0 +1,387 @@
+"""
+爬蟲管線模組
+以 asyncio 佇列串接四個階段：列表頁 → 職缺詳情 → 技術名詞連結 → 筆記寫入，
+各階段有獨立的併發數，佇列有上限以提供背壓，職缺完成後立即寫入筆記（及其他輸出目的地）；
+重試後仍失敗的任務於管線結束前再重試一次。
+已抓取過的職缺若列表頁的更新日期較新，會重新抓取詳情，內容有變更時才覆寫筆記
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Set
+from .api_client import Job104APIClient
+from .checkpoint import CrawlCheckpoint, ResumeState
+from .crawl_scheduler import ListCrawlScheduler
+from .job_index import JobIndex, normalize_appear_date
+from .keyword_linker import KeywordLinker
+from .obsidian_formatter import ObsidianFormatter
+from .output_sinks import ObsidianSink, OutputSink, write_all
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 佇列結束訊號
+_STOP = object()
+
+
+class _StageStats:
+    """單一階段的處理統計"""
+    
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_seconds = 0.0
+    
+    def log(self, wall_seconds: float):
+        """輸出階段使用率（忙碌時間 / (worker 數 × 總時間)）"""
+        capacity = self.workers * wall_seconds
+        utilization = self.busy_seconds / capacity * 100 if capacity else 0.0
+        logger.info(
+            f"階段「{self.name}」：處理 {self.items} 筆，{self.workers} 個 worker，"
+            f"忙碌 {self.busy_seconds:.1f} 秒，使用率 {utilization:.0f}%"
+        )
+
+
+class _KeywordProgress:
+    """單一關鍵字在管線中的進度"""
+    
+    def __init__(self, max_jobs: int, resumed: int = 0):
+        self.max_jobs = max_jobs - resumed    # 扣除續跑前已完成的職缺數
+        self.reserved = 0      # 已開始或已完成抓取詳情的職缺數
+        self.jobs: List[Dict] = []
+        self.updated = 0       # 重新抓取的已更新職缺數（不計入 max_jobs）
+
+
+class CrawlPipeline:
+    """列表 → 詳情 → 連結 → 寫入 的爬蟲管線"""
+    
+    def __init__(
+        self,
+        api_client: Job104APIClient,
+        keyword_linker: KeywordLinker,
+        formatter: ObsidianFormatter,
+        scraped_job_ids: Set[str],
+        job_index: Optional[JobIndex] = None
+    ):
+        """
+        初始化管線
+        
+        Args:
+            api_client: API 客戶端
+            keyword_linker: 技術名詞連結器
+            formatter: Obsidian 筆記格式化器
+            scraped_job_ids: 已抓取的職缺 ID（去重用，管線完成職缺時會加入）
+            job_index: 職缺索引（增量更新時比對更新日期，None 表示不做增量更新）
+        """
+        self.api_client = api_client
+        self.keyword_linker = keyword_linker
+        self.formatter = formatter
+        self.scraped_job_ids = scraped_job_ids
+        self.job_index = job_index
+        self._known_appear_dates: Dict[str, str] = {}
+    
+    def _is_new_job(self, card: Dict) -> bool:
+        """判斷列表頁的職缺是否尚未抓取過"""
+        return not (config.ENABLE_DEDUPLICATION and card['job_id'] in self.scraped_job_ids)
+    
+    def _is_updated_job(self, card: Dict) -> bool:
+        """判斷已抓取過的職缺是否在上次抓取後更新過（列表頁的更新日期較新）"""
+        known = self._known_appear_dates.get(card['job_id'])
+        appear_date = normalize_appear_date(card.get('appear_date'))
+        return known is not None and appear_date is not None and appear_date > known
+    
+    def _needs_fetch(self, card: Dict) -> bool:
+        """判斷列表頁的職缺是否需要抓取詳情（新職缺或已更新的職缺）"""
+        return self._is_new_job(card) or self._is_updated_job(card)
+    
+    def _update_watermarks(self, scheduler: ListCrawlScheduler, detail_failed: Set[str]):
+        """
+        儲存本次完整爬過的關鍵字水位線（只在依日期排序時記錄）
+        有列表頁或職缺詳情抓取失敗的關鍵字不更新，以免下次執行略過漏抓的職缺
+        
+        Args:
+            scheduler: 本次執行的列表排程器
+            detail_failed: 有職缺詳情抓取失敗的關鍵字
+        """
+        if self.job_index is None or config.SORT_BY != "date":
+            return
+        
+        failed_keywords = {key.rsplit('#', 1)[0] for key in self.api_client.dead_letters.keys('list')}
+        failed_keywords |= detail_failed
+        watermarks = {
+            keyword: appear_date
+            for keyword, appear_date in scheduler.completed_watermarks().items()
+            if keyword not in failed_keywords
+        }
+        self.job_index.update_watermarks(watermarks, sort_by=config.SORT_BY)
+    
+    async def _retry_dead_letters(
+        self,
+        progress: Dict[str, _KeywordProgress],
+        failed_jobs: Dict[str, str],
+        save_notes: bool,
+        sinks: Sequence[OutputSink],
+        checkpoint: Optional[CrawlCheckpoint] = None
+    ):
+        """
+        重試 dead-letter 清單中的列表頁與職缺詳情（此時其他請求已完成，主機壓力較低）
+        
+        Args:
+            progress: 關鍵字 → 進度
+            failed_jobs: 詳情抓取失敗的職缺 ID → 關鍵字
+            save_notes: 是否輸出職缺
+            sinks: 輸出目的地
+            checkpoint: 檢查點日誌（重試成功的職缺寫入後記錄為完成）
+        """
+        dead_letters = self.api_client.dead_letters
+        # 只取出要重試的任務（例如已更新職缺的重新抓取不重試），其餘留在清單中寫入日誌
+        retry_items = [
+            (failed_jobs[item['key']], {'job_id': item['key']})
+            for item in dead_letters.drain('detail', keys=failed_jobs)
+        ]
+        
+        list_keys = [key for key in dead_letters.keys('list') if key.rsplit('#', 1)[0] in progress]
+        for item in dead_letters.drain('list', keys=list_keys):
+            keyword, page = item['key'].rsplit('#', 1)
+            logger.info(f"重試列表頁：「{keyword}」第 {page} 頁")
+            cards = await self.api_client.list_jobs(keyword, int(page))
+            retry_items += [(keyword, card) for card in cards if self._is_new_job(card)]
+        
+        if not retry_items:
+            return
+        logger.info(f"重試 {len(retry_items)} 個先前失敗的職缺...")
+        
+        async def retry(keyword: str, job_id: str):
+            state = progress[keyword]
+            if state.reserved >= state.max_jobs or job_id in self.scraped_job_ids:
+                return
+            state.reserved += 1
+            job_data = await self.api_client.get_job_detail_async(job_id)
+            if not job_data:
+                state.reserved -= 1
+                return
+            
+            try:
+                job_data = await asyncio.to_thread(self.keyword_linker.process_job_data, job_data)
+            except Exception as e:
+                logger.error(f"處理技術名詞連結時發生錯誤（{job_id}）：{e}")
+            state.jobs.append(job_data)
+            self.scraped_job_ids.add(job_id)
+            logger.info(f"[{keyword}] 重試成功：{job_data['title']}")
+            
+            if save_notes:
+                on_written = None
+                if checkpoint is not None:
+                    on_written = functools.partial(checkpoint.record_job, keyword, job_id)
+                await asyncio.to_thread(write_all, sinks, job_data, keyword, False, on_written)
+        
+        seen: Set[str] = set()
+        tasks = []
+        for keyword, card in retry_items:
+            if card['job_id'] not in seen:
+                seen.add(card['job_id'])
+                tasks.append(retry(keyword, card['job_id']))
+        await asyncio.gather(*tasks)
+    
+    async def run(
+        self,
+        keywords: Sequence[str],
+        max_jobs: int,
+        save_notes: bool = True,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        resume_state: Optional[ResumeState] = None,
+        sinks: Optional[Sequence[OutputSink]] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        執行管線直到所有關鍵字完成
+        
+        Args:
+            keywords: 搜尋關鍵字清單
+            max_jobs: 每個關鍵字的最大職缺數
+            save_notes: 是否輸出職缺（寫入筆記與其他輸出目的地）
+            checkpoint: 檢查點日誌（記錄已完成的列表頁與職缺）
+            resume_state: 從檢查點還原的進度（續跑時略過已完成的工作）
+            sinks: 輸出目的地（預設只寫入 Obsidian 筆記；由呼叫端負責關閉）
+        
+        Returns:
+            關鍵字 → 本次完成的職缺資料清單
+        """
+        if sinks is None:
+            sinks = [ObsidianSink(self.formatter)]
+        detail_queue: asyncio.Queue = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        link_queue: asyncio.Queue = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        
+        done_jobs = resume_state.done_jobs if resume_state else {}
+        progress = {
+            keyword: _KeywordProgress(max_jobs, resumed=len(done_jobs.get(keyword, ())))
+            for keyword in keywords
+        }
+        # 續跑時名額已滿的關鍵字不再翻頁
+        list_keywords = [keyword for keyword in keywords if progress[keyword].max_jobs > 0]
+        if config.INCREMENTAL_UPDATE and config.ENABLE_DEDUPLICATION and self.job_index is not None:
+            self._known_appear_dates = self.job_index.appear_dates()
+        claimed_ids: Set[str] = set()   # 已交給詳情階段的職缺（跨關鍵字去重）
+        failed_jobs: Dict[str, str] = {}  # 詳情抓取失敗的職缺 → 關鍵字（供最後重試）
+        detail_failed: Set[str] = set()   # 有詳情抓取失敗（含已更新職缺）的關鍵字（不更新水位線）
+        
+        list_workers = config.CDP_POOL_SIZE
+        detail_workers = config.DETAIL_CONCURRENCY
+        write_workers = config.PIPELINE_WRITE_WORKERS if save_notes else 0
+        stats = {
+            'list': _StageStats("列表頁", list_workers),
+            'detail': _StageStats("職缺詳情", detail_workers),
+            'link': _StageStats("技術名詞連結", 1),
+        }
+        if save_notes:
+            stats['write'] = _StageStats("筆記寫入", write_workers)
+        
+        async def on_page(keyword: str, page: int, cards: List[Dict]):
+            if checkpoint is not None:
+                checkpoint.record_page(keyword, page, cards)
+            for card in cards:
+                await detail_queue.put((keyword, card))
+        
+        scheduler = ListCrawlScheduler(
+            self.api_client.list_jobs,
+            workers=list_workers,
+            is_new=self._needs_fetch,
+            on_page=on_page,
+            watermarks=self.job_index.watermarks(config.SORT_BY) if self.job_index is not None else None,
+            done_pages=resume_state.done_pages if resume_state else None,
+        )
+        
+        async def list_stage():
+            try:
+                if resume_state is not None:
+                    # 先處理中斷前已取得、但尚未完成的職缺
+                    for keyword, card in resume_state.pending_cards():
+                        if keyword in progress:
+                            await detail_queue.put((keyword, card))
+                await scheduler.run(list_keywords, max_jobs)
+            finally:
+                stats['list'].items = scheduler.stats['pages']
+                stats['list'].busy_seconds = scheduler.stats['busy_seconds']
+                for _ in range(detail_workers):
+                    await detail_queue.put(_STOP)
+        
+        async def detail_worker():
+            while True:
+                item = await detail_queue.get()
+                if item is _STOP:
+                    break
+                
+                keyword, card = item
+                job_id = card['job_id']
+                state = progress[keyword]
+                if job_id in claimed_ids or not self._needs_fetch(card):
+                    continue
+                # 已更新的職缺不佔用新職缺的名額
+                updated = not self._is_new_job(card)
+                if not updated and state.reserved >= state.max_jobs:
+                    continue
+                
+                claimed_ids.add(job_id)
+                if not updated:
+                    state.reserved += 1
+                started = time.monotonic()
+                try:
+                    job_data = await self.api_client.get_job_detail_async(job_id, revalidate=updated)
+                except Exception as e:
+                    logger.error(f"取得職缺詳情時發生錯誤（{job_id}）：{e}")
+                    job_data = None
+                stats['detail'].busy_seconds += time.monotonic() - started
+                stats['detail'].items += 1
+                
+                if not job_data:
+                    logger.warning(f"無法取得職缺詳情：{job_id}")
+                    detail_failed.add(keyword)
+                    if not updated:
+                        failed_jobs[job_id] = keyword
+                        state.reserved -= 1
+                    continue
+                
+                await link_queue.put((keyword, job_data, updated))
+            
+            await link_queue.put(_STOP)
+        
+        async def link_stage():
+            stopped = 0
+            while stopped < detail_workers:
+                item = await link_queue.get()
+                if item is _STOP:
+                    stopped += 1
+                    continue
+                
+                keyword, job_data, updated = item
+                state = progress[keyword]
+                started = time.monotonic()
+                try:
+                    # 技術名詞處理（加上連結並學習新關鍵字）；檔案鎖與日誌合併會阻塞，移至執行緒執行
+                    job_data = await asyncio.to_thread(self.keyword_linker.process_job_data, job_data)
+                except Exception as e:
+                    logger.error(f"處理技術名詞連結時發生錯誤（{job_data['job_id']}）：{e}")
+                stats['link'].busy_seconds += time.monotonic() - started
+                stats['link'].items += 1
+                
+                if updated:
+                    state.updated += 1
+                    logger.info(f"[{keyword}] 職缺已更新，重新抓取：{job_data['title']}")
+                else:
+                    state.jobs.append(job_data)
+                    self.scraped_job_ids.add(job_data['job_id'])
+                    logger.info(f"[{keyword}] 已抓取 {len(state.jobs)}/{max_jobs} 筆職缺：{job_data['title']}")
+                    if len(state.jobs) >= state.max_jobs:
+                        scheduler.finish(keyword)
+                
+                if save_notes:
+                    await write_queue.put((keyword, job_data, updated))
+            
+            for _ in range(write_workers):
+                await write_queue.put(_STOP)
+        
+        async def write_worker():
+            while True:
+                item = await write_queue.get()
+                if item is _STOP:
+                    break
+                
+                keyword, job_data, updated = item
+                started = time.monotonic()
+                # 筆記格式化後交給背景寫入器；寫入器已滿時在執行緒中等待，不會卡住 event loop
+                # 檢查點在筆記實際寫入磁碟後才記錄為完成，中斷時尚未寫入的職缺續跑會重新處理
+                on_written = None
+                if checkpoint is not None and not updated:
+                    on_written = functools.partial(checkpoint.record_job, keyword, job_data['job_id'])
+                await asyncio.to_thread(write_all, sinks, job_data, keyword, updated, on_written)
+                stats['write'].busy_seconds += time.monotonic() - started
+                stats['write'].items += 1
+        
+        run_started = time.monotonic()
+        tasks = [asyncio.create_task(list_stage())]
+        tasks += [asyncio.create_task(detail_worker()) for _ in range(detail_workers)]
+        tasks.append(asyncio.create_task(link_stage()))
+        tasks += [asyncio.create_task(write_worker()) for _ in range(write_workers)]
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        wall_seconds = time.monotonic() - run_started
+        logger.info(f"管線執行完成，總耗時 {wall_seconds:.1f} 秒")
+        for stage in stats.values():
+            stage.log(wall_seconds)
+        
+        self._update_watermarks(scheduler, detail_failed)
+        await self._retry_dead_letters(progress, failed_jobs, save_notes, sinks, checkpoint)
+        self.api_client.dead_letters.persist()
+        
+        for keyword in keywords:
+            state = progress[keyword]
+            logger.info(f"關鍵字「{keyword}」已完成，共 {len(state.jobs)} 筆新職缺，{state.updated} 筆已更新職缺")
+        return {keyword: progress[keyword].jobs for keyword in keywords}
@@ -0,0 +1,282 @@
+"""
+列表頁爬取排程模組
+將 (關鍵字, 頁碼) 列表任務分派給多個分頁併發抓取，
+再依關鍵字合併結果（請求速率仍由共用的速率限制器控制）；
+依上次執行的水位線（最新的職缺更新日期）提早停止翻頁
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Set
+from .job_index import normalize_appear_date
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 列表抓取函式：(關鍵字, 頁碼) → 職缺卡片清單
+ListFetcher = Callable[[str, int], Awaitable[List[Dict]]]
+# 每頁完成時的回呼：(關鍵字, 頁碼, 本頁新職缺卡片（可能為空）)
+PageCallback = Callable[[str, int, List[Dict]], Awaitable[None]]
+
+
+class _KeywordState:
+    """單一關鍵字的翻頁狀態"""
+    
+    def __init__(self, keyword: str, max_jobs: int):
+        self.keyword = keyword
+        self.max_jobs = max_jobs
+        self.next_page = 1
+        self.in_flight: Set[int] = set()
+        self.pages: Dict[int, List[Dict]] = {}
+        self.last_page: Optional[int] = None   # 第一個沒有職缺的頁碼
+        self.new_job_ids: Set[str] = set()
+        self.finished = False
+        self.stopped_by_quota = False
+        self.stopped_by_max_pages = False       # 翻到最大頁數仍未看完所有職缺
+        self.stale_pages: Set[int] = set()      # 沒有任何新職缺的頁碼
+        self.newest_date: Optional[str] = None  # 本次看到最新的更新日期（YYYYMMDD）
+
+
+class ListCrawlScheduler:
+    """多分頁列表爬取排程器"""
+    
+    def __init__(
+        self,
+        list_fetcher: ListFetcher,
+        workers: Optional[int] = None,
+        max_pages: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        is_new: Optional[Callable[[Dict], bool]] = None,
+        on_page: Optional[PageCallback] = None,
+        watermarks: Optional[Dict[str, str]] = None,
+        done_pages: Optional[Dict[str, Set[int]]] = None
+    ):
+        """
+        初始化排程器
+        
+        Args:
+            list_fetcher: 抓取一頁列表的函式（例如 Job104APIClient.list_jobs）
+            workers: 同時抓取的列表頁數（預設 config.CDP_POOL_SIZE，即分頁數）
+            max_pages: 每個關鍵字最多爬取的頁數（預設 config.MAX_PAGES_PER_KEYWORD）
+            prefetch: 每個關鍵字同時進行中的頁數（預設 config.LIST_PAGE_PREFETCH）
+            is_new: 判斷職缺卡片是否尚未抓取過（預設全部視為新職缺）
+            on_page: 每個有職缺的頁面完成時呼叫（本頁新職缺可能為空），可將新職缺直接交給下一個處理階段
+            watermarks: 關鍵字 → 上次執行看到最新的更新日期（依日期排序時用來提早停止）
+            done_pages: 關鍵字 → 已完成的頁碼（從檢查點續跑時略過）
+        """
+        self.list_fetcher = list_fetcher
+        self.workers = workers or config.CDP_POOL_SIZE
+        self.max_pages = max_pages or config.MAX_PAGES_PER_KEYWORD
+        self.prefetch = prefetch or config.LIST_PAGE_PREFETCH
+        self.is_new = is_new or (lambda card: True)
+        self.on_page = on_page
+        self.watermarks = watermarks or {}
+        self.done_pages = done_pages or {}
+        self._states: Dict[str, _KeywordState] = {}
+        self.stats = {'pages': 0, 'busy_seconds': 0.0}
+    
+    def _schedule_pages(self, state: _KeywordState, queue: asyncio.Queue) -> int:
+        """
+        為關鍵字排入後續頁面，使進行中的頁數維持在 prefetch 以內
+        
+        Returns:
+            新排入的任務數
+        """
+        scheduled = 0
+        done_pages = self.done_pages.get(state.keyword, ())
+        while (
+            not state.finished
+            and len(state.in_flight) < self.prefetch
+            and state.next_page <= self.max_pages
+            and (state.last_page is None or state.next_page < state.last_page)
+        ):
+            if state.next_page in done_pages:
+                state.next_page += 1
+                continue
+            state.in_flight.add(state.next_page)
+            queue.put_nowait((state.keyword, state.next_page))
+            state.next_page += 1
+            scheduled += 1
+        return scheduled
+    
+    def finish(self, keyword: str):
+        """
+        停止指定關鍵字的翻頁（例如下游已取得足夠的職缺）
+        
+        Args:
+            keyword: 搜尋關鍵字
+        """
+        state = self._states.get(keyword)
+        if state is not None and not state.finished:
+            state.finished = True
+            state.stopped_by_quota = True
+            logger.info(f"「{keyword}」已取得足夠職缺，停止翻頁")
+    
+    def _handle_page(self, state: _KeywordState, page: int, cards: List[Dict]) -> List[Dict]:
+        """
+        記錄一頁的結果並判斷該關鍵字是否已完成
+        
+        Returns:
+            本頁的新職缺卡片
+        """
+        state.in_flight.discard(page)
+        state.pages[page] = cards
+        
+        if not cards:
+            logger.warning(f"「{state.keyword}」第 {page} 頁無職缺，停止翻頁")
+            state.last_page = page if state.last_page is None else min(state.last_page, page)
+        
+        new_cards = []
+        for card in cards:
+            if card['job_id'] not in state.new_job_ids and self.is_new(card):
+                state.new_job_ids.add(card['job_id'])
+                new_cards.append(card)
+        
+        if cards and not new_cards:
+            # 相關性排序時新職缺可能在後面，不立即停止
+            logger.info(f"「{state.keyword}」第 {page} 頁所有職缺皆已抓取過")
+            state.stale_pages.add(page)
+        
+        dates = [normalize_appear_date(card.get('appear_date')) for card in cards]
+        known_dates = [date for date in dates if date]
+        if known_dates:
+            state.newest_date = max(known_dates + ([state.newest_date] if state.newest_date else []))
+        
+        if self.on_page is None and len(state.new_job_ids) >= state.max_jobs:
+            # 有 on_page 時由下游依實際完成的職缺數呼叫 finish()
+            state.finished = True
+            state.stopped_by_quota = True
+        elif config.WATERMARK_EARLY_STOP and not state.finished and self._below_watermark(state, page, dates):
+            state.finished = True
+        elif state.last_page is None and state.next_page > self.max_pages and not state.in_flight:
+            state.stopped_by_max_pages = True
+            logger.warning(f"「{state.keyword}」已達最大頁數限制（{self.max_pages} 頁），停止爬取")
+        
+        return new_cards
+    
+    def _below_watermark(self, state: _KeywordState, page: int, dates: List[Optional[str]]) -> bool:
+        """
+        判斷是否可以提早停止翻頁
+        依日期排序：本頁所有職缺都早於水位線（之後的頁面只會更舊）；
+        依相關性排序：連續 RELEVANCE_STALE_PAGE_LIMIT 頁都沒有新職缺
+        """
+        if config.SORT_BY == "date":
+            watermark = self.watermarks.get(state.keyword)
+            if watermark and dates and all(date and date < watermark for date in dates):
+                logger.info(f"「{state.keyword}」第 {page} 頁的職缺皆早於上次執行（{watermark}），停止翻頁")
+                return True
+            return False
+        
+        limit = config.RELEVANCE_STALE_PAGE_LIMIT
+        if limit and all(p in state.stale_pages for p in range(page - limit + 1, page + 1)):
+            logger.info(f"「{state.keyword}」連續 {limit} 頁沒有新職缺，停止翻頁")
+            return True
+        return False
+    
+    def completed_watermarks(self) -> Dict[str, str]:
+        """
+        取得可以更新水位線的關鍵字（未因名額已滿或達到最大頁數而中途停止，
+        代表本次已看過水位線之後的所有職缺）
+        
+        Returns:
+            關鍵字 → 本次看到最新的更新日期
+        """
+        return {
+            keyword: state.newest_date
+            for keyword, state in self._states.items()
+            if state.newest_date and not state.stopped_by_quota and not state.stopped_by_max_pages
+        }
+    
+    def _merge(self, states: List[_KeywordState]) -> Dict[str, List[Dict]]:
+        """
+        依頁碼順序合併各關鍵字的職缺卡片
+        同一職缺出現在多個關鍵字時，只保留在 KEYWORDS 順序中第一個關鍵字
+        
+        Returns:
+            關鍵字 → 新職缺卡片清單（最多 max_jobs 筆）
+        """
+        claimed: Set[str] = set()
+        results: Dict[str, List[Dict]] = {}
+        for state in states:
+            merged = []
+            for page in sorted(state.pages):
+                if state.last_page is not None and page > state.last_page:
+                    break
+                for card in state.pages[page]:
+                    if len(merged) >= state.max_jobs:
+                        break
+                    if card['job_id'] in claimed or not self.is_new(card):
+                        continue
+                    claimed.add(card['job_id'])
+                    merged.append(card)
+            results[state.keyword] = merged
+        return results
+    
+    async def run(self, keywords: Sequence[str], max_jobs: int) -> Dict[str, List[Dict]]:
+        """
+        併發爬取所有關鍵字的列表頁
+        
+        Args:
+            keywords: 搜尋關鍵字清單
+            max_jobs: 每個關鍵字需要的新職缺數
+        
+        Returns:
+            關鍵字 → 新職缺卡片清單（依頁碼順序）
+        """
+        states = [_KeywordState(keyword, max_jobs) for keyword in keywords]
+        state_by_keyword = {state.keyword: state for state in states}
+        self._states = state_by_keyword
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        pending = sum(self._schedule_pages(state, queue) for state in states)
+        if not pending:
+            return self._merge(states)
+        
+        done = asyncio.Event()
+        
+        async def worker(worker_id: int):
+            nonlocal pending
+            while not done.is_set():
+                keyword, page = await queue.get()
+                state = state_by_keyword[keyword]
+                try:
+                    if state.finished:
+                        state.in_flight.discard(page)
+                        continue
+                    
+                    logger.info(f"[分頁 {worker_id}] 正在爬取「{keyword}」第 {page} 頁...")
+                    started = time.monotonic()
+                    try:
+                        cards = await self.list_fetcher(keyword, page)
+                    except Exception as e:
+                        logger.error(f"爬取「{keyword}」第 {page} 頁時發生錯誤：{e}")
+                        cards = []
+                    self.stats['pages'] += 1
+                    self.stats['busy_seconds'] += time.monotonic() - started
+                    
+                    new_cards = self._handle_page(state, page, cards)
+                    pending += self._schedule_pages(state, queue)
+                    if self.on_page is not None and cards:
+                        # 本頁沒有新職缺也通知，檢查點才會記錄為已完成（沒有職缺的頁面可能是抓取失敗，不通知）；
+                        # 下游佇列已滿時會在此等待（背壓），列表抓取自然放慢
+                        await self.on_page(keyword, page, new_cards)
+                finally:
+                    pending -= 1
+                    queue.task_done()
+                    if pending == 0:
+                        done.set()
+        
+        tasks = [asyncio.create_task(worker(i + 1)) for i in range(self.workers)]
+        try:
+            await done.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = self._merge(states)
+        if self.on_page is None:
+            for keyword, cards in results.items():
+                logger.info(f"「{keyword}」列表爬取完成，共 {len(cards)} 筆新職缺")
+        return results
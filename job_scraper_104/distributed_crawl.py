@@ -0,0 +1,183 @@
+"""
+多 worker 分散式爬取模組
+協調者（coordinator）建立共用工作佇列並將 worker 的結果合併寫入 Obsidian；
+worker 可在多台機器上執行（各自使用自己的 Chrome 與 IP），
+從佇列租用列表頁與職缺詳情任務，只負責抓取資料
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Dict, List, Optional, Sequence
+from .api_client import Job104APIClient
+from .keyword_linker import KeywordLinker
+from .obsidian_formatter import ObsidianFormatter
+from .output_sinks import ObsidianSink, OutputSink, write_all
+from .work_queue import WorkQueue
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """預設的 worker 識別名稱（主機名稱-程序 ID）"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CrawlWorker:
+    """從共用佇列租用任務並抓取資料的 worker"""
+    
+    def __init__(self, api_client: Job104APIClient, queue: WorkQueue, worker_id: Optional[str] = None):
+        """
+        初始化 worker
+        
+        Args:
+            api_client: API 客戶端（使用本機的 Chrome CDP）
+            queue: 共用工作佇列
+            worker_id: worker 識別名稱（預設 主機名稱-程序 ID）
+        """
+        self.api_client = api_client
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.stats = {'list': 0, 'detail': 0, 'failed': 0}
+    
+    async def _run_task(self, task: Dict, owner: str):
+        """執行一個任務並回報結果"""
+        keyword = task['keyword']
+        if task['kind'] == 'list':
+            page = task['payload']['page']
+            cards = await self.api_client.list_jobs(keyword, page)
+            # 只取出本任務的失敗記錄（同一程序的其他 slot 可能正在處理別的任務）
+            if self.api_client.dead_letters.drain('list', keys=[f"{keyword}#{page}"]):
+                # 本機重試後仍失敗，放回佇列交給其他 worker（可能使用不同的 IP）
+                await asyncio.to_thread(self.queue.fail, task, owner, "列表頁抓取失敗")
+                self.stats['failed'] += 1
+                return
+            added = await asyncio.to_thread(self.queue.add_page_results, keyword, page, cards)
+            await asyncio.to_thread(self.queue.complete, task, owner)
+            self.stats['list'] += 1
+            logger.info(f"[{owner}] 「{keyword}」第 {page} 頁完成，新增 {added} 個職缺任務")
+            return
+        
+        job_id = task['key']
+        job_data = await self.api_client.get_job_detail_async(job_id)
+        self.api_client.dead_letters.drain('detail', keys=[job_id])
+        if not job_data:
+            await asyncio.to_thread(self.queue.fail, task, owner, "無法取得職缺詳情")
+            self.stats['failed'] += 1
+            return
+        
+        if await asyncio.to_thread(self.queue.complete, task, owner, job_data):
+            self.stats['detail'] += 1
+            logger.info(f"[{owner}] 已抓取職缺：{job_data['title']}")
+        else:
+            logger.warning(f"[{owner}] 職缺 {job_id} 的租約已過期，結果由其他 worker 回報")
+    
+    async def _lease_loop(self, slot: int):
+        """單一租用迴圈：持續取得任務直到佇列清空"""
+        owner = f"{self.worker_id}#{slot}"
+        while True:
+            task = await asyncio.to_thread(self.queue.lease, owner)
+            if task is None:
+                if await asyncio.to_thread(self.queue.is_drained):
+                    return
+                # 其他 worker 的任務仍在進行中，可能還會產生新任務
+                await asyncio.sleep(config.WORK_POLL_INTERVAL)
+                continue
+            
+            try:
+                await self._run_task(task, owner)
+            except Exception as e:
+                logger.error(f"[{owner}] 執行任務 {task['kind']} {task['key']} 時發生錯誤：{e}")
+                await asyncio.to_thread(self.queue.fail, task, owner, str(e))
+                self.stats['failed'] += 1
+    
+    async def run(self):
+        """執行 worker 直到佇列中沒有剩餘任務"""
+        logger.info(f"Worker {self.worker_id} 開始執行（{config.WORKER_CONCURRENCY} 個租用迴圈）")
+        try:
+            await asyncio.gather(*(self._lease_loop(slot + 1) for slot in range(config.WORKER_CONCURRENCY)))
+        finally:
+            logger.info(
+                f"Worker {self.worker_id} 結束：列表頁 {self.stats['list']} 頁，"
+                f"職缺 {self.stats['detail']} 筆，失敗 {self.stats['failed']} 次"
+            )
+            self.api_client.log_stats()
+            await self.api_client.aclose()
+
+
+class CrawlCoordinator:
+    """建立工作佇列並將 worker 的結果合併寫入 Obsidian 的協調者"""
+    
+    def __init__(
+        self,
+        queue: WorkQueue,
+        keyword_linker: KeywordLinker,
+        formatter: ObsidianFormatter,
+        scraped_job_ids: set,
+        sinks: Optional[Sequence[OutputSink]] = None
+    ):
+        """
+        初始化協調者
+        
+        Args:
+            queue: 共用工作佇列
+            keyword_linker: 技術名詞連結器（只在協調者上學習新關鍵字，避免多個程序同時寫入）
+            formatter: Obsidian 筆記格式化器
+            scraped_job_ids: 已抓取的職缺 ID
+            sinks: 輸出目的地（預設只寫入 Obsidian 筆記；由呼叫端負責關閉）
+        """
+        self.queue = queue
+        self.keyword_linker = keyword_linker
+        self.formatter = formatter
+        self.scraped_job_ids = scraped_job_ids
+        self.sinks = list(sinks) if sinks is not None else [ObsidianSink(formatter)]
+    
+    def _merge(self, results: List[Dict]) -> int:
+        """將 worker 抓取的職缺加上技術名詞連結並輸出至各目的地"""
+        saved = 0
+        for item in results:
+            keyword, job_data = item['keyword'], item['job_data']
+            if job_data['job_id'] in self.scraped_job_ids:
+                continue
+            try:
+                job_data = self.keyword_linker.process_job_data(job_data)
+            except Exception as e:
+                logger.error(f"處理技術名詞連結時發生錯誤（{job_data['job_id']}）：{e}")
+            if write_all(self.sinks, job_data, keyword):
+                self.scraped_job_ids.add(job_data['job_id'])
+                saved += 1
+        return saved
+    
+    def run(self, keywords: Optional[List[str]] = None, max_jobs: Optional[int] = None) -> Dict[str, int]:
+        """
+        建立工作佇列，持續合併結果直到所有任務完成
+        
+        Args:
+            keywords: 搜尋關鍵字清單（預設 config.KEYWORDS）
+            max_jobs: 每個關鍵字的最大職缺數（預設 config.MAX_JOBS_PER_KEYWORD）
+        
+        Returns:
+            最終各狀態的任務數
+        """
+        keywords = keywords or config.KEYWORDS
+        max_jobs = max_jobs or config.MAX_JOBS_PER_KEYWORD
+        # 上次協調者中斷時 worker 已完成、尚未合併的結果，重建佇列前先寫入
+        saved = self._merge(self.queue.take_results())
+        if saved:
+            logger.info(f"已合併上次執行留下的 {saved} 筆職缺")
+        self.queue.seed(keywords, max_jobs, self.scraped_job_ids)
+        logger.info("等待 worker 處理任務（python main.py --mode worker）...")
+        
+        while True:
+            drained = self.queue.is_drained()
+            saved += self._merge(self.queue.take_results())
+            if drained:
+                break
+            time.sleep(config.WORK_POLL_INTERVAL)
+        
+        counts = self.queue.counts()
+        logger.info(f"所有任務已完成，共寫入 {saved} 筆職缺筆記，任務統計：{counts}")
+        return counts
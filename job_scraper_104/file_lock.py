@@ -0,0 +1,70 @@
+"""
+跨程序檔案鎖模組
+Windows 使用 msvcrt.locking，其他平台使用 fcntl.flock，
+讓同時執行的多個爬蟲程序可以安全地合併寫入同一個檔案
+"""
+
+import os
+import time
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """以獨立的 .lock 檔案實作的排他鎖（context manager）"""
+    
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        初始化檔案鎖
+        
+        Args:
+            path: 鎖檔路徑
+            timeout: 等待取得鎖的最長秒數
+        """
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+    
+    def acquire(self):
+        """取得鎖，逾時則拋出 TimeoutError"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if os.name == 'nt':
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    self._file = None
+                    raise TimeoutError(f"無法在 {self.timeout} 秒內取得檔案鎖：{self.path}")
+                time.sleep(0.05)
+    
+    def release(self):
+        """釋放鎖"""
+        if self._file is None:
+            return
+        try:
+            if os.name == 'nt':
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,377 @@
+"""
+職缺索引模組
+以 SQLite（WAL 模式）記錄已寫入 Obsidian 的職缺，
+啟動時只需一次查詢即可取得去重用的 job_id，不必掃描整個筆記目錄；
+另保存索引詞 → 筆記的反向索引，供學到新關鍵字時重新連結既有筆記
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+from .term_index import note_terms
+from .vault_scanner import scan_vault
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 每次寫入都會變動的抓取時間（計算內容雜湊時排除）
+_VOLATILE_LINE_PATTERN = re.compile(r'^(crawled_at: |\*\*抓取時間\*\*: ).*$', re.MULTILINE)
+
+# 新增或更新一筆職缺（first_seen 保持第一次記錄的時間，未提供的欄位保留舊值）
+_UPSERT_SQL = """
+    INSERT INTO jobs (job_id, category, file_path, content_hash, appear_date, first_seen, last_seen)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(job_id) DO UPDATE SET
+        category = excluded.category,
+        file_path = excluded.file_path,
+        content_hash = COALESCE(excluded.content_hash, jobs.content_hash),
+        appear_date = COALESCE(excluded.appear_date, jobs.appear_date),
+        last_seen = excluded.last_seen
+"""
+
+
+def content_hash(content: str) -> str:
+    """
+    計算筆記內容的雜湊值（排除抓取時間，職缺內容不變時雜湊值不變）
+    
+    Args:
+        content: 筆記內容
+    
+    Returns:
+        SHA-256 十六進位字串
+    """
+    stable = _VOLATILE_LINE_PATTERN.sub('', content)
+    return hashlib.sha256(stable.encode('utf-8')).hexdigest()
+
+
+def normalize_appear_date(appear_date: Optional[str]) -> Optional[str]:
+    """
+    統一職缺更新日期格式（搜尋 API 為 20261001，詳情 API 為 2026/10/01）
+    
+    Args:
+        appear_date: 原始日期字串
+    
+    Returns:
+        YYYYMMDD 格式，無法辨識時回傳 None
+    """
+    digits = re.sub(r'\D', '', appear_date or '')
+    return digits if len(digits) == 8 else None
+
+
+class JobIndex:
+    """已儲存職缺的持久化索引（以 job_id 為鍵）"""
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化索引
+        
+        Args:
+            path: SQLite 檔案路徑（預設 config.JOB_INDEX_FILE）
+        """
+        self.path = path or config.JOB_INDEX_FILE
+        
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                content_hash TEXT,
+                appear_date TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+        # 每個關鍵字上次執行看到最新的職缺更新日期（依日期排序時用來提早停止翻頁）
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_watermarks (
+                keyword TEXT PRIMARY KEY,
+                appear_date TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                sort_by TEXT
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(keyword_watermarks)")}
+        if 'sort_by' not in columns:
+            # 舊版建立的水位線沒有記錄排序方式（sort_by 為 NULL，不會被使用）
+            self._conn.execute("ALTER TABLE keyword_watermarks ADD COLUMN sort_by TEXT")
+        # 反向索引：筆記中會加上連結的段落含有哪些索引詞（包含尚未加上連結的詞）
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS note_terms (
+                term TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                PRIMARY KEY (term, job_id)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_note_terms_job ON note_terms(job_id)")
+        # 已套用至既有筆記的自動學習關鍵字
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS relinked_keywords (
+                keyword TEXT PRIMARY KEY,
+                relinked_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+    
+    def job_ids(self) -> Set[str]:
+        """
+        取得所有已儲存的 job_id
+        
+        Returns:
+            job_id 集合
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT job_id FROM jobs").fetchall()
+        return {row[0] for row in rows}
+    
+    def file_paths(self) -> Dict[str, str]:
+        """
+        取得所有職缺的筆記路徑
+        
+        Returns:
+            job_id → 筆記檔案路徑
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT job_id, file_path FROM jobs").fetchall()
+        return dict(rows)
+    
+    def appear_dates(self) -> Dict[str, str]:
+        """
+        取得所有已記錄更新日期的職缺（增量更新時比對用）
+        
+        Returns:
+            job_id → 更新日期（YYYYMMDD）
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT job_id, appear_date FROM jobs WHERE appear_date IS NOT NULL").fetchall()
+        return dict(rows)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        查詢單一職缺的索引資料
+        
+        Args:
+            job_id: 職缺 ID
+        
+        Returns:
+            {'job_id', 'category', 'file_path', 'content_hash', 'appear_date', 'first_seen', 'last_seen'}，
+            不存在時回傳 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, category, file_path, content_hash, appear_date, first_seen, last_seen "
+                "FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ('job_id', 'category', 'file_path', 'content_hash', 'appear_date', 'first_seen', 'last_seen')
+        return dict(zip(keys, row))
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    
+    def record(
+        self,
+        job_id: str,
+        category: str,
+        file_path: str,
+        content_hash: Optional[str] = None,
+        appear_date: Optional[str] = None,
+        terms: Optional[Set[str]] = None
+    ):
+        """
+        記錄一筆已寫入的職缺（已存在則更新，first_seen 保持不變）
+        
+        Args:
+            job_id: 職缺 ID
+            category: 類別（關鍵字）
+            file_path: 筆記檔案路徑
+            content_hash: 筆記內容雜湊值
+            appear_date: 職缺更新日期（104 的 appearDate）
+            terms: 筆記的索引詞（None 表示保留反向索引中原有的資料）
+        """
+        appear_date = normalize_appear_date(appear_date)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_SQL, (job_id, category, file_path, content_hash, appear_date, now, now))
+            if terms is not None:
+                self._conn.execute("DELETE FROM note_terms WHERE job_id = ?", (job_id,))
+                self._conn.executemany(
+                    "INSERT INTO note_terms (term, job_id) VALUES (?, ?)",
+                    ((term, job_id) for term in terms)
+                )
+    
+    def has_note_terms(self) -> bool:
+        """反向索引中是否已有資料（舊版建立的索引沒有，需要重建一次）"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM note_terms LIMIT 1").fetchone() is not None
+    
+    def notes_containing(self, terms: Optional[Set[str]]) -> Set[str]:
+        """
+        以反向索引找出含有所有指定索引詞的筆記
+        
+        Args:
+            terms: 索引詞集合（None 或空集合表示無法篩選，回傳所有職缺）
+        
+        Returns:
+            job_id 集合
+        """
+        if not terms:
+            return self.job_ids()
+        
+        terms = list(terms)
+        placeholders = ', '.join('?' * len(terms))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id FROM note_terms WHERE term IN ({placeholders}) "
+                f"GROUP BY job_id HAVING COUNT(*) = ?",
+                (*terms, len(terms))
+            ).fetchall()
+        return {row[0] for row in rows}
+    
+    def relinked_keywords(self) -> Set[str]:
+        """
+        取得已套用至既有筆記的關鍵字
+        
+        Returns:
+            關鍵字集合
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT keyword FROM relinked_keywords").fetchall()
+        return {row[0] for row in rows}
+    
+    def mark_relinked(self, keywords: Iterable[str]):
+        """
+        記錄已套用至既有筆記的關鍵字
+        
+        Args:
+            keywords: 關鍵字
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO relinked_keywords (keyword, relinked_at) VALUES (?, ?)",
+                ((keyword, now) for keyword in keywords)
+            )
+    
+    def watermarks(self, sort_by: str = "date") -> Dict[str, str]:
+        """
+        取得各關鍵字的水位線
+        
+        Args:
+            sort_by: 排序方式（只取得以此排序方式記錄的水位線）
+        
+        Returns:
+            關鍵字 → 上次執行看到最新的更新日期（YYYYMMDD）
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT keyword, appear_date FROM keyword_watermarks WHERE sort_by = ?",
+                (sort_by,)
+            ).fetchall()
+        return dict(rows)
+    
+    def update_watermarks(self, watermarks: Dict[str, str], sort_by: str = "date"):
+        """
+        更新關鍵字水位線（只會往較新的日期移動；排序方式不同時以本次為準）
+        
+        Args:
+            watermarks: 關鍵字 → 本次看到最新的更新日期
+            sort_by: 本次執行的排序方式
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO keyword_watermarks (keyword, appear_date, updated_at, sort_by) VALUES (?, ?, ?, ?)
+                ON CONFLICT(keyword) DO UPDATE SET
+                    appear_date = CASE
+                        WHEN keyword_watermarks.sort_by IS excluded.sort_by
+                        THEN MAX(keyword_watermarks.appear_date, excluded.appear_date)
+                        ELSE excluded.appear_date
+                    END,
+                    updated_at = excluded.updated_at,
+                    sort_by = excluded.sort_by
+                """,
+                [(keyword, appear_date, now, sort_by) for keyword, appear_date in watermarks.items()]
+            )
+    
+    def rebuild(self, output_dir: Optional[str] = None, full: bool = True) -> int:
+        """
+        掃描既有的筆記目錄重建索引（一次性匯入既有的 Obsidian 筆記）
+        
+        Args:
+            output_dir: 筆記根目錄（預設 config.OUTPUT_DIR）
+            full: 是否讀取整篇筆記重新計算內容雜湊與反向索引；
+                False 時只讀取 frontmatter，保留既有職缺原本的內容雜湊與反向索引（索引中沒有的筆記仍讀取整篇）
+        
+        Returns:
+            匯入的職缺數
+        """
+        output_dir = output_dir or config.OUTPUT_DIR
+        if not os.path.exists(output_dir):
+            logger.info(f"輸出目錄不存在，無法重建索引：{output_dir}")
+            return 0
+        
+        now = time.time()
+        rows = []
+        term_rows = []
+        new_job_ids = []
+        indexed = set() if full else self.job_ids()
+        for record in scan_vault(output_dir, read_content=full):
+            job_id = record['job_id']
+            content = record.get('content')
+            if not full and job_id not in indexed:
+                # 索引中沒有的筆記沒有可保留的雜湊與反向索引，需讀取整篇
+                content = self._read_note(record['file_path'])
+                new_job_ids.append((job_id,))
+            note_hash = None
+            if content is not None:
+                note_hash = content_hash(content)
+                term_rows.extend((term, job_id) for term in note_terms(content))
+            rows.append((job_id, record['category'], record['file_path'], note_hash, None, now, now))
+        
+        scanned = {row[0] for row in rows}
+        with self._lock, self._conn:
+            # 已不在筆記目錄中的職缺從索引移除，其餘保留 first_seen 與 appear_date
+            stale = [
+                (job_id,) for (job_id,) in self._conn.execute("SELECT job_id FROM jobs")
+                if job_id not in scanned
+            ]
+            self._conn.executemany("DELETE FROM jobs WHERE job_id = ?", stale)
+            self._conn.executemany(_UPSERT_SQL, rows)
+            if full:
+                self._conn.execute("DELETE FROM note_terms")
+                self._conn.executemany("INSERT OR IGNORE INTO note_terms (term, job_id) VALUES (?, ?)", term_rows)
+            else:
+                self._conn.executemany("DELETE FROM note_terms WHERE job_id = ?", stale + new_job_ids)
+                self._conn.executemany("INSERT OR IGNORE INTO note_terms (term, job_id) VALUES (?, ?)", term_rows)
+        
+        logger.info(f"已從 {output_dir} 重建職缺索引，共 {len(rows)} 筆（移除 {len(stale)} 筆已不存在的職缺）")
+        return len(rows)
+    
+    @staticmethod
+    def _read_note(file_path: str) -> Optional[str]:
+        """讀取整篇筆記（失敗時回傳 None，不計算內容雜湊）"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            logger.warning(f"讀取筆記失敗，略過內容雜湊：{file_path}（{e}）")
+            return None
+    
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
@@ -1,17 +1,25 @@
 """
 技術名詞雙向連結處理模組
 負責識別技術名詞並轉換為 Obsidian 雙向連結格式
-支援自動學習新的技術名詞
+支援自動學習新的技術名詞（先寫入附加式日誌，再定期合併至 YAML）
 """
 
 import yaml
-import re
 import logging
-from typing import List, Set
+import os
+import pickle
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+from .file_lock import FileLock
+from .keyword_matcher import KeywordMatcher
 from . import config
 
 logger = logging.getLogger(__name__)
 
+# 詞彙快取格式版本（KeywordMatcher 結構改變時遞增，使舊快取失效）
+_VOCABULARY_CACHE_VERSION = 1
+
 
 class KeywordLinker:
     """技術名詞連結器"""
@@ -19,10 +27,97 @@ class KeywordLinker:
     def __init__(self):
         """初始化關鍵字連結器"""
         self.keywords: Set[str] = set()
-        self._load_keywords()
+        # 所有關鍵字編譯成一個比對器，學到新關鍵字時增量加入
+        self.matcher: Optional[KeywordMatcher] = None
+        self._load_vocabulary()
+        self._lock = FileLock(config.LEARNED_KEYWORDS_FILE + ".lock")
+        # 管線以 asyncio.to_thread 呼叫 process_job_data，同一程序內的執行緒以此互斥
+        self._thread_lock = threading.RLock()
+        self._last_compaction = time.monotonic()
+    
+    def _load_vocabulary(self):
+        """
+        載入關鍵字與比對器
+        優先使用編譯好的詞彙快取，兩個 YAML 檔案有變動時才重新解析並建立比對器
+        """
+        source_key = self._source_key()
+        cached = self._read_vocabulary_cache(source_key)
+        if cached:
+            self.keywords, self.matcher = cached
+            logger.info(f"已從詞彙快取載入 {len(self.keywords)} 個關鍵字")
+        else:
+            self._load_keywords()
+            self.matcher = KeywordMatcher(sorted(self.keywords))
+            self._write_vocabulary_cache(source_key)
+        
+        # 載入尚未合併至 YAML 的學習日誌（例如上次執行中斷），不寫入快取
+        pending = self._read_journal()
+        if pending:
+            self.keywords.update(pending)
+            self.matcher.add_all(pending)
+            logger.info(f"已載入 {len(pending)} 個尚未合併的學習關鍵字")
+    
+    @staticmethod
+    def _source_key() -> Tuple:
+        """詞彙快取的鍵：格式版本與兩個 YAML 檔案的路徑、修改時間、大小"""
+        key = [_VOCABULARY_CACHE_VERSION]
+        for path in (config.KEYWORDS_FILE, config.LEARNED_KEYWORDS_FILE):
+            try:
+                stat = os.stat(path)
+                key.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                key.append((path, None, None))
+        return tuple(key)
+    
+    def _read_vocabulary_cache(self, source_key: Tuple) -> Optional[Tuple[Set[str], KeywordMatcher]]:
+        """
+        讀取詞彙快取
+        
+        Args:
+            source_key: 目前 YAML 檔案對應的快取鍵
+        
+        Returns:
+            (關鍵字集合, 比對器)，快取不存在或已過期時回傳 None
+        """
+        try:
+            with open(config.KEYWORD_CACHE_FILE, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"詞彙快取無法讀取，將重新建立：{e}")
+            return None
+        
+        if not isinstance(data, dict) or data.get('source_key') != source_key:
+            logger.info("關鍵字檔案已變動，重新建立詞彙快取")
+            return None
+        return data['keywords'], data['matcher']
+    
+    def _write_vocabulary_cache(self, source_key: Tuple):
+        """
+        寫入詞彙快取（先寫入暫存檔再取代，多個程序同時寫入也不會留下損壞的檔案）
+        
+        Args:
+            source_key: 建立快取時 YAML 檔案對應的快取鍵
+        """
+        temp_path = f"{config.KEYWORD_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(config.KEYWORD_CACHE_FILE), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                pickle.dump(
+                    {'source_key': source_key, 'keywords': self.keywords, 'matcher': self.matcher},
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(temp_path, config.KEYWORD_CACHE_FILE)
+        except Exception as e:
+            logger.warning(f"寫入詞彙快取失敗：{e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
     
     def _load_keywords(self):
-        """載入預定義與自動學習的關鍵字"""
+        """解析 YAML 檔案，載入預定義與自動學習的關鍵字"""
         # 載入預定義關鍵字
         try:
             with open(config.KEYWORDS_FILE, 'r', encoding='utf-8') as f:
@@ -51,6 +146,36 @@ class KeywordLinker:
         except Exception as e:
             logger.error(f"載入自動學習關鍵字失敗：{e}")
     
+    def _read_journal(self) -> List[str]:
+        """讀取學習日誌中的關鍵字（每行一個）"""
+        try:
+            with open(config.LEARNED_KEYWORDS_JOURNAL, 'r', encoding='utf-8') as f:
+                return [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"讀取學習日誌失敗：{e}")
+            return []
+    
+    def learned_keywords(self) -> Set[str]:
+        """
+        取得所有自動學習的關鍵字（learned_keywords.yaml 與尚未合併的學習日誌）
+        
+        Returns:
+            關鍵字集合
+        """
+        learned = set(self._read_journal())
+        try:
+            with open(config.LEARNED_KEYWORDS_FILE, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+            if isinstance(data.get('auto_learned'), list):
+                learned.update(data['auto_learned'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"讀取自動學習關鍵字失敗：{e}")
+        return learned
+    
     def learn_from_specialty(self, specialty_list: List[str]):
         """
         從職缺的「擅長工具」欄位學習新的技術名詞
@@ -86,42 +211,67 @@ class KeywordLinker:
             if cleaned not in self.keywords:
                 new_keywords.append(cleaned)
                 self.keywords.add(cleaned)
+                self.matcher.add(cleaned)
         
-        # 儲存新學習的關鍵字
+        # 儲存新學習的關鍵字（附加至日誌，定期合併至 YAML）
         if new_keywords:
-            self._save_learned_keywords(new_keywords)
+            self._append_journal(new_keywords)
             logger.info(f"學習到 {len(new_keywords)} 個新的技術名詞：{new_keywords}")
+        
+        if time.monotonic() - self._last_compaction >= config.LEARNED_KEYWORDS_COMPACT_INTERVAL:
+            self.compact_learned_keywords()
     
-    def _save_learned_keywords(self, new_keywords: List[str]):
+    def _append_journal(self, new_keywords: List[str]):
         """
-        將新學習的關鍵字儲存至檔案
+        將新學習的關鍵字附加至學習日誌
         
         Args:
             new_keywords: 新學習的關鍵字清單
         """
         try:
-            # 讀取現有的學習關鍵字
-            try:
-                with open(config.LEARNED_KEYWORDS_FILE, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
-            except FileNotFoundError:
-                data = {}
-            
-            # 更新清單
-            if 'auto_learned' not in data:
-                data['auto_learned'] = []
-            
-            data['auto_learned'].extend(new_keywords)
-            data['auto_learned'] = sorted(list(set(data['auto_learned'])))  # 去重並排序
-            
-            # 寫回檔案
-            with open(config.LEARNED_KEYWORDS_FILE, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+            with self._lock:
+                with open(config.LEARNED_KEYWORDS_JOURNAL, 'a', encoding='utf-8') as f:
+                    f.write(''.join(f"{keyword}\n" for keyword in new_keywords))
+        except Exception as e:
+            logger.error(f"寫入學習日誌失敗：{e}")
+    
+    def compact_learned_keywords(self):
+        """
+        將學習日誌合併至 learned_keywords.yaml 並清空日誌
+        以檔案鎖保護，多個爬蟲程序同時執行時各自學到的關鍵字都會保留
+        """
+        self._last_compaction = time.monotonic()
+        try:
+            with self._thread_lock, self._lock:
+                pending = self._read_journal()
+                if not pending:
+                    return
+                
+                # 讀取現有的學習關鍵字（可能已被其他程序更新）
+                try:
+                    with open(config.LEARNED_KEYWORDS_FILE, 'r', encoding='utf-8') as f:
+                        data = yaml.safe_load(f) or {}
+                except FileNotFoundError:
+                    data = {}
+                
+                learned = set(data.get('auto_learned') or [])
+                before = len(learned)
+                learned.update(pending)
+                data['auto_learned'] = sorted(learned)  # 去重並排序
+                
+                # 先寫入暫存檔再取代，避免中斷時留下寫了一半的 YAML
+                temp_path = config.LEARNED_KEYWORDS_FILE + ".tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+                os.replace(temp_path, config.LEARNED_KEYWORDS_FILE)
+                
+                # 清空日誌
+                open(config.LEARNED_KEYWORDS_JOURNAL, 'w', encoding='utf-8').close()
             
-            logger.info(f"已儲存 {len(new_keywords)} 個新關鍵字至 {config.LEARNED_KEYWORDS_FILE}")
+            logger.info(f"已合併 {len(learned) - before} 個新關鍵字至 {config.LEARNED_KEYWORDS_FILE}")
             
         except Exception as e:
-            logger.error(f"儲存學習關鍵字失敗：{e}")
+            logger.error(f"合併學習關鍵字失敗：{e}")
     
     def add_links(self, text: str) -> str:
         """
@@ -136,24 +286,13 @@ class KeywordLinker:
         if not text:
             return text
         
-        # 按照關鍵字長度排序（優先匹配長關鍵字，避免誤匹配）
-        sorted_keywords = sorted(self.keywords, key=len, reverse=True)
-        
-        result = text
-        for keyword in sorted_keywords:
-            # 使用正則表達式進行完整詞彙匹配
-            # \b 為詞彙邊界，確保不會匹配到詞彙的一部分
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            
-            # 替換為 Obsidian 連結格式（避免重複替換已連結的詞彙）
-            replacement = f'[[{keyword}]]'
-            result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-        
-        return result
+        # 單次由左至右掃描，同一位置優先匹配最長的關鍵字，已存在的連結不會再被替換
+        return self.matcher.link(text)
     
     def process_job_data(self, job_data: dict) -> dict:
         """
         處理職缺資料，加上技術名詞連結並學習新關鍵字
+        會阻塞於檔案鎖與日誌合併，非同步程式中請以 asyncio.to_thread 呼叫
         
         Args:
             job_data: 職缺資料字典
@@ -161,18 +300,19 @@ class KeywordLinker:
         Returns:
             處理後的職缺資料
         """
-        # 從擅長工具欄位學習新關鍵字
-        if 'specialty' in job_data and job_data['specialty']:
-            self.learn_from_specialty(job_data['specialty'])
-        
-        # 對各個欄位加上連結
-        if 'job_description' in job_data:
-            job_data['job_description'] = self.add_links(job_data['job_description'])
-        
-        if 'requirement' in job_data:
-            job_data['requirement'] = self.add_links(job_data['requirement'])
-        
-        if 'other_requirement' in job_data:
-            job_data['other_requirement'] = self.add_links(job_data['other_requirement'])
+        with self._thread_lock:
+            # 從擅長工具欄位學習新關鍵字
+            if 'specialty' in job_data and job_data['specialty']:
+                self.learn_from_specialty(job_data['specialty'])
+            
+            # 對各個欄位加上連結
+            if 'job_description' in job_data:
+                job_data['job_description'] = self.add_links(job_data['job_description'])
+            
+            if 'requirement' in job_data:
+                job_data['requirement'] = self.add_links(job_data['requirement'])
+            
+            if 'other_requirement' in job_data:
+                job_data['other_requirement'] = self.add_links(job_data['other_requirement'])
         
         return job_data
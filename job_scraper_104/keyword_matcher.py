@@ -0,0 +1,255 @@
+"""
+技術名詞多模式比對模組
+以 Aho-Corasick 自動機一次掃描文字找出所有關鍵字（不分大小寫），
+取最左、最長且符合詞彙邊界的比對結果，並略過已存在的 [[連結]]
+
+詞彙邊界依文字類別判斷（拉丁字母、數字、中日韓文字、其他），
+中英混排時「熟悉Python經驗」的 Python 也能正確連結
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 字元的文字類別
+LATIN = 'latin'
+DIGIT = 'digit'
+HAN = 'han'
+OTHER = 'other'
+
+# 相鄰時屬於同一個詞、中間沒有詞彙邊界的類別組合
+# 英文與數字以空白或符號分詞（Python3、ES6 不應拆開）；中文不使用空白分詞，
+# 中文字之間、中文與英數之間都視為邊界。
+# 取捨：沒有斷詞就無法分辨「負責資料分析工作」與「資料庫」，中文關鍵字因此也會在
+# 較長的詞中連結（詞庫沒有「資料庫」時連結為「[[資料]]庫」）；同一位置取最長的關鍵字，
+# 詞庫中收錄較長的詞即可避免，過短、容易誤連的中文詞不應加入詞庫
+_JOINED_CLASSES = frozenset({
+    (LATIN, LATIN), (LATIN, DIGIT), (DIGIT, LATIN), (DIGIT, DIGIT),
+})
+
+# 中日韓文字的 Unicode 範圍（部首、假名、注音、漢字、諺文、相容漢字、半形假名、擴充區）
+_CJK_RANGES = (
+    (0x2E80, 0x9FFF),
+    (0xAC00, 0xD7AF),
+    (0xF900, 0xFAFF),
+    (0xFF66, 0xFF9F),
+    (0x20000, 0x3FFFF),
+)
+
+
+def script_class(char: str) -> str:
+    """
+    判斷字元的文字類別
+    
+    Args:
+        char: 單一字元
+    
+    Returns:
+        LATIN、DIGIT、HAN 或 OTHER
+    """
+    code = ord(char)
+    if code < 0x80:
+        if char.isalpha():
+            return LATIN
+        return DIGIT if char.isdigit() else OTHER
+    for low, high in _CJK_RANGES:
+        if low <= code <= high:
+            return HAN
+    if char.isdigit():
+        return DIGIT
+    # 其他以空白分詞的字母（全形英文、重音字母、希臘字母等）與拉丁字母相同處理
+    return LATIN if char.isalnum() else OTHER
+
+
+class KeywordMatcher:
+    """可增量新增關鍵字的 Aho-Corasick 比對器"""
+    
+    def __init__(self, keywords: Iterable[str] = ()):
+        """
+        初始化比對器
+        
+        Args:
+            keywords: 初始關鍵字
+        """
+        # 節點 0 為根節點
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]   # 在此節點結束的關鍵字（小寫）
+        self._dict_link: List[int] = [0]              # 失敗鏈上下一個有輸出的節點
+        self._canonical: Dict[str, str] = {}          # 小寫 → 原始寫法（第一次加入的寫法）
+        self._dirty = False
+        self.add_all(keywords)
+    
+    def __len__(self) -> int:
+        return len(self._canonical)
+    
+    def __contains__(self, keyword: str) -> bool:
+        return keyword.lower() in self._canonical
+    
+    def add(self, keyword: str) -> bool:
+        """
+        新增關鍵字（失敗連結於下次比對前重建）
+        
+        Args:
+            keyword: 關鍵字
+        
+        Returns:
+            是否為新的關鍵字
+        """
+        key = keyword.lower()
+        if not key or key in self._canonical:
+            return False
+        
+        node = 0
+        for char in key:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[node][char] = next_node
+            node = next_node
+        
+        self._output[node] = key
+        self._canonical[key] = keyword
+        self._dirty = True
+        return True
+    
+    def __getstate__(self) -> Dict:
+        # 序列化前先建立失敗連結，載入後即可直接比對
+        if self._dirty:
+            self._build()
+        return self.__dict__.copy()
+    
+    def add_all(self, keywords: Iterable[str]) -> int:
+        """
+        新增多個關鍵字
+        
+        Args:
+            keywords: 關鍵字
+        
+        Returns:
+            新增的關鍵字數
+        """
+        return sum(1 for keyword in keywords if self.add(keyword))
+    
+    def _build(self):
+        """以廣度優先建立失敗連結與輸出連結"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = 0
+            queue.append(child)
+        
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail
+                self._dict_link[child] = fail if self._output[fail] is not None else self._dict_link[fail]
+                queue.append(child)
+        
+        self._dirty = False
+    
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        找出文字中所有符合詞彙邊界的關鍵字（可能重疊）
+        
+        Args:
+            text: 文字
+        
+        Returns:
+            (起始位置, 結束位置, 原始寫法的關鍵字) 清單
+        """
+        if self._dirty:
+            self._build()
+        
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # 少數字元轉小寫後長度會改變，逐字轉換以維持位置對應
+            lowered = ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+        
+        matches = []
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        node = 0
+        for index, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            
+            hit = node if output[node] is not None else dict_link[node]
+            while hit:
+                key = output[hit]
+                start = index + 1 - len(key)
+                if self._at_boundary(text, start, index + 1, key):
+                    matches.append((start, index + 1, self._canonical[key]))
+                hit = dict_link[hit]
+        return matches
+    
+    @staticmethod
+    def _at_boundary(text: str, start: int, end: int, key: str) -> bool:
+        """比對結果兩端是否為詞彙邊界（依兩側字元的文字類別判斷，關鍵字以符號開頭或結尾時一律成立）"""
+        if start > 0 and (script_class(text[start - 1]), script_class(key[0])) in _JOINED_CLASSES:
+            return False
+        if end < len(text) and (script_class(key[-1]), script_class(text[end])) in _JOINED_CLASSES:
+            return False
+        return True
+    
+    def _select(self, matches: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+        """由左至右選出互不重疊的比對結果，同一位置取最長的關鍵字"""
+        selected = []
+        position = 0
+        for start, end, keyword in sorted(matches, key=lambda m: (m[0], m[0] - m[1])):
+            if start >= position:
+                selected.append((start, end, keyword))
+                position = end
+        return selected
+    
+    def link(self, text: str) -> str:
+        """
+        將文字中的關鍵字轉換為 Obsidian 雙向連結（單次掃描，已存在的連結保持不變）
+        
+        Args:
+            text: 原始文字
+        
+        Returns:
+            已加上雙向連結的文字
+        """
+        if not text or not self._canonical:
+            return text
+        
+        parts = []
+        position = 0
+        while position < len(text):
+            link_start = text.find('[[', position)
+            segment_end = len(text) if link_start < 0 else link_start
+            parts.append(self._link_segment(text[position:segment_end]))
+            if link_start < 0:
+                break
+            
+            link_end = text.find(']]', link_start + 2)
+            link_end = len(text) if link_end < 0 else link_end + 2
+            parts.append(text[link_start:link_end])
+            position = link_end
+        return ''.join(parts)
+    
+    def _link_segment(self, segment: str) -> str:
+        """為不含連結的文字片段加上連結"""
+        if not segment:
+            return segment
+        
+        parts = []
+        position = 0
+        for start, end, keyword in self._select(self.find_all(segment)):
+            parts.append(segment[position:start])
+            parts.append(f'[[{keyword}]]')
+            position = end
+        parts.append(segment[position:])
+        return ''.join(parts)
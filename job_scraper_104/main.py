@@ -6,6 +6,7 @@
 import sys
 import os
 import argparse
+import asyncio
 import logging
 
 # 設定 UTF-8 編碼
@@ -19,6 +20,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from job_scraper_104.scraper import JobScraper
 from job_scraper_104.scheduler import JobScheduler
+from job_scraper_104.job_index import JobIndex
+from job_scraper_104.api_client import Job104APIClient
+from job_scraper_104.distributed_crawl import CrawlCoordinator, CrawlWorker
+from job_scraper_104.keyword_linker import KeywordLinker
+from job_scraper_104.note_writer import NoteWriter
+from job_scraper_104.obsidian_formatter import ObsidianFormatter
+from job_scraper_104.output_sinks import build_sinks
+from job_scraper_104.vault_relinker import VaultRelinker
+from job_scraper_104.vault_scanner import scan_vault, summarize
+from job_scraper_104.work_queue import WorkQueue
 from job_scraper_104 import config
 
 # 設定日誌
@@ -43,9 +54,26 @@ def main():
   手動模式（立即執行）:
     python main.py --mode manual
     
+  從上次中斷處繼續（手動模式）:
+    python main.py --mode manual --resume
+  
   排程模式（定時執行）:
     python main.py --mode schedule
     
+  重建職缺索引（從既有的 Obsidian 筆記匯入）:
+    python main.py --mode rebuild-index
+    python main.py --mode rebuild-index --quick
+  
+  統計筆記目錄（類別、常見技術名詞與公司）:
+    python main.py --mode vault-stats
+  
+  為既有筆記補上新學到的技術名詞連結:
+    python main.py --mode relink
+  
+  多 worker 分工爬取（先啟動協調者，再於各台機器啟動 worker）:
+    python main.py --mode coordinator
+    python main.py --mode worker
+
 注意事項:
   1. 請確保 Chrome 已使用 CDP 模式啟動
   2. chrome.exe --remote-debugging-port=9527 --user-data-dir="E:\\Chrome User Data"
@@ -55,9 +83,30 @@ def main():
     parser.add_argument(
         '--mode',
         type=str,
-        choices=['manual', 'schedule'],
+        choices=['manual', 'schedule', 'rebuild-index', 'relink', 'vault-stats', 'coordinator', 'worker'],
         default='manual',
-        help='執行模式：manual（手動立即執行）或 schedule（排程定時執行）'
+        help='執行模式：manual（手動立即執行）、schedule（排程定時執行）、rebuild-index（重建職缺索引）、'
+             'relink（為既有筆記補上新學到的技術名詞連結）、vault-stats（統計筆記目錄）、'
+             'coordinator（建立共用工作佇列並合併結果）或 worker（從共用工作佇列領取任務）'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='從上次中斷的檢查點繼續（僅手動模式），不重新抓取已完成的職缺'
+    )
+    
+    parser.add_argument(
+        '--quick',
+        action='store_true',
+        help='重建索引時只讀取筆記的 frontmatter，保留既有的內容雜湊與詞彙索引（僅 rebuild-index 模式）'
+    )
+    
+    parser.add_argument(
+        '--worker-id',
+        type=str,
+        default=None,
+        help='worker 識別名稱（預設為 主機名稱-程序 ID）'
     )
     
     args = parser.parse_args()
@@ -77,7 +126,7 @@ def main():
             scraper = JobScraper(use_cdp=True, cdp_url="http://localhost:9527")
             
             # 執行爬蟲
-            scraper.scrape_all()
+            scraper.scrape_all(resume=args.resume)
             
             logger.info("=" * 80)
             logger.info("爬蟲執行完成！")
@@ -100,6 +149,96 @@ def main():
             # 啟動排程
             scheduler.start()
             
+        elif args.mode == 'rebuild-index':
+            logger.info("=" * 80)
+            logger.info("重建職缺索引")
+            logger.info("=" * 80)
+            logger.info(f"筆記目錄: {config.OUTPUT_DIR}")
+            logger.info(f"索引檔案: {config.JOB_INDEX_FILE}")
+            
+            job_index = JobIndex()
+            count = job_index.rebuild(full=not args.quick)
+            job_index.close()
+            
+            logger.info("=" * 80)
+            logger.info(f"索引重建完成，共 {count} 筆職缺")
+            logger.info("=" * 80)
+        
+        elif args.mode == 'vault-stats':
+            logger.info("=" * 80)
+            logger.info(f"統計筆記目錄: {config.OUTPUT_DIR}")
+            logger.info("=" * 80)
+            
+            report = summarize(scan_vault())
+            logger.info(f"筆記數: {report['notes']}")
+            for category, count in sorted(report['categories'].items()):
+                logger.info(f"  {category}: {count} 篇")
+            logger.info(f"抓取時間: {report['first_crawled']} ~ {report['last_crawled']}")
+            logger.info("常見技術名詞: " + "、".join(f"{name}({count})" for name, count in report['top_keywords']))
+            logger.info("職缺最多的公司: " + "、".join(f"{name}({count})" for name, count in report['top_companies']))
+            logger.info("=" * 80)
+        
+        elif args.mode == 'relink':
+            logger.info("=" * 80)
+            logger.info("重新連結：為既有筆記補上新學到的技術名詞連結")
+            logger.info("=" * 80)
+            
+            job_index = JobIndex()
+            if len(job_index) == 0 or not job_index.has_note_terms():
+                # 第一次使用（或索引建立於反向索引之前），先從筆記目錄建立反向索引
+                job_index.rebuild()
+            
+            keyword_linker = KeywordLinker()
+            keyword_linker.compact_learned_keywords()
+            stats = VaultRelinker(job_index, keyword_linker).relink()
+            job_index.close()
+            
+            logger.info("=" * 80)
+            logger.info(f"重新連結完成：{stats['keywords']} 個新關鍵字，重寫 {stats['updated']} 篇筆記")
+            logger.info("=" * 80)
+        
+        elif args.mode == 'coordinator':
+            logger.info("=" * 80)
+            logger.info("協調者模式：建立共用工作佇列並合併 worker 的結果")
+            logger.info("=" * 80)
+            logger.info(f"工作佇列: {config.WORK_QUEUE_FILE}")
+            logger.info(f"關鍵字: {config.KEYWORDS}")
+            logger.info(f"每個關鍵字抓取數量: {config.MAX_JOBS_PER_KEYWORD}")
+            logger.info("=" * 80)
+            
+            job_index = JobIndex()
+            if len(job_index) == 0:
+                job_index.rebuild()
+            scraped_job_ids = job_index.job_ids() if config.ENABLE_DEDUPLICATION else set()
+            
+            queue = WorkQueue()
+            keyword_linker = KeywordLinker()
+            note_writer = NoteWriter()
+            formatter = ObsidianFormatter(job_index=job_index, writer=note_writer)
+            sinks = build_sinks(formatter)
+            coordinator = CrawlCoordinator(queue, keyword_linker, formatter, scraped_job_ids, sinks=sinks)
+            coordinator.run()
+            for sink in sinks:
+                sink.close()
+            note_writer.close()
+            coordinator.formatter.log_stats()
+            keyword_linker.compact_learned_keywords()
+            queue.close()
+            job_index.close()
+        
+        elif args.mode == 'worker':
+            logger.info("=" * 80)
+            logger.info("Worker 模式：從共用工作佇列領取任務")
+            logger.info("=" * 80)
+            logger.info(f"工作佇列: {config.WORK_QUEUE_FILE}")
+            logger.info("=" * 80)
+            
+            queue = WorkQueue()
+            api_client = Job104APIClient(use_cdp=True, cdp_url="http://localhost:9527")
+            worker = CrawlWorker(api_client, queue, worker_id=args.worker_id)
+            asyncio.run(worker.run())
+            queue.close()
+    
     except KeyboardInterrupt:
         logger.info("\n使用者中斷執行")
     except Exception as e:
@@ -0,0 +1,150 @@
+"""
+CDP 搜尋頁面的導航設定模組
+可選用「精簡導航」：攔截圖片、字型、影音與追蹤腳本，並關閉動畫等不必要的渲染，
+同時統計每頁的傳輸量與導航時間，以便比較開啟前後的差異
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Optional
+from playwright.async_api import Page, Route
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 關閉 CSS 動畫與轉場效果（搜尋頁面只需要資料，不需要視覺效果）
+_DISABLE_ANIMATION_SCRIPT = """
+    (() => {
+        const style = document.createElement('style');
+        style.textContent = '*, *::before, *::after { animation: none !important; transition: none !important; }';
+        document.addEventListener('DOMContentLoaded', () => document.head.appendChild(style));
+    })();
+"""
+
+
+class NavigationProfile:
+    """搜尋分頁的導航設定與傳輸量統計"""
+    
+    def __init__(self, lean: Optional[bool] = None):
+        """
+        初始化導航設定
+        
+        Args:
+            lean: 是否啟用精簡導航（預設 config.CDP_LEAN_NAVIGATION）
+        """
+        self.lean = config.CDP_LEAN_NAVIGATION if lean is None else lean
+        self.stats = {
+            'navigations': 0,
+            'navigation_seconds': 0.0,
+            'bytes_transferred': 0,
+            'blocked_requests': 0,
+        }
+        self.blocked_by_type: Dict[str, int] = {}
+    
+    async def setup_page(self, page: Page):
+        """
+        初始化新分頁（作為 CDPBrowserPool 的 page_setup）
+        
+        Args:
+            page: 新建立的分頁
+        """
+        # 透過 CDP 統計實際傳輸的位元組數（精簡與否都統計，方便比較）
+        try:
+            cdp_session = await page.context.new_cdp_session(page)
+            await cdp_session.send('Network.enable')
+            cdp_session.on('Network.loadingFinished', self._on_loading_finished)
+        except Exception as e:
+            logger.debug(f"無法啟用傳輸量統計：{e}")
+        
+        if not self.lean:
+            return
+        
+        await page.route("**/*", self._handle_route)
+        await page.emulate_media(reduced_motion='reduce')
+        await page.add_init_script(_DISABLE_ANIMATION_SCRIPT)
+        logger.info("已套用精簡導航設定（攔截圖片、字型、影音與追蹤腳本）")
+    
+    def _on_loading_finished(self, params: Dict):
+        """累計每個請求實際傳輸的位元組數"""
+        self.stats['bytes_transferred'] += int(params.get('encodedDataLength', 0))
+    
+    def _should_block(self, resource_type: str, url: str) -> bool:
+        """判斷請求是否應被攔截"""
+        if resource_type in config.CDP_BLOCKED_RESOURCE_TYPES:
+            return True
+        return any(pattern in url for pattern in config.CDP_BLOCKED_URL_PATTERNS)
+    
+    async def _handle_route(self, route: Route):
+        """攔截不需要的請求，其餘照常送出"""
+        request = route.request
+        if self._should_block(request.resource_type, request.url):
+            self.stats['blocked_requests'] += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def record_navigation(self, seconds: float):
+        """
+        記錄一次搜尋頁面導航
+        
+        Args:
+            seconds: 導航到 DOMContentLoaded 的耗時
+        """
+        self.stats['navigations'] += 1
+        self.stats['navigation_seconds'] += seconds
+    
+    def _update_baseline(self) -> Dict:
+        """
+        讀取並更新未精簡導航的傳輸量基準（用來估算精簡導航節省的流量）
+        
+        Returns:
+            基準資料：{'navigations': 頁數, 'bytes': 總位元組數}
+        """
+        baseline = {'navigations': 0, 'bytes': 0}
+        try:
+            with open(config.CDP_NAVIGATION_BASELINE_FILE, 'r', encoding='utf-8') as f:
+                baseline.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"讀取導航傳輸量基準失敗：{e}")
+        
+        if not self.lean:
+            baseline['navigations'] += self.stats['navigations']
+            baseline['bytes'] += self.stats['bytes_transferred']
+            try:
+                os.makedirs(os.path.dirname(config.CDP_NAVIGATION_BASELINE_FILE), exist_ok=True)
+                with open(config.CDP_NAVIGATION_BASELINE_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(baseline, f)
+            except Exception as e:
+                logger.warning(f"儲存導航傳輸量基準失敗：{e}")
+        
+        return baseline
+    
+    def log_stats(self):
+        """輸出本次執行的導航統計"""
+        navigations = self.stats['navigations']
+        if not navigations:
+            return
+        
+        avg_bytes = self.stats['bytes_transferred'] / navigations
+        logger.info(
+            f"搜尋頁面導航（{'精簡' if self.lean else '完整'}）：{navigations} 頁，"
+            f"平均導航時間 {self.stats['navigation_seconds'] / navigations:.2f} 秒，"
+            f"平均傳輸 {avg_bytes / 1024:.1f} KB"
+        )
+        
+        baseline = self._update_baseline()
+        if self.lean:
+            logger.info(f"已攔截 {self.stats['blocked_requests']} 個請求：{self.blocked_by_type}")
+            if baseline['navigations']:
+                baseline_avg = baseline['bytes'] / baseline['navigations']
+                saved = (baseline_avg - avg_bytes) * navigations
+                logger.info(
+                    f"相較完整導航基準（平均 {baseline_avg / 1024:.1f} KB/頁），"
+                    f"本次約節省 {saved / 1024:.1f} KB"
+                )
+            else:
+                logger.info("尚無完整導航的傳輸量基準，關閉精簡導航執行一次即可建立")
@@ -0,0 +1,198 @@
+"""
+筆記寫入模組
+以有上限的執行緒池在背景寫入筆記（write-behind），爬蟲管線只需交出內容即可繼續；
+每篇筆記先寫入同目錄的暫存檔再以 os.replace 取代，Obsidian 與同步軟體不會看到寫了一半的檔案
+"""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, Set
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(file_path: str, content: str, fsync: bool = False):
+    """
+    以暫存檔 + os.replace 寫入檔案（取代前不會出現內容不完整的檔案）
+    
+    Args:
+        file_path: 檔案路徑
+        content: 檔案內容
+        fsync: 取代前是否將暫存檔寫入磁碟
+    """
+    temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_note(file_path: str, content: Optional[str], previous_path: Optional[str] = None, fsync: bool = False):
+    """
+    寫入筆記；既有筆記的檔名不同時先就地重新命名，再以 write_atomic 寫入新內容
+    
+    Args:
+        file_path: 筆記檔案路徑
+        content: 筆記內容（None 表示只重新命名）
+        previous_path: 既有筆記路徑
+        fsync: 取代前是否將暫存檔寫入磁碟
+    """
+    if previous_path is not None and previous_path != file_path:
+        try:
+            os.replace(previous_path, file_path)
+        except FileNotFoundError:
+            # 既有筆記已被移除，有新內容時直接寫入
+            if content is None:
+                raise
+    if content is not None:
+        write_atomic(file_path, content, fsync=fsync)
+
+
+class NoteWriter:
+    """背景寫入筆記的 write-behind 寫入器"""
+    
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        初始化寫入器
+        
+        Args:
+            max_workers: 寫入執行緒數（預設 config.NOTE_WRITER_THREADS）
+            max_pending: 尚未寫完的筆記上限，超過時 submit() 會等待（預設 config.NOTE_WRITER_MAX_PENDING）
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.NOTE_WRITER_THREADS,
+            thread_name_prefix="note-writer"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending or config.NOTE_WRITER_MAX_PENDING)
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+        self._created_dirs: Set[str] = set()
+        self._touched_dirs: Set[str] = set()
+        self._failed_since_flush = 0
+        self.stats = {'written': 0, 'failed': 0}
+    
+    def ensure_dir(self, directory: str):
+        """
+        建立目錄（同一目錄只在第一次呼叫時檢查）
+        
+        Args:
+            directory: 目錄路徑
+        """
+        if directory in self._created_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._created_dirs.add(directory)
+    
+    def submit(
+        self,
+        file_path: str,
+        content: Optional[str],
+        on_written: Optional[Callable[[], None]] = None,
+        previous_path: Optional[str] = None
+    ) -> Future:
+        """
+        排入一篇筆記等待寫入（尚未寫完的筆記達上限時才會等待）
+        
+        Args:
+            file_path: 筆記檔案路徑
+            content: 筆記內容（None 表示只重新命名）
+            on_written: 寫入成功後於寫入執行緒中呼叫（例如記錄職缺索引）
+            previous_path: 既有筆記路徑（檔名不同時先就地重新命名）
+        
+        Returns:
+            寫入工作的 Future
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, file_path, content, on_written, previous_path)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._on_done)
+        return future
+    
+    def _write(
+        self,
+        file_path: str,
+        content: Optional[str],
+        on_written: Optional[Callable[[], None]],
+        previous_path: Optional[str]
+    ):
+        """於寫入執行緒中寫入單篇筆記"""
+        directory = os.path.dirname(file_path)
+        try:
+            self.ensure_dir(directory)
+            write_note(file_path, content, previous_path=previous_path, fsync=config.NOTE_WRITER_FSYNC)
+        except Exception as e:
+            logger.error(f"寫入筆記失敗：{file_path}（{e}）")
+            with self._lock:
+                self.stats['failed'] += 1
+                self._failed_since_flush += 1
+            raise
+        
+        with self._lock:
+            self.stats['written'] += 1
+            self._touched_dirs.add(directory)
+        logger.info(f"已儲存職缺筆記：{file_path}")
+        if on_written is not None:
+            try:
+                on_written()
+            except Exception as e:
+                # 沒有人讀取 Future 的例外，需在此記錄；計入失敗使本次執行不被視為完成
+                logger.error(f"筆記已寫入，但寫入後的處理失敗：{file_path}（{e}）")
+                with self._lock:
+                    self._failed_since_flush += 1
+    
+    def _on_done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+    
+    def flush(self) -> int:
+        """
+        等待所有已排入的筆記寫完，並將寫入過的目錄同步至磁碟（執行結束前的屏障）
+        
+        Returns:
+            寫入失敗或寫入後處理（on_written）失敗的筆記數（自上次 flush 起）
+        """
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        
+        with self._lock:
+            directories, self._touched_dirs = self._touched_dirs, set()
+            failed, self._failed_since_flush = self._failed_since_flush, 0
+        if config.NOTE_WRITER_FSYNC and os.name != 'nt':
+            # os.replace 的結果要同步目錄本身才會持久化（Windows 不支援開啟目錄）
+            for directory in directories:
+                try:
+                    fd = os.open(directory, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError as e:
+                    logger.warning(f"同步目錄失敗：{directory}（{e}）")
+        
+        logger.info(f"筆記寫入完成：共寫入 {self.stats['written']} 篇，失敗 {self.stats['failed']} 篇")
+        return failed
+    
+    def close(self):
+        """寫完所有筆記並關閉執行緒池"""
+        self.flush()
+        self._executor.shutdown(wait=True)
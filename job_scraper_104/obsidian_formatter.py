@@ -1,12 +1,18 @@
 """
 Obsidian 筆記格式化模組
 負責將職缺資料轉換為 Obsidian Markdown 格式
+覆寫既有筆記前比對內容雜湊（不含抓取時間），內容未變更時不寫入磁碟，
+避免 Obsidian 重新索引與雲端同步重複上傳
 """
 
 import os
 import logging
+import threading
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Set
+from .job_index import JobIndex, content_hash
+from .note_writer import NoteWriter, write_note
+from .term_index import note_terms
 from . import config
 
 logger = logging.getLogger(__name__)
@@ -15,6 +21,105 @@ logger = logging.getLogger(__name__)
 class ObsidianFormatter:
     """Obsidian 筆記格式化器"""
     
+    def __init__(self, job_index: Optional[JobIndex] = None, writer: Optional[NoteWriter] = None):
+        """
+        初始化格式化器
+        
+        Args:
+            job_index: 職缺索引（筆記寫入後記錄於索引中，None 表示不記錄）
+            writer: 背景寫入器（None 表示在呼叫端的執行緒中直接寫入）
+        """
+        self.job_index = job_index
+        self.writer = writer
+        # written：寫入（新增或內容變更），unchanged：內容未變更未覆寫，skipped：檔案已存在而跳過
+        self.stats = {'written': 0, 'unchanged': 0, 'skipped': 0}
+        self._stats_lock = threading.Lock()
+        # job_id → 筆記路徑（第一次使用時從職缺索引載入）
+        self._paths: Optional[Dict[str, str]] = None
+        self._paths_lock = threading.Lock()
+        self._created_dirs = set()
+    
+    def _count(self, outcome: str):
+        """累計寫入結果（管線會從多個執行緒呼叫）"""
+        with self._stats_lock:
+            self.stats[outcome] += 1
+    
+    def log_stats(self):
+        """輸出筆記寫入統計"""
+        logger.info(
+            f"筆記統計：寫入 {self.stats['written']} 篇，內容未變更 {self.stats['unchanged']} 篇，"
+            f"已存在跳過 {self.stats['skipped']} 篇"
+        )
+    
+    def _existing_hash(self, job_id: str, file_path: str) -> Optional[str]:
+        """
+        取得既有筆記的內容雜湊（優先使用索引中的記錄，沒有記錄時讀取檔案計算）
+        
+        Args:
+            job_id: 職缺 ID
+            file_path: 筆記檔案路徑
+        
+        Returns:
+            內容雜湊，筆記不存在時回傳 None
+        """
+        entry = self.job_index.get(job_id) if self.job_index is not None else None
+        if entry is not None and entry['file_path'] == file_path and entry['content_hash']:
+            return entry['content_hash']
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return content_hash(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"讀取既有筆記失敗，將直接覆寫：{file_path}（{e}）")
+            return None
+    
+    def _write_note(
+        self,
+        file_path: str,
+        content: Optional[str],
+        on_written: Callable[[], None],
+        previous_path: Optional[str] = None
+    ):
+        """
+        以暫存檔 + os.replace 寫入筆記（有背景寫入器時交給寫入器，不等待寫入完成）
+        
+        Args:
+            file_path: 筆記檔案路徑
+            content: 筆記內容（None 表示只重新命名）
+            on_written: 寫入成功後呼叫
+            previous_path: 既有筆記路徑（與 file_path 不同時先重新命名）
+        """
+        if self.writer is not None:
+            self.writer.submit(file_path, content, on_written, previous_path=previous_path)
+            return
+        
+        directory = os.path.dirname(file_path)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+        write_note(file_path, content, previous_path=previous_path)
+        logger.info(f"已儲存職缺筆記：{file_path}")
+        on_written()
+    
+    def _record(
+        self,
+        job_id: str,
+        category: str,
+        file_path: str,
+        note_hash: Optional[str],
+        terms: Optional[Set[str]],
+        appear_date: Optional[str]
+    ):
+        """筆記寫入後記錄於職缺索引（雜湊與索引詞為 None 時保留原有的記錄）"""
+        if self.job_index is not None:
+            self.job_index.record(
+                job_id, category, file_path,
+                content_hash=note_hash,
+                appear_date=appear_date,
+                terms=terms
+            )
+    
     @staticmethod
     def _clean_text(text: str) -> str:
         """
@@ -85,7 +190,7 @@ class ObsidianFormatter:
         other_requirement = self._clean_text(job_data.get('other_requirement', ''))
         keywords = job_data.get('keywords', [])
         
-        # 取得當前時間
+        # 取得當前時間（只出現在 crawled_at 與頁尾兩行，計算內容雜湊時排除）
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # 構建 YAML frontmatter
@@ -145,49 +250,153 @@ job_url: https://www.104.com.tw/job/{job_id}
         
         return full_content
     
-    def save_job_note(self, job_data: Dict, category: str, skip_existing: bool = True) -> str:
+    @staticmethod
+    def note_filename(job_data: Dict) -> str:
         """
-        儲存職缺筆記到檔案
+        產生筆記檔名（公司_職缺_jobid.md，已移除檔名中的非法字元）
         
         Args:
             job_data: 職缺資料
-            category: 類別（資料工程、資料分析、RPA自動化）
-            skip_existing: 是否跳過已存在的檔案（預設 True，避免覆蓋）
         
         Returns:
-            儲存的檔案路徑
+            檔名
         """
-        # 產生檔案名稱（使用公司名稱與職缺標題）
         company = job_data.get('company', '未知公司')
         title = job_data.get('title', '未知職缺')
         job_id = job_data.get('job_id', 'unknown')
         
-        # 清理檔案名稱中的非法字元
         safe_filename = f"{company}_{title}_{job_id}.md"
         safe_filename = safe_filename.replace('/', '_').replace('\\', '_').replace(':', '_')
         safe_filename = safe_filename.replace('*', '_').replace('?', '_').replace('"', '_')
         safe_filename = safe_filename.replace('<', '_').replace('>', '_').replace('|', '_')
+        return safe_filename
+    
+    def _known_path(self, job_id: str, file_path: str) -> Optional[str]:
+        """
+        查詢職缺既有筆記的路徑
+        有職缺索引時只查詢記憶體中的 job_id → 路徑對照表（第一次使用時從索引載入），
+        公司或職缺名稱變更導致檔名不同時也找得到，且不需逐篇檢查檔案是否存在
         
-        # 構建檔案路徑
-        category_dir = os.path.join(config.OUTPUT_DIR, category)
-        os.makedirs(category_dir, exist_ok=True)
+        Args:
+            job_id: 職缺 ID
+            file_path: 依目前職缺資料產生的筆記路徑（沒有職缺索引時檢查此檔案）
         
-        file_path = os.path.join(category_dir, safe_filename)
+        Returns:
+            既有筆記路徑，沒有既有筆記時回傳 None
+        """
+        if self.job_index is None:
+            return file_path if os.path.exists(file_path) else None
+        with self._paths_lock:
+            if self._paths is None:
+                self._paths = self.job_index.file_paths()
+            return self._paths.get(job_id)
+    
+    def _remember_path(self, job_id: str, file_path: str):
+        """更新記憶體中的 job_id → 路徑對照表"""
+        if self.job_index is None:
+            return
+        with self._paths_lock:
+            if self._paths is not None:
+                self._paths[job_id] = file_path
+    
+    def save_job_note(
+        self,
+        job_data: Dict,
+        category: str,
+        skip_existing: bool = True,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> str:
+        """
+        儲存職缺筆記到檔案
         
-        # 檢查檔案是否已存在
-        if skip_existing and os.path.exists(file_path):
-            logger.info(f"檔案已存在，跳過儲存：{file_path}")
-            return file_path
+        Args:
+            job_data: 職缺資料
+            category: 類別（資料工程、資料分析、RPA自動化）
+            skip_existing: 是否跳過已存在的筆記（預設 True，避免覆蓋）；
+                False 時覆寫既有筆記（內容有變更時才寫入，檔名變更時就地重新命名）
+            on_written: 筆記已在磁碟上時呼叫（背景寫入時於寫入執行緒中呼叫，寫入失敗時不呼叫）
+        
+        Returns:
+            儲存的檔案路徑（使用背景寫入器時，回傳時可能尚未寫入完成）
+        """
+        job_id = job_data.get('job_id', 'unknown')
+        filename = self.note_filename(job_data)
+        appear_date = job_data.get('appear_date')
+        
+        # 以 job_id 查詢既有筆記（不論檔名是否相同）
+        file_path = os.path.join(config.OUTPUT_DIR, category, filename)
+        existing_path = self._known_path(job_id, file_path)
+        if existing_path is not None:
+            # 既有筆記保留在原本的類別目錄，只更新檔名
+            category = os.path.basename(os.path.dirname(existing_path))
+            file_path = os.path.join(os.path.dirname(existing_path), filename)
+        
+        if skip_existing and existing_path is not None:
+            logger.info(f"檔案已存在，跳過儲存：{existing_path}")
+            self._count('skipped')
+            if self.job_index is not None:
+                self.job_index.record(job_id, category, existing_path, appear_date=appear_date)
+            if on_written is not None:
+                on_written()
+            return existing_path
         
         # 格式化筆記內容
         content = self.format_job(job_data)
+        renamed = existing_path is not None and existing_path != file_path
+        
+        # 覆寫前比對內容雜湊，內容未變更時不寫入
+        if existing_path is not None and self._existing_hash(job_id, existing_path) == content_hash(content):
+            if not renamed:
+                logger.info(f"職缺內容未變更，不需覆寫：{file_path}")
+                self._count('unchanged')
+                if self.job_index is not None:
+                    self.job_index.record(job_id, category, file_path, appear_date=appear_date)
+                if on_written is not None:
+                    on_written()
+                return file_path
+            # 內容相同但公司或職缺名稱變更：只重新命名
+            content = None
         
-        # 寫入檔案
+        # 寫入檔案（寫入成功後才記錄於索引）
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            logger.info(f"已儲存職缺筆記：{file_path}")
+            if content is None:
+                note_hash, terms = None, None
+            else:
+                note_hash, terms = content_hash(content), note_terms(content)
+            
+            outcome = 'unchanged' if content is None else 'written'
+            
+            def written():
+                # 實際寫入後才計入統計（背景寫入失敗時不會呼叫）
+                self._count(outcome)
+                self._record(job_id, category, file_path, note_hash, terms, appear_date)
+                self._remember_path(job_id, file_path)
+                if on_written is not None:
+                    on_written()
+            
+            self._write_note(file_path, content, written, previous_path=existing_path)
+            if renamed:
+                logger.info(f"職缺名稱已變更，重新命名筆記：{existing_path} → {file_path}")
             return file_path
         except Exception as e:
             logger.error(f"儲存職缺筆記失敗：{e}")
             return ""
+    
+    def update_job_note(
+        self,
+        job_data: Dict,
+        category: str,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> str:
+        """
+        更新已存在的職缺筆記（職缺內容有變更時才覆寫）
+        
+        Args:
+            job_data: 重新抓取的職缺資料
+            category: 類別（沒有既有筆記時使用）
+            on_written: 筆記已在磁碟上時呼叫
+        
+        Returns:
+            筆記檔案路徑
+        """
+        return self.save_job_note(job_data, category, skip_existing=False, on_written=on_written)
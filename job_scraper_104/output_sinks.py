@@ -0,0 +1,331 @@
+"""
+輸出目的地模組
+管線完成的職缺除了寫成 Obsidian 筆記，也可同時輸出為 JSONL（逐筆附加）
+或 Parquet（累積一批寫入一個 row group），欄位型別由 JOB_SCHEMA 明確定義，
+供 pandas / DuckDB 直接查詢，不必再解析大量 Markdown 檔案
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+from .job_index import normalize_appear_date
+from .obsidian_formatter import ObsidianFormatter
+from . import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 輸出為選用功能
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# 匯出欄位與型別（涵蓋 get_job_detail 產生的所有欄位，另加上類別、是否為更新與匯出時間）
+JOB_SCHEMA = (
+    ('job_id', 'string'),
+    ('category', 'string'),
+    ('title', 'string'),
+    ('company', 'string'),
+    ('salary', 'string'),
+    ('location', 'string'),
+    ('job_description', 'string'),
+    ('education', 'string'),
+    ('experience', 'string'),
+    ('skills', 'list<string>'),
+    ('specialty', 'list<string>'),
+    ('other_requirement', 'string'),
+    ('keywords', 'list<string>'),
+    ('appear_date', 'date'),
+    ('job_url', 'string'),
+    ('updated', 'bool'),
+    ('exported_at', 'timestamp'),
+)
+
+# 文字欄位中的 [[技術名詞]] 連結（匯出時還原為純文字）
+_WIKILINK_PATTERN = re.compile(r'\[\[([^\[\]]+)\]\]')
+
+
+def to_record(job_data: Dict, category: str, updated: bool = False) -> Dict:
+    """
+    依 JOB_SCHEMA 將職缺資料轉換為一筆匯出資料
+    
+    Args:
+        job_data: 職缺資料（已加上技術名詞連結）
+        category: 類別（搜尋關鍵字）
+        updated: 是否為重新抓取的已更新職缺
+    
+    Returns:
+        欄位 → 值（文字欄位移除 [[ ]] 連結，appear_date 為 date，exported_at 為 datetime）
+    """
+    record = {}
+    for name, field_type in JOB_SCHEMA:
+        value = job_data.get(name)
+        if field_type == 'string':
+            value = _WIKILINK_PATTERN.sub(r'\1', str(value)) if value is not None else None
+        elif field_type == 'list<string>':
+            value = [str(item) for item in value] if isinstance(value, (list, tuple)) else []
+        record[name] = value
+    
+    appear_date = normalize_appear_date(job_data.get('appear_date'))
+    record['appear_date'] = datetime.strptime(appear_date, '%Y%m%d').date() if appear_date else None
+    record['category'] = category
+    record['updated'] = updated
+    record['exported_at'] = datetime.now().replace(microsecond=0)
+    return record
+
+
+def _export_path(extension: str) -> str:
+    """產生本次執行的匯出檔案路徑（EXPORT_DIR/jobs_YYYYmmdd_HHMMSS.副檔名）"""
+    os.makedirs(config.EXPORT_DIR, exist_ok=True)
+    return os.path.join(config.EXPORT_DIR, f"jobs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}")
+
+
+class OutputSink(ABC):
+    """輸出目的地的基底類別（write 可能從多個執行緒同時呼叫）"""
+    
+    name = 'sink'
+    
+    @abstractmethod
+    def write(
+        self,
+        job_data: Dict,
+        category: str,
+        updated: bool = False,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """
+        輸出一筆職缺
+        
+        Args:
+            job_data: 職缺資料
+            category: 類別（搜尋關鍵字）
+            updated: 是否為重新抓取的已更新職缺
+            on_written: 職缺已寫出後呼叫（背景寫入時可能在其他執行緒中、於 write 回傳後才呼叫）
+        
+        Returns:
+            是否成功（已交給背景寫入器也視為成功）
+        """
+    
+    def close(self):
+        """寫出緩衝中的資料並關閉"""
+
+
+class ObsidianSink(OutputSink):
+    """寫入 Obsidian 筆記"""
+    
+    name = 'obsidian'
+    
+    def __init__(self, formatter: ObsidianFormatter):
+        """
+        初始化
+        
+        Args:
+            formatter: Obsidian 筆記格式化器
+        """
+        self.formatter = formatter
+    
+    def write(
+        self,
+        job_data: Dict,
+        category: str,
+        updated: bool = False,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> bool:
+        if updated:
+            return bool(self.formatter.update_job_note(job_data, category, on_written=on_written))
+        return bool(self.formatter.save_job_note(job_data, category, on_written=on_written))
+
+
+class JsonlSink(OutputSink):
+    """逐筆附加至 JSONL 檔案（每筆寫入後立即 flush）"""
+    
+    name = 'jsonl'
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化
+        
+        Args:
+            path: 輸出檔案路徑（預設 EXPORT_DIR/jobs.jsonl，多次執行會持續附加）
+        """
+        if path is None:
+            os.makedirs(config.EXPORT_DIR, exist_ok=True)
+            path = os.path.join(config.EXPORT_DIR, "jobs.jsonl")
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+    
+    def write(
+        self,
+        job_data: Dict,
+        category: str,
+        updated: bool = False,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> bool:
+        record = to_record(job_data, category, updated)
+        line = json.dumps(record, ensure_ascii=False, default=lambda value: value.isoformat())
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+        if on_written is not None:
+            on_written()
+        return True
+    
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"已輸出 {self.count} 筆職缺至 {self.path}")
+
+
+class ParquetSink(OutputSink):
+    """累積一批職缺後寫入 Parquet 的一個 row group（需安裝 pyarrow）"""
+    
+    name = 'parquet'
+    
+    def __init__(self, path: Optional[str] = None, row_group_size: Optional[int] = None):
+        """
+        初始化
+        
+        Args:
+            path: 輸出檔案路徑（預設 EXPORT_DIR/jobs_YYYYmmdd_HHMMSS.parquet，每次執行一個檔案）
+            row_group_size: 每個 row group 的職缺數（預設 config.PARQUET_ROW_GROUP_SIZE）
+        """
+        if pa is None:
+            raise RuntimeError("Parquet 輸出需要 pyarrow，請執行 pip install pyarrow")
+        self.path = path or _export_path('parquet')
+        self.row_group_size = row_group_size or config.PARQUET_ROW_GROUP_SIZE
+        self.schema = arrow_schema()
+        self.count = 0
+        self._rows: List[Dict] = []
+        self._lock = threading.Lock()
+        self._writer = pq.ParquetWriter(self.path, self.schema, compression='zstd')
+    
+    def write(
+        self,
+        job_data: Dict,
+        category: str,
+        updated: bool = False,
+        on_written: Optional[Callable[[], None]] = None
+    ) -> bool:
+        record = to_record(job_data, category, updated)
+        with self._lock:
+            self._rows.append(record)
+            if len(self._rows) >= self.row_group_size:
+                self._flush_rows()
+        # Parquet 檔案在 close() 寫入結尾資訊前都無法讀取，逐筆等待 row group 沒有意義
+        if on_written is not None:
+            on_written()
+        return True
+    
+    def _flush_rows(self):
+        """將緩衝中的職缺寫成一個 row group（呼叫前需持有鎖）"""
+        if not self._rows:
+            return
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self.schema))
+        self.count += len(self._rows)
+        self._rows = []
+    
+    def close(self):
+        with self._lock:
+            if self._writer is None:
+                return
+            self._flush_rows()
+            self._writer.close()
+            self._writer = None
+            logger.info(f"已輸出 {self.count} 筆職缺至 {self.path}")
+
+
+def arrow_schema():
+    """
+    將 JOB_SCHEMA 轉換為 pyarrow schema
+    
+    Returns:
+        pyarrow.Schema
+    """
+    types = {
+        'string': pa.string(),
+        'list<string>': pa.list_(pa.string()),
+        'date': pa.date32(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('s'),
+    }
+    return pa.schema([(name, types[field_type]) for name, field_type in JOB_SCHEMA])
+
+
+def build_sinks(formatter: ObsidianFormatter) -> List[OutputSink]:
+    """
+    依 config.OUTPUT_SINKS 建立本次執行的輸出目的地
+    職缺索引（去重與增量更新的依據）由筆記寫入時記錄，因此一定會寫入 Obsidian 筆記
+    
+    Args:
+        formatter: Obsidian 筆記格式化器
+    
+    Returns:
+        輸出目的地清單（無法建立的目的地記錄錯誤後略過）
+    """
+    if 'obsidian' not in config.OUTPUT_SINKS:
+        logger.warning("OUTPUT_SINKS 未包含 obsidian：職缺索引需要筆記才能記錄，仍會寫入筆記以免每次重複抓取")
+    
+    sinks: List[OutputSink] = [ObsidianSink(formatter)]
+    for name in config.OUTPUT_SINKS:
+        try:
+            if name == 'obsidian':
+                continue
+            elif name == 'jsonl':
+                sinks.append(JsonlSink())
+            elif name == 'parquet':
+                sinks.append(ParquetSink())
+            else:
+                logger.warning(f"未知的輸出目的地：{name}")
+        except Exception as e:
+            logger.error(f"無法建立輸出目的地 {name}：{e}")
+    return sinks
+
+
+def write_all(
+    sinks: Sequence[OutputSink],
+    job_data: Dict,
+    category: str,
+    updated: bool = False,
+    on_written: Optional[Callable[[], None]] = None
+) -> bool:
+    """
+    將職缺輸出至所有目的地（單一目的地失敗不影響其他目的地）
+    
+    Args:
+        sinks: 輸出目的地
+        job_data: 職缺資料
+        category: 類別（搜尋關鍵字）
+        updated: 是否為重新抓取的已更新職缺
+        on_written: 所有目的地都已寫出後呼叫一次（筆記由背景寫入時於寫入執行緒中呼叫）
+    
+    Returns:
+        是否全部成功（已交給背景寫入器也視為成功）
+    """
+    remaining = [len(sinks)]
+    lock = threading.Lock()
+    
+    def sink_written():
+        with lock:
+            remaining[0] -= 1
+            finished = remaining[0] == 0
+        if finished and on_written is not None:
+            on_written()
+    
+    succeeded = True
+    for sink in sinks:
+        try:
+            succeeded = sink.write(job_data, category, updated, on_written=sink_written) and succeeded
+        except Exception as e:
+            logger.error(f"輸出職缺至 {sink.name} 時發生錯誤（{job_data['job_id']}）：{e}")
+            succeeded = False
+    return succeeded
@@ -0,0 +1,189 @@
+"""
+速率限制模組
+每類端點（列表頁、詳情頁）各自一個 token bucket，
+並以 AIMD（加法增加、乘法減少）依據回應狀況自動調整速率
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 視為「被限流」的 HTTP 狀態碼
+THROTTLE_STATUS_CODES = {403, 429}
+
+
+class AdaptiveTokenBucket:
+    """可自動調整速率的 token bucket（同步與異步呼叫端共用）"""
+    
+    def __init__(
+        self,
+        name: str,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: int = 1
+    ):
+        """
+        初始化 token bucket
+        
+        Args:
+            name: 端點類別名稱（用於日誌）
+            initial_rate: 初始速率（每秒請求數）
+            min_rate: 最低速率
+            max_rate: 最高速率
+            burst: 允許的瞬間請求數（bucket 容量）
+        """
+        self.name = name
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1, burst)
+        
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._success_streak = 0
+        self._last_decrease_at = 0.0
+        self._lock = threading.Lock()
+        
+        # 統計資料
+        self.stats = {'requests': 0, 'throttled': 0, 'waited': 0.0}
+    
+    def _refill(self, now: float):
+        """依經過時間補充 token"""
+        elapsed = now - self._updated_at
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._updated_at = now
+    
+    def _reserve(self) -> float:
+        """
+        預約一個 token
+        token 可以預支為負數，呼叫端只需等待回傳的秒數即可，不需重試
+        
+        Returns:
+            需要等待的秒數
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait_time = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            
+            # 加入少量隨機抖動，避免請求間隔過於規律
+            if wait_time > 0 and config.RATE_LIMIT_JITTER:
+                wait_time *= 1 + random.uniform(0, config.RATE_LIMIT_JITTER)
+            
+            self.stats['requests'] += 1
+            self.stats['waited'] += wait_time
+            return wait_time
+    
+    def acquire_sync(self):
+        """取得一個 token（同步版本）"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.debug(f"[{self.name}] 速率限制等待 {wait_time:.2f} 秒...")
+            time.sleep(wait_time)
+    
+    async def acquire(self):
+        """取得一個 token（異步版本，不阻塞 event loop）"""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.debug(f"[{self.name}] 速率限制等待 {wait_time:.2f} 秒...")
+            await asyncio.sleep(wait_time)
+    
+    def record_success(self):
+        """回應正常：連續成功達一定次數後加法增加速率"""
+        with self._lock:
+            self._success_streak += 1
+            if self._success_streak < config.RATE_LIMIT_SUCCESS_WINDOW:
+                return
+            
+            self._success_streak = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + config.RATE_LIMIT_INCREASE_STEP)
+                logger.debug(f"[{self.name}] 回應正常，速率提高至 {self.rate:.2f} req/s")
+    
+    def record_throttle(self, reason: str = ""):
+        """
+        被限流或逾時：乘法減少速率
+        冷卻時間內的多次失敗（通常是同一波併發請求）只減速一次
+        
+        Args:
+            reason: 觸發原因（用於日誌）
+        """
+        with self._lock:
+            self._success_streak = 0
+            self.stats['throttled'] += 1
+            
+            now = time.monotonic()
+            if now - self._last_decrease_at < config.RATE_LIMIT_COOLDOWN:
+                return
+            
+            self._last_decrease_at = now
+            self.rate = max(self.min_rate, self.rate * config.RATE_LIMIT_DECREASE_FACTOR)
+            # 清空已累積的 token，讓後續請求立即放慢
+            self._tokens = min(self._tokens, 0.0)
+            logger.warning(f"[{self.name}] 偵測到限流（{reason}），速率降低至 {self.rate:.2f} req/s")
+
+
+class RateLimiter:
+    """依端點類別管理多個 token bucket"""
+    
+    def __init__(self, limits: Optional[Dict[str, Dict]] = None):
+        """
+        初始化速率限制器
+        
+        Args:
+            limits: 端點類別 → bucket 參數（預設使用 config.RATE_LIMITS）
+        """
+        limits = limits if limits is not None else config.RATE_LIMITS
+        self.buckets: Dict[str, AdaptiveTokenBucket] = {
+            name: AdaptiveTokenBucket(name, **params) for name, params in limits.items()
+        }
+    
+    def bucket(self, endpoint: str) -> AdaptiveTokenBucket:
+        """取得指定端點類別的 bucket"""
+        return self.buckets[endpoint]
+    
+    def acquire_sync(self, endpoint: str):
+        """取得指定端點類別的 token（同步版本）"""
+        self.buckets[endpoint].acquire_sync()
+    
+    async def acquire(self, endpoint: str):
+        """取得指定端點類別的 token（異步版本）"""
+        await self.buckets[endpoint].acquire()
+    
+    def record_success(self, endpoint: str):
+        """回報請求成功"""
+        self.buckets[endpoint].record_success()
+    
+    def record_throttle(self, endpoint: str, reason: str = ""):
+        """回報請求被限流或逾時"""
+        self.buckets[endpoint].record_throttle(reason)
+    
+    def record_status(self, endpoint: str, status_code: int):
+        """
+        依 HTTP 狀態碼回報請求結果
+        
+        Args:
+            endpoint: 端點類別
+            status_code: HTTP 狀態碼
+        """
+        if status_code in THROTTLE_STATUS_CODES:
+            self.record_throttle(endpoint, f"HTTP {status_code}")
+        elif status_code < 400:
+            self.record_success(endpoint)
+    
+    def log_stats(self):
+        """輸出各端點的速率統計"""
+        for name, bucket in self.buckets.items():
+            logger.info(
+                f"速率限制 [{name}]：請求 {bucket.stats['requests']} 次，"
+                f"限流 {bucket.stats['throttled']} 次，"
+                f"累計等待 {bucket.stats['waited']:.1f} 秒，最終速率 {bucket.rate:.2f} req/s"
+            )
@@ -0,0 +1,238 @@
+"""
+請求韌性模組
+提供指數退避重試（含隨機抖動）、依主機的斷路器，以及失敗任務的 dead-letter 清單
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlparse
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 可重試的 HTTP 狀態碼（限流與暫時性的伺服器錯誤）
+RETRYABLE_STATUS_CODES = {403, 429, 500, 502, 503, 504}
+
+
+class RetryableRequestError(Exception):
+    """可重試的請求失敗（逾時、連線錯誤、限流或暫時性伺服器錯誤）"""
+
+
+class RetryPolicy:
+    """指數退避重試策略（full jitter）"""
+    
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        """
+        初始化重試策略
+        
+        Args:
+            max_attempts: 最多嘗試次數（含第一次，預設 config.RETRY_MAX_ATTEMPTS）
+            base_delay: 第一次重試的基準等待秒數（預設 config.RETRY_BASE_DELAY）
+            max_delay: 單次等待的上限秒數（預設 config.RETRY_MAX_DELAY）
+        """
+        self.max_attempts = max_attempts or config.RETRY_MAX_ATTEMPTS
+        self.base_delay = config.RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = config.RETRY_MAX_DELAY if max_delay is None else max_delay
+    
+    def delay(self, attempt: int) -> float:
+        """
+        計算第 attempt 次失敗後的等待時間
+        
+        Args:
+            attempt: 已失敗的次數（從 1 開始）
+        
+        Returns:
+            等待秒數（0 到 base × 2^(attempt-1) 之間隨機，且不超過上限）
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    斷路器
+    最近的請求失敗率過高時進入「開啟」狀態，冷卻期間所有請求暫停等待，
+    冷卻結束後放行請求，若仍失敗則再次開啟
+    """
+    
+    def __init__(self, name: str):
+        """
+        初始化斷路器
+        
+        Args:
+            name: 名稱（通常是主機名稱，用於日誌）
+        """
+        self.name = name
+        self._outcomes: Deque[bool] = deque(maxlen=config.CIRCUIT_WINDOW)
+        self._opened_until = 0.0
+        self._half_open = False
+        self._lock = threading.Lock()
+        self.stats = {'opened': 0, 'paused_seconds': 0.0}
+    
+    def _remaining(self) -> float:
+        """斷路器開啟中剩餘的冷卻秒數"""
+        return max(0.0, self._opened_until - time.monotonic())
+    
+    async def wait(self):
+        """斷路器開啟時等待冷卻結束（異步版本）"""
+        remaining = self._remaining()
+        if remaining > 0:
+            logger.warning(f"[{self.name}] 斷路器開啟中，暫停 {remaining:.0f} 秒...")
+            self.stats['paused_seconds'] += remaining
+            await asyncio.sleep(remaining)
+    
+    def wait_sync(self):
+        """斷路器開啟時等待冷卻結束（同步版本）"""
+        remaining = self._remaining()
+        if remaining > 0:
+            logger.warning(f"[{self.name}] 斷路器開啟中，暫停 {remaining:.0f} 秒...")
+            self.stats['paused_seconds'] += remaining
+            time.sleep(remaining)
+    
+    def record_success(self):
+        """記錄一次成功"""
+        with self._lock:
+            self._outcomes.append(True)
+            if self._half_open:
+                self._half_open = False
+                logger.info(f"[{self.name}] 請求恢復正常，斷路器關閉")
+    
+    def record_failure(self):
+        """記錄一次失敗，失敗率超過門檻時開啟斷路器"""
+        with self._lock:
+            self._outcomes.append(False)
+            if self._remaining() > 0:
+                return
+            
+            failures = self._outcomes.count(False)
+            ratio = failures / len(self._outcomes)
+            # 冷卻後的試探請求失敗，或視窗內失敗率過高
+            if self._half_open or (
+                len(self._outcomes) >= config.CIRCUIT_MIN_REQUESTS and ratio >= config.CIRCUIT_FAILURE_RATIO
+            ):
+                self._opened_until = time.monotonic() + config.CIRCUIT_COOLDOWN
+                self._half_open = True
+                self._outcomes.clear()
+                self.stats['opened'] += 1
+                logger.error(
+                    f"[{self.name}] 失敗率 {ratio:.0%}，斷路器開啟，暫停所有請求 {config.CIRCUIT_COOLDOWN} 秒"
+                )
+
+
+class CircuitBreakerRegistry:
+    """依主機管理斷路器"""
+    
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+    
+    def for_url(self, url: str) -> CircuitBreaker:
+        """
+        取得 URL 所屬主機的斷路器
+        
+        Args:
+            url: 請求 URL
+        
+        Returns:
+            該主機的斷路器
+        """
+        host = urlparse(url).netloc or url
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(host)
+        return self._breakers[host]
+    
+    def log_stats(self):
+        """輸出各主機斷路器統計"""
+        for breaker in self._breakers.values():
+            if breaker.stats['opened']:
+                logger.info(
+                    f"斷路器 [{breaker.name}]：開啟 {breaker.stats['opened']} 次，"
+                    f"共暫停 {breaker.stats['paused_seconds']:.0f} 秒"
+                )
+
+
+class DeadLetterQueue:
+    """重試後仍失敗的任務清單（於執行結束前再重試一次）"""
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化 dead-letter 清單
+        
+        Args:
+            path: 最終仍失敗的任務記錄檔（預設 config.DEAD_LETTER_FILE）
+        """
+        self.path = path or config.DEAD_LETTER_FILE
+        self._items: Dict[tuple, Dict] = {}
+    
+    def add(self, kind: str, key: str, reason: str):
+        """
+        加入失敗任務
+        
+        Args:
+            kind: 任務類型（'detail' 或 'list'）
+            key: 任務鍵（職缺 ID，或「關鍵字#頁碼」）
+            reason: 失敗原因
+        """
+        self._items[(kind, key)] = {'kind': kind, 'key': key, 'reason': reason}
+        logger.warning(f"已加入 dead-letter 清單：{kind} {key}（{reason}）")
+    
+    def drain(self, kind: str, keys: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        取出並移除指定類型的失敗任務
+        
+        Args:
+            kind: 任務類型
+            keys: 只取出這些任務鍵（None 表示該類型的所有任務；其餘任務留在清單中，結束時寫入日誌）
+        
+        Returns:
+            失敗任務清單
+        """
+        keys = set(keys) if keys is not None else None
+        items = [
+            item for (item_kind, key), item in self._items.items()
+            if item_kind == kind and (keys is None or key in keys)
+        ]
+        for item in items:
+            del self._items[(kind, item['key'])]
+        return items
+    
+    def keys(self, kind: str) -> Set[str]:
+        """
+        取得指定類型的失敗任務鍵（不移除）
+        
+        Args:
+            kind: 任務類型
+        
+        Returns:
+            任務鍵集合
+        """
+        return {key for (item_kind, key) in self._items if item_kind == kind}
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def persist(self):
+        """將最終仍失敗的任務附加寫入記錄檔，方便之後手動處理"""
+        if not self._items:
+            return
+        
+        failed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for item in self._items.values():
+                    f.write(json.dumps({**item, 'failed_at': failed_at}, ensure_ascii=False) + "\n")
+            logger.warning(f"{len(self._items)} 個任務最終仍失敗，已記錄至 {self.path}")
+        except Exception as e:
+            logger.error(f"寫入 dead-letter 記錄檔失敗：{e}")
@@ -0,0 +1,186 @@
+"""
+職缺詳情回應快取模組
+以 SQLite 單一檔案保存職缺詳情 API 的 JSON 回應，
+支援 TTL、依容量上限的 LRU 淘汰，以及 ETag / Last-Modified 條件式請求
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from . import config
+
+logger = logging.getLogger(__name__)
+
+
+class DetailResponseCache:
+    """職缺詳情回應快取（以 job_id 為鍵）"""
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        """
+        初始化快取
+        
+        Args:
+            path: SQLite 檔案路徑（預設 config.DETAIL_CACHE_FILE）
+            ttl: 快取有效秒數（預設 config.DETAIL_CACHE_TTL）
+            max_bytes: 快取容量上限（預設 config.DETAIL_CACHE_MAX_BYTES）
+        """
+        self.path = path or config.DETAIL_CACHE_FILE
+        self.ttl = config.DETAIL_CACHE_TTL if ttl is None else ttl
+        self.max_bytes = config.DETAIL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS detail_cache (
+                job_id TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_detail_cache_access ON detail_cache(last_access)")
+        self._conn.commit()
+        
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM detail_cache").fetchone()[0]
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        讀取快取（不論是否過期）
+        
+        Args:
+            job_id: 職缺 ID
+        
+        Returns:
+            {'payload', 'etag', 'last_modified', 'fresh'}，無快取時回傳 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM detail_cache WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            
+            now = time.time()
+            self._conn.execute("UPDATE detail_cache SET last_access = ? WHERE job_id = ?", (now, job_id))
+            self._conn.commit()
+        
+        body, etag, last_modified, fetched_at = row
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            logger.warning(f"快取內容損毀，將重新抓取：{job_id}")
+            self.stats['misses'] += 1
+            return None
+        
+        # 過期的快取仍回傳，供條件式請求使用，但計為未命中
+        fresh = now - fetched_at < self.ttl
+        self.stats['hits' if fresh else 'misses'] += 1
+        return {
+            'payload': payload,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': fresh,
+        }
+    
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        依快取內容產生條件式請求的 Headers
+        
+        Args:
+            entry: get() 回傳的快取內容
+        
+        Returns:
+            If-None-Match / If-Modified-Since Headers
+        """
+        headers = {}
+        if entry:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def put(self, job_id: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        寫入快取，超過容量上限時淘汰最久未使用的項目
+        
+        Args:
+            job_id: 職缺 ID
+            body: 回應的 JSON 文字
+            etag: 回應的 ETag
+            last_modified: 回應的 Last-Modified
+        """
+        size = len(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM detail_cache WHERE job_id = ?", (job_id,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detail_cache "
+                "(job_id, body, etag, last_modified, fetched_at, last_access, size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, body, etag, last_modified, now, now, size)
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+    
+    def touch(self, job_id: str):
+        """
+        伺服器回應 304 時更新快取時間
+        
+        Args:
+            job_id: 職缺 ID
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE detail_cache SET fetched_at = ?, last_access = ? WHERE job_id = ?",
+                (now, now, job_id)
+            )
+            self._conn.commit()
+        self.stats['revalidated'] += 1
+    
+    def _evict(self):
+        """淘汰最久未使用的項目，直到容量降到上限的 90%（呼叫端需持有鎖）"""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT job_id, size FROM detail_cache ORDER BY last_access").fetchall()
+        evicted = []
+        for job_id, size in rows:
+            if self._total_bytes <= target:
+                break
+            evicted.append((job_id,))
+            self._total_bytes -= size
+        
+        self._conn.executemany("DELETE FROM detail_cache WHERE job_id = ?", evicted)
+        self.stats['evictions'] += len(evicted)
+        logger.info(f"快取超過容量上限，已淘汰 {len(evicted)} 筆最久未使用的職缺詳情")
+    
+    def log_stats(self):
+        """輸出快取統計"""
+        logger.info(
+            f"職缺詳情快取：命中 {self.stats['hits']} 次，未命中 {self.stats['misses']} 次，"
+            f"304 驗證 {self.stats['revalidated']} 次，淘汰 {self.stats['evictions']} 筆，"
+            f"目前大小 {self._total_bytes / 1024 / 1024:.1f} MB"
+        )
+    
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
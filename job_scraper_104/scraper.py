@@ -5,12 +5,15 @@
 
 import logging
 import asyncio
-import os
-import re
 from typing import Set, List, Dict
 from .api_client import Job104APIClient
+from .checkpoint import CrawlCheckpoint
+from .crawl_pipeline import CrawlPipeline
+from .job_index import JobIndex
 from .keyword_linker import KeywordLinker
+from .note_writer import NoteWriter
 from .obsidian_formatter import ObsidianFormatter
+from .output_sinks import build_sinks
 from . import config
 
 logger = logging.getLogger(__name__)
@@ -29,10 +32,16 @@ class JobScraper:
         """
         self.api_client = Job104APIClient(use_cdp=use_cdp, cdp_url=cdp_url)
         self.keyword_linker = KeywordLinker()
-        self.formatter = ObsidianFormatter()
+        self.job_index = JobIndex()
+        # 筆記交給背景寫入器，管線不需等待磁碟（同步磁碟上每次寫入可能要數十毫秒）
+        self.note_writer = NoteWriter()
+        self.formatter = ObsidianFormatter(job_index=self.job_index, writer=self.note_writer)
         self.scraped_job_ids: Set[str] = set()  # 記錄已抓取的職缺 ID
+        self.pipeline = CrawlPipeline(
+            self.api_client, self.keyword_linker, self.formatter, self.scraped_job_ids, job_index=self.job_index
+        )
         
-        # 從檔案系統載入已抓取的 job_id（持久化去重）
+        # 從職缺索引載入已抓取的 job_id（持久化去重）
         if config.ENABLE_DEDUPLICATION:
             self._load_existing_job_ids()
     
@@ -49,99 +58,23 @@ class JobScraper:
         """
         logger.info(f"========== 開始爬取關鍵字：{keyword} ==========")
         
-        jobs = []
-        page = 1
-        
-        while len(jobs) < max_jobs:
-            logger.info(f"正在爬取第 {page} 頁...")
-            
-            # 使用 CDP 搜尋職缺列表
-            job_ids = await self.api_client.search_jobs_with_cdp(
-                keyword=keyword,
-                page=page,
-                max_jobs=max_jobs - len(jobs)  # 只抓取還需要的數量
-            )
-            
-            if not job_ids:
-                logger.warning(f"第 {page} 頁無職缺，停止爬取")
-                break
-            
-            new_jobs_in_page = 0
-            
-            # 遍歷每個職缺 ID
-            for job_id in job_ids:
-                # 去重檢查
-                if config.ENABLE_DEDUPLICATION and job_id in self.scraped_job_ids:
-                    logger.debug(f"職缺 {job_id} 已抓取，跳過")
-                    continue
-                
-                # 取得職缺詳情（使用 requests）
-                job_data = self.api_client.get_job_detail(job_id)
-                if not job_data:
-                    logger.warning(f"無法取得職缺詳情：{job_id}")
-                    continue
-                
-                # 技術名詞處理（加上連結並學習新關鍵字）
-                job_data = self.keyword_linker.process_job_data(job_data)
-                
-                # 加入結果清單
-                jobs.append(job_data)
-                self.scraped_job_ids.add(job_id)
-                new_jobs_in_page += 1
-                
-                logger.info(f"已抓取 {len(jobs)}/{max_jobs} 筆職缺：{job_data['title']}")
-                
-                # 檢查是否已達目標數量
-                if len(jobs) >= max_jobs:
-                    break
-            
-            if len(job_ids) == 0:
-                logger.info("本頁沒有抓到任何職缺 ID，停止翻頁")
-                break
-                
-            # 如果發現本頁全都是重複的，還是稍微記錄一下，但不要立刻 break
-            # 因為 104 搜尋如果是相關性排序，新的可能在後面
-            if new_jobs_in_page == 0:
-                logger.info(f"第 {page} 頁所有職缺皆已抓取過或無法取得")
-            
-            # 翻到下一頁
-            page += 1
-            
-            # 避免無限迴圈（最多爬取 10 頁）
-            if page > 10:
-                logger.warning("已達最大頁數限制（10 頁），停止爬取")
-                break
+        jobs_by_keyword = await self.pipeline.run([keyword], max_jobs, save_notes=False)
+        jobs = jobs_by_keyword[keyword]
         
         logger.info(f"========== 完成爬取關鍵字：{keyword}，共 {len(jobs)} 筆 ==========")
         return jobs
     
     def _load_existing_job_ids(self):
         """
-        從檔案系統載入已存在的 job_id（持久化去重）
-        掃描所有已儲存的筆記檔案，提取 job_id
+        從職缺索引載入已存在的 job_id（持久化去重）
+        索引為空時（第一次使用），先掃描既有的筆記檔案匯入索引
         """
         try:
-            if not os.path.exists(config.OUTPUT_DIR):
-                logger.info("輸出目錄不存在，跳過載入已抓取職缺")
-                return
-            
-            # 掃描所有子目錄
-            for category in os.listdir(config.OUTPUT_DIR):
-                category_path = os.path.join(config.OUTPUT_DIR, category)
-                if not os.path.isdir(category_path):
-                    continue
-                
-                # 掃描該類別下的所有 .md 檔案
-                for filename in os.listdir(category_path):
-                    if not filename.endswith('.md'):
-                        continue
-                    
-                    # 從檔名提取 job_id（格式：公司_職缺_jobid.md）
-                    match = re.search(r'_([a-z0-9]+)\.md$', filename)
-                    if match:
-                        job_id = match.group(1)
-                        self.scraped_job_ids.add(job_id)
+            if len(self.job_index) == 0:
+                logger.info("職缺索引為空，從既有筆記匯入（之後可用 --mode rebuild-index 手動重建）")
+                self.job_index.rebuild()
             
+            self.scraped_job_ids.update(self.job_index.job_ids())
             logger.info(f"已載入 {len(self.scraped_job_ids)} 個已抓取的職缺 ID")
             
         except Exception as e:
@@ -160,32 +93,61 @@ class JobScraper:
         """
         return asyncio.run(self.scrape_keyword_async(keyword, max_jobs))
     
-    async def scrape_all_async(self):
-        """爬取所有關鍵字的職缺並儲存為 Obsidian 筆記（異步版本）"""
+    async def scrape_all_async(self, resume: bool = False):
+        """
+        爬取所有關鍵字的職缺並儲存為 Obsidian 筆記（異步版本）
+        
+        Args:
+            resume: 是否從上次中斷的檢查點繼續
+        """
         logger.info("********** 開始執行 104 職缺爬蟲（混合方案）**********")
         
-        for keyword in config.KEYWORDS:
-            try:
-                # 爬取職缺
-                jobs = await self.scrape_keyword_async(keyword, config.MAX_JOBS_PER_KEYWORD)
-                
-                # 儲存為 Obsidian 筆記
-                for job_data in jobs:
-                    self.formatter.save_job_note(job_data, keyword)
-                
-                logger.info(f"關鍵字「{keyword}」已完成，共儲存 {len(jobs)} 筆筆記")
-                
-            except Exception as e:
-                logger.error(f"爬取關鍵字「{keyword}」時發生錯誤：{e}")
-                import traceback
-                traceback.print_exc()
-                continue
+        checkpoint = CrawlCheckpoint()
+        resume_state = checkpoint.load() if resume else None
+        if resume and resume_state is None:
+            logger.info("沒有可續跑的檢查點，重新開始執行")
+        keywords = resume_state.keywords if resume_state else config.KEYWORDS
+        max_jobs = resume_state.max_jobs if resume_state else config.MAX_JOBS_PER_KEYWORD
+        checkpoint.start(keywords, max_jobs, resume=resume_state is not None)
+        
+        # 列表 → 詳情 → 連結 → 寫入 以管線方式同時進行，職缺完成即寫入筆記
+        # 輸出目的地每次執行重新建立（Parquet 每次執行一個檔案）
+        sinks = build_sinks(self.formatter)
+        succeeded = False
+        try:
+            await self.pipeline.run(
+                keywords, max_jobs, checkpoint=checkpoint, resume_state=resume_state, sinks=sinks
+            )
+            succeeded = True
+        except Exception as e:
+            logger.error(f"爬蟲管線執行時發生錯誤：{e}")
+            logger.info("已保留檢查點，可使用 --resume 從中斷處繼續")
+            import traceback
+            traceback.print_exc()
+        finally:
+            # 等待背景寫入的筆記與匯出檔案全部寫入磁碟後才結束檢查點
+            for sink in sinks:
+                await asyncio.to_thread(sink.close)
+            failed_notes = await asyncio.to_thread(self.note_writer.flush)
+            if failed_notes:
+                logger.error(f"{failed_notes} 篇筆記寫入失敗，已保留檢查點，可使用 --resume 重新處理")
+            if succeeded and not failed_notes:
+                checkpoint.complete()
+            checkpoint.close()
         
         logger.info("********** 所有爬取任務已完成 **********")
+        self.formatter.log_stats()
+        await asyncio.to_thread(self.keyword_linker.compact_learned_keywords)
+        self.api_client.log_stats()
         
-        # 關閉 API 客戶端
-        self.api_client.close()
+        # 關閉 API 客戶端（職缺索引每筆皆已提交，保持開啟供排程模式下次執行使用）
+        await self.api_client.aclose()
     
-    def scrape_all(self):
-        """爬取所有關鍵字的職缺並儲存為 Obsidian 筆記（同步包裝）"""
-        asyncio.run(self.scrape_all_async())
+    def scrape_all(self, resume: bool = False):
+        """
+        爬取所有關鍵字的職缺並儲存為 Obsidian 筆記（同步包裝）
+        
+        Args:
+            resume: 是否從上次中斷的檢查點繼續
+        """
+        asyncio.run(self.scrape_all_async(resume))
@@ -0,0 +1,102 @@
+"""
+筆記詞彙切分模組
+將筆記中會加上技術名詞連結的段落切分為索引詞（英數詞彙與中文二元組），
+存入職缺索引的反向索引後，學到新關鍵字時只需找出可能含有該關鍵字的筆記
+"""
+
+from typing import Iterator, Optional, Set, Tuple
+from .keyword_matcher import DIGIT, HAN, LATIN, script_class
+
+# 會加上技術名詞連結的段落（對應 KeywordLinker.process_job_data 處理的欄位）
+LINKED_SECTIONS = ('## 📝 工作內容', '### 其他條件')
+
+
+def iter_note_lines(content: str) -> Iterator[Tuple[str, bool]]:
+    """
+    逐行走訪筆記
+    
+    Args:
+        content: 筆記內容
+    
+    Yields:
+        (該行文字（含換行）, 是否位於會加上技術名詞連結的段落)
+    """
+    linkable = False
+    for line in content.splitlines(keepends=True):
+        stripped = line.rstrip()
+        if stripped.startswith(('## ', '### ')):
+            linkable = stripped in LINKED_SECTIONS
+            yield line, False
+        elif stripped == '---':
+            # frontmatter 與頁尾的分隔線
+            linkable = False
+            yield line, False
+        else:
+            yield line, linkable
+
+
+def _runs(text: str) -> Iterator[Tuple[str, str]]:
+    """將文字切分為英數與中文的連續區段（符號與空白為分隔）"""
+    run_class = None
+    start = 0
+    for index, char in enumerate(text):
+        char_class = script_class(char)
+        if char_class == DIGIT:
+            char_class = LATIN  # 英數相鄰屬於同一個詞（與比對器的詞彙邊界一致）
+        if char_class != run_class:
+            if run_class in (LATIN, HAN):
+                yield run_class, text[start:index]
+            run_class, start = char_class, index
+    if run_class in (LATIN, HAN):
+        yield run_class, text[start:]
+
+
+def index_terms(text: str) -> Set[str]:
+    """
+    切分文字為索引詞
+    
+    Args:
+        text: 文字
+    
+    Returns:
+        索引詞集合（英數詞彙轉小寫；中文每兩字一組，單獨一個字的區段保留單字）
+    """
+    terms = set()
+    for run_class, run in _runs(text.lower()):
+        if run_class == LATIN or len(run) == 1:
+            terms.add(run)
+        else:
+            terms.update(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def note_terms(content: str) -> Set[str]:
+    """
+    取得筆記中會加上技術名詞連結的段落的索引詞
+    
+    Args:
+        content: 筆記內容
+    
+    Returns:
+        索引詞集合
+    """
+    return index_terms(''.join(line for line, linkable in iter_note_lines(content) if linkable))
+
+
+def keyword_terms(keyword: str) -> Optional[Set[str]]:
+    """
+    取得含有關鍵字的筆記必定具備的索引詞
+    
+    Args:
+        keyword: 關鍵字
+    
+    Returns:
+        索引詞集合；無法以索引詞篩選時（只有符號或含單獨一個中文字）回傳 None
+    """
+    terms = set()
+    for run_class, run in _runs(keyword.lower()):
+        if run_class == HAN and len(run) == 1:
+            # 筆記中這個字可能與前後的中文相連，只會出現在二元組裡
+            return None
+        terms.update(index_terms(run))
+    return terms or None
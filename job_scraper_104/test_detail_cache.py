@@ -0,0 +1,115 @@
+"""
+測試職缺詳情快取在多次執行之間持續有效
+以模擬的 104 回應（不需要網路連線）連續執行兩次爬蟲，
+模擬排程模式下同一個 JobScraper 每天重複執行的情況
+"""
+
+import sys
+import os
+import asyncio
+import json
+import tempfile
+
+# 設定 UTF-8 編碼（解決 Windows 終端機編碼問題）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from job_scraper_104 import api_client, config
+from job_scraper_104.response_cache import DetailResponseCache
+from job_scraper_104.scraper import JobScraper
+
+JOB_IDS = ['8aaa1', '8aaa2', '8aaa3']
+
+
+def _use_temp_paths(temp_dir: str):
+    """所有輸出檔案改寫到暫存目錄，不影響實際的筆記與資料"""
+    config.OUTPUT_DIR = os.path.join(temp_dir, 'vault')
+    config.JOB_INDEX_FILE = os.path.join(temp_dir, 'job_index.sqlite3')
+    config.CHECKPOINT_FILE = os.path.join(temp_dir, 'crawl_checkpoint.jsonl')
+    config.DEAD_LETTER_FILE = os.path.join(temp_dir, 'dead_letters.jsonl')
+    config.DETAIL_CACHE_FILE = os.path.join(temp_dir, 'job_detail_cache.sqlite3')
+    config.LEARNED_KEYWORDS_FILE = os.path.join(temp_dir, 'learned_keywords.yaml')
+    config.LEARNED_KEYWORDS_JOURNAL = os.path.join(temp_dir, 'learned_keywords.journal')
+    config.KEYWORD_CACHE_FILE = os.path.join(temp_dir, 'keyword_vocabulary.pickle')
+    config.OUTPUT_SINKS = ['obsidian']
+    config.KEYWORDS = ['資料工程']
+    config.MAX_JOBS_PER_KEYWORD = len(JOB_IDS)
+    # 第二次執行仍需抓取同樣的職缺，才能驗證是否使用快取
+    config.ENABLE_DEDUPLICATION = False
+    config.LIST_FETCH_MODE = 'api'
+    config.DETAIL_CACHE_ENABLED = True
+    config.RATE_LIMITS = {
+        kind: {'initial_rate': 100.0, 'min_rate': 100.0, 'max_rate': 100.0, 'burst': 100}
+        for kind in ('list', 'detail')
+    }
+
+
+def _mock_104(detail_requests: list) -> httpx.MockTransport:
+    """模擬搜尋 API（一頁 JOB_IDS）與詳情 API（記錄每次請求）"""
+    
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == config.API_SEARCH_ENDPOINT:
+            page = int(request.url.params.get('page', 1))
+            items = [
+                {'jobName': f'職缺 {job_id}', 'link': {'job': f'//www.104.com.tw/job/{job_id}'}}
+                for job_id in (JOB_IDS if page == 1 else [])
+            ]
+            return httpx.Response(200, json={'data': {'list': items}})
+        
+        job_id = request.url.path.rsplit('/', 1)[-1]
+        detail_requests.append(job_id)
+        body = {'data': {
+            'header': {'jobName': f'職缺 {job_id}', 'custName': '測試公司', 'appearDate': '2026/10/01'},
+            'jobDetail': {'jobDescription': '使用 Python 開發'},
+            'condition': {},
+        }}
+        return httpx.Response(200, text=json.dumps(body, ensure_ascii=False), headers={'ETag': f'"{job_id}"'})
+    
+    return httpx.MockTransport(handler)
+
+
+def test_cache_survives_runs():
+    """測試第二次執行時詳情皆由快取取得（close() 後快取會重新開啟）"""
+    print("========== 測試連續兩次執行的詳情快取 ==========")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _use_temp_paths(temp_dir)
+        detail_requests = []
+        transport = _mock_104(detail_requests)
+        
+        original_client = httpx.AsyncClient
+        api_client.httpx.AsyncClient = lambda **kwargs: original_client(transport=transport, **kwargs)
+        
+        # 快取在 aclose() 時關閉，關閉前記錄本次執行的統計
+        cache_stats = []
+        original_close = DetailResponseCache.close
+        
+        def close(cache):
+            cache_stats.append(dict(cache.stats))
+            original_close(cache)
+        
+        DetailResponseCache.close = close
+        try:
+            scraper = JobScraper(use_cdp=False)
+            asyncio.run(scraper.scrape_all_async())
+            asyncio.run(scraper.scrape_all_async())
+        finally:
+            api_client.httpx.AsyncClient = original_client
+            DetailResponseCache.close = original_close
+            scraper.job_index.close()
+        
+        assert len(cache_stats) == 2, f"應關閉快取兩次，實際為 {len(cache_stats)} 次"
+        assert sorted(detail_requests) == sorted(JOB_IDS), f"第二次執行不應再請求詳情：{detail_requests}"
+        assert cache_stats[1]['hits'] == len(JOB_IDS), f"第二次執行應命中快取 {len(JOB_IDS)} 次：{cache_stats[1]}"
+    print(f"[成功] 第二次執行命中快取 {cache_stats[1]['hits']} 次，未再請求詳情 API")
+
+
+if __name__ == '__main__':
+    test_cache_survives_runs()
+    
+    print("\n測試完成！")
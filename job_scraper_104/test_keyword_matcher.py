@@ -0,0 +1,71 @@
+"""
+測試技術名詞比對的詞彙邊界
+驗證中英混排時哪些位置會加上連結（不需要網路連線）
+"""
+
+import sys
+import os
+
+# 設定 UTF-8 編碼（解決 Windows 終端機編碼問題）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_scraper_104.keyword_matcher import DIGIT, HAN, LATIN, OTHER, KeywordMatcher, script_class
+
+
+def test_script_class():
+    """測試字元的文字類別"""
+    print("========== 測試文字類別 ==========")
+    
+    cases = {
+        'a': LATIN, 'Z': LATIN, 'é': LATIN, 'Ｐ': LATIN,
+        '3': DIGIT, '３': DIGIT,
+        '資': HAN, 'の': HAN, '한': HAN,
+        '_': OTHER, '-': OTHER, ' ': OTHER, '，': OTHER, '#': OTHER,
+    }
+    for char, expected in cases.items():
+        actual = script_class(char)
+        assert actual == expected, f"{char!r} 應為 {expected}，實際為 {actual}"
+    print(f"[成功] {len(cases)} 個字元的文字類別正確")
+
+
+def test_boundaries():
+    """測試詞彙邊界（中文與英數之間是邊界，英數相連不是）"""
+    print("\n========== 測試詞彙邊界 ==========")
+    
+    matcher = KeywordMatcher(['Python', 'R', 'SQL', '資料分析', '資料', '資料庫', 'C++', 'Node.js'])
+    cases = [
+        # 中英混排：中文與英數之間是邊界
+        ('熟悉Python經驗', '熟悉[[Python]]經驗'),
+        ('熟悉R語言', '熟悉[[R]]語言'),
+        # 英數相連屬於同一個詞
+        ('Python3', 'Python3'),
+        ('MySQL', 'MySQL'),
+        ('PySQL2', 'PySQL2'),
+        # 中文不使用空白分詞：中文字之間也是邊界，同一位置取最長的關鍵字
+        ('負責資料分析工作', '負責[[資料分析]]工作'),
+        ('熟悉資料庫設計', '熟悉[[資料庫]]設計'),
+        # 底線與其他符號為邊界
+        ('python_script', '[[Python]]_script'),
+        ('SQL-based', '[[SQL]]-based'),
+        # 關鍵字以符號結尾
+        ('C++11', '[[C++]]11'),
+        ('Node.js開發', '[[Node.js]]開發'),
+        # 已存在的連結不重複加上
+        ('[[Python]] 與 Python', '[[Python]] 與 [[Python]]'),
+    ]
+    for text, expected in cases:
+        actual = matcher.link(text)
+        assert actual == expected, f"{text!r} 應為 {expected!r}，實際為 {actual!r}"
+    print(f"[成功] {len(cases)} 個邊界案例正確")
+
+
+if __name__ == '__main__':
+    test_script_class()
+    test_boundaries()
+    
+    print("\n測試完成！")
@@ -0,0 +1,90 @@
+"""
+測試共用工作佇列的名額釋出
+職缺詳情任務確定失敗後，因名額已滿而停止翻頁的關鍵字應繼續抓取下一頁
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# 設定 UTF-8 編碼（解決 Windows 終端機編碼問題）
+if sys.platform == 'win32':
+    import io
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from job_scraper_104 import config
+from job_scraper_104.work_queue import WorkQueue
+
+
+def _lease(queue: WorkQueue, kind: str):
+    """取得下一個任務並確認種類"""
+    task = queue.lease('worker')
+    assert task is not None and task['kind'] == kind, f"應取得 {kind} 任務，實際為 {task}"
+    return task
+
+
+def _list_keys(queue: WorkQueue) -> list:
+    """取得所有列表任務的 key"""
+    with queue._transaction() as conn:
+        return [row[0] for row in conn.execute("SELECT key FROM tasks WHERE kind = 'list' ORDER BY task_id")]
+
+
+def test_failed_detail_resumes_paging():
+    """測試職缺詳情失敗（回報失敗與租約逾時）後會補建下一頁的列表任務"""
+    print("========== 測試失敗任務釋出名額 ==========")
+    
+    original_attempts = config.WORK_MAX_ATTEMPTS
+    config.WORK_MAX_ATTEMPTS = 1
+    with tempfile.TemporaryDirectory() as temp_dir:
+        queue = WorkQueue(os.path.join(temp_dir, 'work_queue.sqlite3'), lease_seconds=0.1)
+        try:
+            queue.seed(['資料工程'], 2, [])
+            
+            # 第 1 頁有 3 個職缺，名額 2 個已滿，不建立第 2 頁
+            task = _lease(queue, 'list')
+            queue.add_page_results('資料工程', 1, [{'job_id': job_id} for job_id in ('a1', 'a2', 'a3')])
+            queue.complete(task, 'worker')
+            assert _list_keys(queue) == ['資料工程#1'], _list_keys(queue)
+            
+            # 職缺詳情回報失敗 → 名額釋出，補建第 2 頁
+            queue.fail(_lease(queue, 'detail'), 'worker', '無法取得職缺詳情')
+            assert _list_keys(queue) == ['資料工程#1', '資料工程#2'], _list_keys(queue)
+            print("[成功] 回報失敗後補建第 2 頁")
+            
+            # 第 2 頁取得職缺後名額又滿了，不建立第 3 頁
+            detail = _lease(queue, 'detail')
+            queue.complete(detail, 'worker', {'job_id': detail['key']})
+            task = _lease(queue, 'list')
+            queue.add_page_results('資料工程', 2, [{'job_id': 'b1'}])
+            queue.complete(task, 'worker')
+            assert _list_keys(queue) == ['資料工程#1', '資料工程#2'], _list_keys(queue)
+            
+            # worker 中途當掉，租約逾時 → 名額釋出，補建第 3 頁
+            _lease(queue, 'detail')
+            time.sleep(0.2)
+            queue.counts()
+            assert _list_keys(queue) == ['資料工程#1', '資料工程#2', '資料工程#3'], _list_keys(queue)
+            print("[成功] 租約逾時後補建第 3 頁")
+            
+            # 最後一頁沒有職缺時，名額釋出也不再翻頁
+            task = _lease(queue, 'list')
+            queue.add_page_results('資料工程', 3, [])
+            queue.complete(task, 'worker')
+            with queue._transaction() as conn:
+                conn.execute("INSERT INTO tasks (kind, key, keyword, status, updated_at) VALUES ('detail', 'c1', '資料工程', 'pending', 0)")
+            queue.fail(_lease(queue, 'detail'), 'worker', '無法取得職缺詳情')
+            assert _list_keys(queue) == ['資料工程#1', '資料工程#2', '資料工程#3'], _list_keys(queue)
+            print("[成功] 已無更多結果時不再翻頁")
+        finally:
+            queue.close()
+            config.WORK_MAX_ATTEMPTS = original_attempts
+
+
+if __name__ == '__main__':
+    test_failed_detail_resumes_paging()
+    
+    print("\n測試完成！")
@@ -0,0 +1,114 @@
+"""
+筆記重新連結模組
+學到新的技術名詞後，透過職缺索引中的反向索引找出含有這些名詞的既有筆記，
+只重寫這些筆記的工作內容與其他條件段落，不必重新處理整個筆記目錄
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+from .job_index import JobIndex, content_hash
+from .keyword_linker import KeywordLinker
+from .keyword_matcher import KeywordMatcher
+from .note_writer import write_atomic
+from .term_index import iter_note_lines, keyword_terms
+
+logger = logging.getLogger(__name__)
+
+
+class VaultRelinker:
+    """為既有筆記補上新學到的技術名詞連結"""
+    
+    def __init__(self, job_index: JobIndex, keyword_linker: KeywordLinker):
+        """
+        初始化重新連結器
+        
+        Args:
+            job_index: 職缺索引（包含筆記的反向索引）
+            keyword_linker: 技術名詞連結器（提供自動學習的關鍵字）
+        """
+        self.job_index = job_index
+        self.keyword_linker = keyword_linker
+    
+    def pending_keywords(self) -> set:
+        """
+        取得尚未套用至既有筆記的自動學習關鍵字
+        
+        Returns:
+            關鍵字集合
+        """
+        return self.keyword_linker.learned_keywords() - self.job_index.relinked_keywords()
+    
+    def relink(self, keywords: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        為含有指定關鍵字的筆記加上連結
+        
+        Args:
+            keywords: 要套用的關鍵字（預設為尚未套用的自動學習關鍵字）
+        
+        Returns:
+            {'keywords': 關鍵字數, 'candidates': 候選筆記數, 'updated': 實際重寫的筆記數, 'failed': 失敗數}
+        """
+        keywords = sorted(set(keywords) if keywords is not None else self.pending_keywords())
+        stats = {'keywords': len(keywords), 'candidates': 0, 'updated': 0, 'failed': 0}
+        if not keywords:
+            logger.info("沒有需要套用至既有筆記的新關鍵字")
+            return stats
+        
+        candidates = set()
+        for keyword in keywords:
+            candidates |= self.job_index.notes_containing(keyword_terms(keyword))
+        stats['candidates'] = len(candidates)
+        logger.info(f"{len(keywords)} 個新關鍵字，反向索引找到 {len(candidates)} 篇候選筆記")
+        
+        matcher = KeywordMatcher(keywords)
+        for job_id in sorted(candidates):
+            try:
+                if self._relink_note(job_id, matcher):
+                    stats['updated'] += 1
+            except Exception as e:
+                logger.error(f"重新連結筆記失敗（{job_id}）：{e}")
+                stats['failed'] += 1
+        
+        # 有筆記失敗時保留待處理狀態，下次執行再試
+        if not stats['failed']:
+            self.job_index.mark_relinked(keywords)
+        
+        logger.info(
+            f"重新連結完成：重寫 {stats['updated']} 篇筆記（候選 {stats['candidates']} 篇，失敗 {stats['failed']} 篇）"
+        )
+        return stats
+    
+    def _relink_note(self, job_id: str, matcher: KeywordMatcher) -> bool:
+        """
+        為單篇筆記加上連結
+        
+        Args:
+            job_id: 職缺 ID
+            matcher: 只包含新關鍵字的比對器（已存在的連結不會重複加上）
+        
+        Returns:
+            是否有重寫筆記
+        """
+        entry = self.job_index.get(job_id)
+        if entry is None:
+            return False
+        
+        file_path = entry['file_path']
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            logger.warning(f"筆記已不存在，略過：{file_path}")
+            return False
+        
+        relinked = ''.join(
+            matcher.link(line) if linkable else line
+            for line, linkable in iter_note_lines(content)
+        )
+        if relinked == content:
+            return False
+        
+        write_atomic(file_path, relinked)
+        self.job_index.record(job_id, entry['category'], file_path, content_hash=content_hash(relinked))
+        logger.info(f"已重新連結筆記：{file_path}")
+        return True
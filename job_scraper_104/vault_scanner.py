@@ -0,0 +1,198 @@
+"""
+筆記目錄掃描模組
+以 os.scandir 走訪筆記目錄，並以執行緒池平行讀取每篇筆記開頭的 frontmatter
+（讀到結尾的 --- 即停止），不解析整篇筆記；
+以 generator 逐筆產生結果，供重建索引、統計報表與資料搬移使用
+"""
+
+import ast
+import logging
+import os
+import re
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 筆記檔名格式：公司_職缺_jobid.md
+_NOTE_FILENAME_PATTERN = re.compile(r'_([a-z0-9]+)\.md$')
+# 職缺連結中的 job_id
+_JOB_URL_PATTERN = re.compile(r'/job/([a-z0-9]+)')
+# 每次讀取的位元組數與 frontmatter 讀取上限
+_READ_CHUNK = 4096
+_MAX_FRONTMATTER_BYTES = 64 * 1024
+
+
+def _iter_note_files(output_dir: str) -> Iterator[Tuple[str, str]]:
+    """走訪筆記目錄，產生 (類別, 筆記路徑)（類別為第一層子目錄名稱）"""
+    with os.scandir(output_dir) as categories:
+        for category in categories:
+            if not category.is_dir() or category.name.startswith('.'):
+                continue
+            with os.scandir(category.path) as notes:
+                for note in notes:
+                    if note.name.endswith('.md') and note.is_file():
+                        yield category.name, note.path
+
+
+def _read_frontmatter(file_path: str) -> str:
+    """只讀取筆記開頭到 frontmatter 結尾的內容"""
+    data = b''
+    with open(file_path, 'rb') as f:
+        while len(data) < _MAX_FRONTMATTER_BYTES:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            data += chunk
+            # 第一行的 --- 之後出現的下一個 --- 即為 frontmatter 結尾
+            if data.find(b'\n---', 3) >= 0:
+                break
+    return data.decode('utf-8', errors='replace')
+
+
+def parse_frontmatter(text: str) -> Dict[str, object]:
+    """
+    解析 format_job 寫入的 frontmatter
+    
+    Args:
+        text: 筆記開頭的內容（需以 --- 開始）
+    
+    Returns:
+        欄位 → 值（keywords 為清單，其餘為字串），沒有 frontmatter 時回傳空字典
+    """
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != '---':
+        return {}
+    
+    fields: Dict[str, object] = {}
+    for line in lines[1:]:
+        if line.strip() == '---':
+            break
+        key, sep, value = line.partition(':')
+        if not sep:
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        fields[key.strip()] = value
+    
+    keywords = fields.get('keywords')
+    if isinstance(keywords, str):
+        try:
+            parsed = ast.literal_eval(keywords) if keywords else []
+            fields['keywords'] = list(parsed) if isinstance(parsed, (list, tuple)) else [str(parsed)]
+        except (ValueError, SyntaxError):
+            fields['keywords'] = [item.strip() for item in keywords.strip('[]').split(',') if item.strip()]
+    return fields
+
+
+def _scan_note(category: str, file_path: str, read_content: bool) -> Optional[Dict]:
+    """讀取單篇筆記並組成掃描結果（於執行緒池中執行）"""
+    content = None
+    try:
+        if read_content:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            fields = parse_frontmatter(content)
+        else:
+            fields = parse_frontmatter(_read_frontmatter(file_path))
+    except Exception as e:
+        # 仍以檔名辨識 job_id，筆記不會因暫時無法讀取而從索引移除
+        logger.warning(f"讀取筆記失敗，只以檔名辨識：{file_path}（{e}）")
+        fields = {}
+    
+    match = _JOB_URL_PATTERN.search(str(fields.get('job_url', '')))
+    match = match or _NOTE_FILENAME_PATTERN.search(os.path.basename(file_path))
+    if not match:
+        return None
+    
+    record = {
+        'job_id': match.group(1),
+        'category': category,
+        'file_path': file_path,
+        'title': fields.get('title', ''),
+        'company': fields.get('company', ''),
+        'salary': fields.get('salary', ''),
+        'location': fields.get('location', ''),
+        'keywords': fields.get('keywords', []),
+        'crawled_at': fields.get('crawled_at', ''),
+        'job_url': fields.get('job_url', ''),
+    }
+    if read_content:
+        record['content'] = content
+    return record
+
+
+def scan_vault(
+    output_dir: Optional[str] = None,
+    read_content: bool = False,
+    workers: Optional[int] = None
+) -> Iterator[Dict]:
+    """
+    掃描筆記目錄，逐筆產生筆記的 frontmatter 資料
+    
+    Args:
+        output_dir: 筆記根目錄（預設 config.OUTPUT_DIR）
+        read_content: 是否一併讀取整篇筆記（結果多一個 content 欄位）
+        workers: 讀取檔案的執行緒數（預設 config.VAULT_SCAN_THREADS）
+    
+    Yields:
+        {'job_id', 'category', 'file_path', 'title', 'company', 'salary', 'location',
+         'keywords', 'crawled_at', 'job_url'}（無法辨識 job_id 的檔案略過；
+        無法讀取的筆記只有 job_id 與路徑，其餘欄位為空，content 為 None）
+    """
+    output_dir = output_dir or config.OUTPUT_DIR
+    if not os.path.isdir(output_dir):
+        logger.info(f"筆記目錄不存在：{output_dir}")
+        return
+    
+    workers = workers or config.VAULT_SCAN_THREADS
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vault-scan") as executor:
+        # 同時進行中的讀取數有上限，掃描大型目錄時記憶體用量固定
+        pending = deque()
+        for category, file_path in _iter_note_files(output_dir):
+            pending.append(executor.submit(_scan_note, category, file_path, read_content))
+            if len(pending) >= workers * 4:
+                record = pending.popleft().result()
+                if record is not None:
+                    yield record
+        while pending:
+            record = pending.popleft().result()
+            if record is not None:
+                yield record
+
+
+def summarize(records: Iterator[Dict], top: int = 20) -> Dict[str, object]:
+    """
+    統計掃描結果
+    
+    Args:
+        records: scan_vault() 產生的筆記資料
+        top: 關鍵字與公司列出的筆數
+    
+    Returns:
+        {'notes': 筆記數, 'categories': 類別 → 筆記數, 'top_keywords': [(關鍵字, 次數)],
+         'top_companies': [(公司, 筆記數)], 'first_crawled': 最早抓取時間, 'last_crawled': 最近抓取時間}
+    """
+    categories = Counter()
+    keywords = Counter()
+    companies = Counter()
+    crawled = []
+    for record in records:
+        categories[record['category']] += 1
+        keywords.update(record['keywords'])
+        if record['company']:
+            companies[record['company']] += 1
+        if record['crawled_at']:
+            crawled.append(record['crawled_at'])
+    
+    return {
+        'notes': sum(categories.values()),
+        'categories': dict(categories),
+        'top_keywords': keywords.most_common(top),
+        'top_companies': companies.most_common(top),
+        'first_crawled': min(crawled) if crawled else None,
+        'last_crawled': max(crawled) if crawled else None,
+    }
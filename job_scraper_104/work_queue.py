@@ -0,0 +1,350 @@
+"""
+共用工作佇列模組
+以 SQLite 檔案（可放在共用儲存空間）保存列表頁與職缺詳情任務，
+worker 以租約（lease）取得任務，逾時未完成的任務會被其他 worker 接手，
+同一職缺只會建立一個任務，多台機器可分工爬取而不重複
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 任務狀態
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+MERGED = 'merged'
+
+
+class WorkQueue:
+    """以租約分派任務的共用工作佇列"""
+    
+    def __init__(self, path: Optional[str] = None, lease_seconds: Optional[int] = None):
+        """
+        初始化工作佇列
+        
+        Args:
+            path: SQLite 檔案路徑（預設 config.WORK_QUEUE_FILE）
+            lease_seconds: 任務租約秒數，逾時未完成即可被其他 worker 取得（預設 config.WORK_LEASE_SECONDS）
+        """
+        self.path = path or config.WORK_QUEUE_FILE
+        self.lease_seconds = lease_seconds or config.WORK_LEASE_SECONDS
+        
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        # 自行控制交易（BEGIN IMMEDIATE），確保取得租約時不會與其他程序衝突
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        # WAL 需要共用記憶體，放在網路磁碟時不可靠，因此使用預設的 rollback journal
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                payload TEXT,
+                status TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                UNIQUE (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, kind);
+            CREATE TABLE IF NOT EXISTS known_jobs (
+                job_id TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                keyword TEXT PRIMARY KEY,
+                max_jobs INTEGER NOT NULL
+            );
+        """)
+    
+    def _transaction(self):
+        """以 BEGIN IMMEDIATE 開始寫入交易（同一時間只有一個程序能寫入）"""
+        return _ImmediateTransaction(self._conn, self._lock)
+    
+    @classmethod
+    def _expire_leases(cls, conn: sqlite3.Connection, now: float):
+        """租約逾時且已達嘗試上限的任務（worker 多次中途當掉）視為失敗（需在寫入交易中呼叫）"""
+        condition = "status = ? AND lease_expires < ? AND attempts >= ?"
+        params = (LEASED, now, config.WORK_MAX_ATTEMPTS)
+        keywords = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT keyword FROM tasks WHERE kind = 'detail' AND {condition}", params
+        )]
+        conn.execute(
+            f"UPDATE tasks SET status = ?, error = '租約逾時', lease_owner = NULL, lease_expires = NULL WHERE {condition}",
+            (FAILED,) + params
+        )
+        for keyword in keywords:
+            cls._resume_paging(conn, keyword, now)
+    
+    @staticmethod
+    def _resume_paging(conn: sqlite3.Connection, keyword: str, now: float):
+        """
+        職缺詳情任務失敗後釋出名額：若該關鍵字因名額已滿而停止翻頁，建立下一頁的列表任務（需在寫入交易中呼叫）
+        
+        Args:
+            conn: 寫入交易中的資料庫連線
+            keyword: 搜尋關鍵字
+            now: 目前時間
+        """
+        max_jobs = conn.execute("SELECT max_jobs FROM runs WHERE keyword = ?", (keyword,)).fetchone()
+        max_jobs = max_jobs[0] if max_jobs else config.MAX_JOBS_PER_KEYWORD
+        reserved = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE kind = 'detail' AND keyword = ? AND status != ?",
+            (keyword, FAILED)
+        ).fetchone()[0]
+        if reserved >= max_jobs:
+            return
+        
+        # 最後一個列表任務尚未處理（仍在翻頁或列表頁本身失敗）時不需要補建
+        last = conn.execute(
+            "SELECT payload, result FROM tasks WHERE kind = 'list' AND keyword = ? ORDER BY task_id DESC LIMIT 1",
+            (keyword,)
+        ).fetchone()
+        if last is None or last[1] is None:
+            return
+        
+        page = json.loads(last[0])['page']
+        # 最後一頁沒有職缺（已無更多結果）或已達頁數上限時不再翻頁
+        if not json.loads(last[1]).get('cards') or page >= config.MAX_PAGES_PER_KEYWORD:
+            return
+        
+        conn.execute(
+            "INSERT OR IGNORE INTO tasks (kind, key, keyword, payload, status, updated_at) "
+            "VALUES ('list', ?, ?, ?, ?, ?)",
+            (f"{keyword}#{page + 1}", keyword, json.dumps({'page': page + 1}), PENDING, now)
+        )
+        logger.info(f"「{keyword}」有職缺任務失敗，名額釋出，繼續抓取第 {page + 1} 頁")
+    
+    def seed(self, keywords: Sequence[str], max_jobs: int, known_job_ids: Iterable[str]):
+        """
+        建立一次新的爬取（清除舊任務，為每個關鍵字建立第一頁的列表任務）
+        尚未合併的結果會一併清除，呼叫前需先以 take_results() 取出
+        
+        Args:
+            keywords: 搜尋關鍵字清單
+            max_jobs: 每個關鍵字的最大職缺數
+            known_job_ids: 已抓取過的職缺 ID（worker 不會再為這些職缺建立任務）
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM known_jobs")
+            conn.execute("DELETE FROM runs")
+            conn.executemany("INSERT OR IGNORE INTO known_jobs (job_id) VALUES (?)", ((job_id,) for job_id in known_job_ids))
+            conn.executemany("INSERT INTO runs (keyword, max_jobs) VALUES (?, ?)", ((keyword, max_jobs) for keyword in keywords))
+            conn.executemany(
+                "INSERT INTO tasks (kind, key, keyword, payload, status, updated_at) VALUES ('list', ?, ?, ?, ?, ?)",
+                ((f"{keyword}#1", keyword, json.dumps({'page': 1}), PENDING, now) for keyword in keywords)
+            )
+        logger.info(f"已建立工作佇列：{len(keywords)} 個關鍵字，每個最多 {max_jobs} 筆職缺")
+    
+    def lease(self, owner: str) -> Optional[Dict]:
+        """
+        取得一個任務的租約（優先處理職缺詳情，其次列表頁）
+        
+        Args:
+            owner: worker 識別名稱
+        
+        Returns:
+            任務 {'task_id', 'kind', 'key', 'keyword', 'payload'}，目前沒有可執行的任務時回傳 None
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                """
+                SELECT task_id, kind, key, keyword, payload FROM tasks
+                WHERE status = ? OR (status = ? AND lease_expires < ?)
+                ORDER BY CASE kind WHEN 'detail' THEN 0 ELSE 1 END, task_id
+                LIMIT 1
+                """,
+                (PENDING, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE task_id = ?",
+                (LEASED, owner, now + self.lease_seconds, now, row[0])
+            )
+        
+        task_id, kind, key, keyword, payload = row
+        return {
+            'task_id': task_id,
+            'kind': kind,
+            'key': key,
+            'keyword': keyword,
+            'payload': json.loads(payload) if payload else {},
+        }
+    
+    def complete(self, task: Dict, owner: str, result: Optional[Dict] = None) -> bool:
+        """
+        回報任務完成
+        
+        Args:
+            task: lease() 取得的任務
+            owner: worker 識別名稱
+            result: 任務結果（職缺詳情資料）
+        
+        Returns:
+            是否成功（租約已過期且被其他 worker 接手時回傳 False）
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result = COALESCE(?, result), lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 time.time(), task['task_id'], LEASED, owner)
+            )
+        return cursor.rowcount == 1
+    
+    def fail(self, task: Dict, owner: str, reason: str):
+        """
+        回報任務失敗（未達嘗試上限時放回佇列，由任一 worker 重試）
+        職缺詳情任務確定失敗時釋出名額，必要時繼續翻頁
+        
+        Args:
+            task: lease() 取得的任務
+            owner: worker 識別名稱
+            reason: 失敗原因
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE task_id = ? AND status = ? AND lease_owner = ?",
+                (config.WORK_MAX_ATTEMPTS, FAILED, PENDING, reason, now, task['task_id'], LEASED, owner)
+            )
+            if task['kind'] == 'detail':
+                status = conn.execute("SELECT status FROM tasks WHERE task_id = ?", (task['task_id'],)).fetchone()
+                if status and status[0] == FAILED:
+                    self._resume_paging(conn, task['keyword'], now)
+    
+    def add_page_results(self, keyword: str, page: int, cards: List[Dict]) -> int:
+        """
+        加入列表頁的結果：為尚未抓取過的職缺建立詳情任務（不超過關鍵字的名額），
+        名額未滿時建立下一頁的列表任務；本頁職缺數記錄於列表任務，供名額釋出時判斷是否繼續翻頁
+        
+        Args:
+            keyword: 搜尋關鍵字
+            page: 頁碼
+            cards: 本頁的職缺卡片
+        
+        Returns:
+            新建立的詳情任務數
+        """
+        now = time.time()
+        added = 0
+        with self._transaction() as conn:
+            max_jobs = conn.execute("SELECT max_jobs FROM runs WHERE keyword = ?", (keyword,)).fetchone()
+            max_jobs = max_jobs[0] if max_jobs else config.MAX_JOBS_PER_KEYWORD
+            reserved = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE kind = 'detail' AND keyword = ? AND status != ?",
+                (keyword, FAILED)
+            ).fetchone()[0]
+            
+            for card in cards:
+                if reserved >= max_jobs:
+                    break
+                if conn.execute("SELECT 1 FROM known_jobs WHERE job_id = ?", (card['job_id'],)).fetchone():
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tasks (kind, key, keyword, payload, status, updated_at) "
+                    "VALUES ('detail', ?, ?, ?, ?, ?)",
+                    (card['job_id'], keyword, json.dumps(card, ensure_ascii=False), PENDING, now)
+                )
+                if cursor.rowcount:
+                    added += 1
+                    reserved += 1
+            
+            conn.execute(
+                "UPDATE tasks SET result = ? WHERE kind = 'list' AND key = ?",
+                (json.dumps({'cards': len(cards)}), f"{keyword}#{page}")
+            )
+            if cards and reserved < max_jobs and page < config.MAX_PAGES_PER_KEYWORD:
+                conn.execute(
+                    "INSERT OR IGNORE INTO tasks (kind, key, keyword, payload, status, updated_at) "
+                    "VALUES ('list', ?, ?, ?, ?, ?)",
+                    (f"{keyword}#{page + 1}", keyword, json.dumps({'page': page + 1}), PENDING, now)
+                )
+        return added
+    
+    def take_results(self) -> List[Dict]:
+        """
+        取出已完成、尚未合併的職缺詳情（供協調者寫入 Obsidian）
+        
+        Returns:
+            [{'keyword', 'job_data'}] 清單
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT task_id, keyword, result FROM tasks WHERE kind = 'detail' AND status = ? AND result IS NOT NULL",
+                (DONE,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = ?, updated_at = ? WHERE task_id = ?",
+                ((MERGED, time.time(), task_id) for task_id, _, _ in rows)
+            )
+        return [{'keyword': keyword, 'job_data': json.loads(result)} for _, keyword, result in rows]
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        取得各狀態的任務數（先將無法再重試的逾時租約標記為失敗，
+        最後一個 worker 當掉時協調者才不會一直等待）
+        
+        Returns:
+            狀態 → 任務數
+        """
+        with self._transaction() as conn:
+            self._expire_leases(conn, time.time())
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return dict(rows)
+    
+    def is_drained(self) -> bool:
+        """所有任務皆已完成或失敗（沒有待處理或租約中的任務）"""
+        counts = self.counts()
+        return not counts.get(PENDING) and not counts.get(LEASED)
+    
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE 交易的 context manager（發生例外時回滾）"""
+    
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self._conn = conn
+        self._lock = lock
+    
+    def __enter__(self) -> sqlite3.Connection:
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self._lock.release()
+            raise
+        return self._conn
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()